@@ -1,10 +1,14 @@
 import logging
 import time
-from quart import Quart, render_template, request, jsonify, send_file
+import json
+from quart import Quart, Response, render_template, request, jsonify, send_file
 from flow_controller import FlowController
 from voice_processor import VoiceProcessor
 from question_engine import QuestionEngine
 from company_recommender import CompanyRecommender
+from batch_recommender import BatchRecommender, parse_profiles
+from job_queue import JobQueue, JobQueueFull
+from recommendation_views import dumps, parse_fields, project, shape
 import asyncio
 
 
@@ -24,6 +28,29 @@ flow_controller = FlowController()
 voice_processor = VoiceProcessor(flow_controller)
 question_engine = QuestionEngine()
 company_recommender = CompanyRecommender(flow_controller)
+batch_recommender = BatchRecommender(company_recommender)
+job_queue = JobQueue()
+
+def json_response(payload, status=200):
+    """Encode a response with the fast JSON encoder used for recommendation payloads."""
+    return Response(dumps(payload), status=status, mimetype="application/json")
+
+def start_recommendation_job():
+    """Queue keyword cleaning and recommendation generation for the completed onboarding; returns the job ID."""
+    async def run(report):
+        report(0.1, "Cleaning keywords")
+        keywords = await flow_controller.clean_keywords()
+        report(0.3, "Generating recommendations")
+        recommendations = await company_recommender.generate_recommendations()
+        return {"keywords": keywords, "recommendations": recommendations, "tier": company_recommender.last_tier}
+    return job_queue.submit("recommendations", run)
+
+def queue_full_response(error):
+    """Reject a submission while the job queue is at its depth limit."""
+    response = jsonify({"success": False, "error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = "5"
+    return response
 
 @app.route("/")
 async def index():
@@ -41,17 +68,23 @@ async def onboarding_step():
     logger.info(f"Onboarding: {step} => {answer}")
     
     await flow_controller.store_answer(step, answer)
-    next_step = flow_controller.get_next_step(step)
+    if step == company_recommender.speculate_after:
+        # Location and LinkedIn don't change the generated pool, so start on it while the user answers them
+        company_recommender.start_speculative_generation()
+    next_step = await flow_controller.get_next_step(step)
     
     if next_step == "complete":
-        cleaned_keywords = await flow_controller.clean_keywords()
-        recommendations = await company_recommender.generate_recommendations()
+        # Generation runs in the job queue; poll /api/jobs/<job_id> for keywords and recommendations
+        try:
+            job_id = start_recommendation_job()
+        except JobQueueFull as e:
+            return queue_full_response(e)
         return jsonify({
             "success": True,
             "completed": True,
-            "keywords": cleaned_keywords,
-            "recommendations": recommendations
-        })
+            "job_id": job_id,
+            "keywords": list(flow_controller.keywords)
+        }), 202
 
     question = await flow_controller.get_question(next_step)
     audio_data = await voice_processor.text_to_speech(question)
@@ -60,9 +93,31 @@ async def onboarding_step():
         "step": next_step,
         "question": question,
         "audio": audio_data,
-        "keywords": flow_controller.keywords  # Always include current keywords
+        "keywords": list(flow_controller.keywords)  # Always include current keywords
     })
 
+@app.route("/api/onboarding/submit", methods=["POST"])
+async def onboarding_submit():
+    """Take every onboarding answer at once: one keyword extraction call, then queue recommendations."""
+    data = await request.get_json()
+    answers = data.get("answers", data) if isinstance(data, dict) else None
+    if not isinstance(answers, dict) or not (answers.get("product") or answers.get("market")):
+        return jsonify({"success": False, "error": "answers must include a product or market"}), 400
+    
+    await flow_controller.reset()
+    keywords = await flow_controller.submit_answers(answers)
+    try:
+        job_id = start_recommendation_job()
+    except JobQueueFull as e:
+        return queue_full_response(e)
+    return jsonify({
+        "success": True,
+        "completed": True,
+        "job_id": job_id,
+        "keywords": keywords,
+        "keyword_weights": flow_controller.keywords.weights()
+    }), 202
+
 @app.route("/api/get_question", methods=["GET"])
 async def get_question():
     step = request.args.get("step", "product")
@@ -72,13 +127,117 @@ async def get_question():
         "success": True,
         "question": question,
         "audio": audio_data,
-        "keywords": flow_controller.keywords  # Always include current keywords
+        "keywords": list(flow_controller.keywords)  # Always include current keywords
     })
 
 @app.route("/api/recommendations", methods=["GET"])
 async def get_recommendations():
-    recs = await company_recommender.generate_recommendations()
-    return jsonify(recs)
+    """
+    Recommendations for the current profile.
+
+    fields= projects each recommendation ("name,fit_score.overall_score,events.name") and
+    view=summary returns compact list items; full detail is at /api/recommendations/<id>.
+    """
+    count = request.args.get("count", 3, type=int)
+    fields = request.args.get("fields")
+    view = request.args.get("view")
+    if "cursor" in request.args or "limit" in request.args:
+        # Cursor paging: {"recommendations", "next_cursor", "has_more"}, later pages come from the cached pool
+        try:
+            page = await company_recommender.get_recommendation_page(
+                cursor=request.args.get("cursor") or None,
+                limit=max(1, request.args.get("limit", count, type=int)),
+                deadline=request.args.get("deadline", type=float)
+            )
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        page["recommendations"] = shape(page["recommendations"], fields, view)
+        response = json_response(page)
+        response.headers["X-Recommendation-Tier"] = company_recommender.last_tier or "local"
+        return response
+    if request.args.get("rerank") == "true":
+        recs = await company_recommender.rerank_recommendations(count=count)
+    else:
+        recs = await company_recommender.generate_recommendations(
+            count=count,
+            offset=request.args.get("offset", 0, type=int),
+            regenerate=request.args.get("regenerate") == "true",
+            deadline=request.args.get("deadline", type=float)
+        )
+    response = json_response(shape(recs, fields, view))
+    # Which degradation tier served the results: fresh, stale or local
+    response.headers["X-Recommendation-Tier"] = company_recommender.last_tier or "local"
+    return response
+
+@app.route("/api/recommendations/batch", methods=["POST"])
+async def batch_recommendations():
+    """
+    Generate recommendations for many profiles from an NDJSON or CSV body.
+
+    Identical profiles are generated once and results stream back as NDJSON lines as each
+    profile finishes. count=, fields= and view= apply to every profile.
+    """
+    body = await request.get_data(as_text=True)
+    content_type = request.content_type or ""
+    fmt = request.args.get("format") or ("csv" if "csv" in content_type else "ndjson" if "json" in content_type else None)
+    try:
+        profiles = parse_profiles(body, fmt, request.args.get("count", 3, type=int))
+        batch_recommender.check_size(profiles)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    response = Response(
+        batch_recommender.stream(profiles, request.args.get("fields"), request.args.get("view")),
+        mimetype="application/x-ndjson"
+    )
+    response.timeout = None
+    return response
+
+@app.route("/api/recommendations/<recommendation_id>", methods=["GET"])
+async def get_recommendation_detail(recommendation_id):
+    """Full detail of one recommendation, optionally projected with fields=."""
+    recommendation = company_recommender.get_recommendation(recommendation_id)
+    if recommendation is None:
+        return jsonify({"success": False, "error": "Unknown recommendation"}), 404
+    return json_response(project(recommendation, parse_fields(request.args.get("fields"))))
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+async def get_job(job_id):
+    """
+    Status, progress and, once complete, the result of a queued job.
+
+    wait= long-polls for up to that many seconds (at most 30) until the job finishes.
+    """
+    wait = min(30.0, max(0.0, request.args.get("wait", 0, type=float)))
+    job = await job_queue.wait(job_id, timeout=wait) if wait else job_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown job"}), 404
+    return json_response({"success": True, **job})
+
+@app.route("/api/verification/<job_id>", methods=["GET"])
+async def get_verification(job_id):
+    """Poll the progress and per-company results of a background verification job."""
+    job = company_recommender.verification_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Unknown verification job"}), 404
+    return jsonify({"success": True, **job})
+
+@app.route("/api/verification/<job_id>/stream", methods=["GET"])
+async def stream_verification(job_id):
+    """Stream per-company verification results as server-sent events."""
+    verification_jobs = company_recommender.verification_jobs
+    if verification_jobs.get_job(job_id) is None:
+        return jsonify({"success": False, "error": "Unknown verification job"}), 404
+
+    async def events():
+        async for result in verification_jobs.subscribe(job_id):
+            yield b"event: verification\ndata: " + dumps(result) + b"\n\n"
+        job = verification_jobs.get_job(job_id) or {}
+        yield f"event: complete\ndata: {json.dumps({'status': job.get('status', 'complete')})}\n\n".encode()
+
+    response = Response(events(), mimetype="text/event-stream")
+    response.timeout = None
+    return response
 
 @app.route("/api/text_to_speech", methods=["POST"])
 async def tts():
@@ -101,25 +260,26 @@ async def voice_interaction():
         logger.info(f"Processing voice interaction for step: {step}, text: {text}")
         
         await flow_controller.store_answer(step, text)
+        if step == company_recommender.speculate_after:
+            company_recommender.start_speculative_generation()
         next_step = await flow_controller.get_next_step(step)
         
         logger.info(f"Next step after {step}: {next_step}")
         
         if next_step == "complete":
-            logger.info("Flow complete, generating keywords and recommendations")
-            logger.info(f"Current keywords before cleaning: {flow_controller.keywords}")
-            cleaned_keywords = await flow_controller.clean_keywords()
-            logger.info(f"Cleaned keywords: {cleaned_keywords}")
-            recommendations = await company_recommender.generate_recommendations()
-            logger.info(f"Generated recommendations: {recommendations}")
+            logger.info("Flow complete, queueing keyword cleaning and recommendations")
+            try:
+                job_id = start_recommendation_job()
+            except JobQueueFull as e:
+                return queue_full_response(e)
             return jsonify({
                 "success": True,
                 "completed": True,
                 "text": "You're all set! Generating your results.",
-                "keywords": cleaned_keywords,
-                "recommendations": recommendations,
+                "job_id": job_id,
+                "keywords": list(flow_controller.keywords),
                 "show_recommendations_tab": True
-            })
+            }), 202
         
         question = await flow_controller.get_question(next_step)
         audio = await voice_processor.text_to_speech(question)
@@ -191,6 +351,29 @@ async def get_keywords():
             "error": str(e),
             "keywords": []
         }), 500
+
+@app.route("/api/keywords", methods=["POST"])
+async def update_keywords():
+    """Replace the keywords and re-rank the cached recommendations against them."""
+    try:
+        data = await request.get_json()
+        keywords = data.get("keywords")
+        if not isinstance(keywords, list):
+            return jsonify({"success": False, "error": "keywords must be a list"}), 400
+        
+        flow_controller.set_keywords(keywords)
+        recommendations = await company_recommender.rerank_recommendations(count=data.get("count", 3))
+        return jsonify({
+            "success": True,
+            "keywords": await flow_controller.clean_keywords(),
+            "recommendations": recommendations
+        })
+    except Exception as e:
+        logger.error(f"Error updating keywords: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
     
 @app.route("/recommendations")
 async def recommendations_page():
@@ -206,7 +389,9 @@ async def search_events():
     """Search for events based on keywords and location."""
     try:
         data = await request.get_json()
-        keywords = data.get("keywords", [])
+        # Weight the requested keywords like the session's keywords, or search with the session's own
+        keywords = data.get("keywords") or []
+        keywords = flow_controller.keywords.select(keywords, source="user") if keywords else flow_controller.keywords
         location = data.get("location", "")
         
         # Import the EventScraper
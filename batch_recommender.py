@@ -0,0 +1,255 @@
+"""
+Batch Recommender Module
+
+This module runs the recommender for many product/market profiles at once, e.g.
+a sales-ops run over hundreds of profiles. Profiles are read from NDJSON or CSV,
+rows with identical profile fingerprints are generated only once, generation
+runs with bounded concurrency (provider calls are additionally rate limited by
+the provider orchestrator), and results are streamed as NDJSON lines as each
+profile finishes.
+
+Usage:
+    python batch_recommender.py profiles.csv --output results.ndjson --concurrency 4
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
+
+from recommendation_cache import profile_fingerprint
+from recommendation_views import dumps, shape
+
+logger = logging.getLogger(__name__)
+
+# Column aliases accepted in CSV headers and NDJSON keys
+_ALIASES = {
+    'zip': 'zip_code',
+    'location': 'zip_code',
+    'size': 'company_size',
+    'industry': 'market',
+    'linkedin': 'linkedin_consent'
+}
+
+# Keywords in a CSV cell are separated by semicolons, pipes or commas
+_KEYWORD_SPLIT_RE = re.compile(r'[;|,]')
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+
+def _normalize_profile(row: Dict, index: int, default_count: int) -> Dict:
+    """Map one input row to a profile with canonical field names and types"""
+    row = {_ALIASES.get(str(key).strip().lower(), str(key).strip().lower()): value for key, value in row.items() if key}
+
+    keywords = row.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = _KEYWORD_SPLIT_RE.split(keywords)
+    keywords = [str(keyword).strip() for keyword in keywords if str(keyword).strip()]
+
+    consent = row.get('linkedin_consent')
+    if isinstance(consent, str):
+        consent = consent.strip().lower() in _TRUE_VALUES
+
+    try:
+        count = int(row.get('count') or default_count)
+    except (TypeError, ValueError):
+        raise ValueError(f"Profile {index}: count must be a number")
+
+    profile = {
+        'id': str(row.get('id') or index),
+        'index': index,
+        'product': str(row.get('product') or '').strip(),
+        'market': str(row.get('market') or '').strip(),
+        'company_size': str(row.get('company_size') or '').strip(),
+        'zip_code': str(row.get('zip_code') or '').strip(),
+        'keywords': keywords,
+        'linkedin_consent': bool(consent),
+        'count': max(1, count)
+    }
+    if not profile['product'] and not profile['market']:
+        raise ValueError(f"Profile {index}: product or market is required")
+    return profile
+
+
+def parse_profiles(text: str, fmt: Optional[str] = None, default_count: int = 3) -> List[Dict]:
+    """
+    Parse batch profiles from NDJSON or CSV
+
+    Args:
+        text: Input document
+        fmt: "ndjson" or "csv", detected from the first character when None
+        default_count: Recommendations per profile when a row has no count
+
+    Returns:
+        Profiles with id, index, product, market, company_size, zip_code,
+        keywords, linkedin_consent and count
+
+    Raises:
+        ValueError: If a row is malformed
+    """
+    text = text.lstrip('\ufeff')
+    if fmt is None:
+        fmt = 'ndjson' if text.lstrip().startswith('{') else 'csv'
+
+    if fmt == 'ndjson':
+        rows = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})")
+            if not isinstance(row, dict):
+                raise ValueError(f"Line {line_number}: expected a JSON object")
+            rows.append(row)
+    elif fmt == 'csv':
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        raise ValueError(f"Unknown batch format: {fmt}")
+
+    return [_normalize_profile(row, index, default_count) for index, row in enumerate(rows)]
+
+
+class BatchRecommender:
+    """Generates recommendations for many profiles with deduplication and bounded concurrency"""
+
+    def __init__(self, recommender, concurrency: Optional[int] = None, max_profiles: Optional[int] = None):
+        """
+        Initialize the batch runner
+
+        Args:
+            recommender: CompanyRecommender used for generation
+            concurrency: Profiles generated at the same time, defaults to BATCH_CONCURRENCY
+            max_profiles: Largest accepted batch, defaults to BATCH_MAX_PROFILES
+        """
+        self.recommender = recommender
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.max_profiles = max_profiles or int(os.getenv("BATCH_MAX_PROFILES", "1000"))
+
+    def check_size(self, profiles: List[Dict]) -> None:
+        """
+        Reject batches larger than max_profiles
+
+        Raises:
+            ValueError: If the batch is too large
+        """
+        if len(profiles) > self.max_profiles:
+            raise ValueError(f"Batch of {len(profiles)} profiles exceeds the limit of {self.max_profiles}")
+
+    async def run(self, profiles: List[Dict], fields: Optional[str] = None,
+                  view: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Generate recommendations for every profile, yielding results as profiles finish
+
+        Profiles with the same fingerprint share one generation; each input row still
+        gets its own result line, in completion order.
+
+        Args:
+            profiles: Profiles from parse_profiles
+            fields: Optional field projection applied to each recommendation
+            view: Optional response view ("summary")
+
+        Yields:
+            Result dictionaries with the row id and index, the profile fingerprint, the
+            tier served, the recommendations and an error message if generation failed
+
+        Raises:
+            ValueError: If the batch is larger than max_profiles
+        """
+        self.check_size(profiles)
+
+        groups: Dict[str, List[Dict]] = OrderedDict()
+        for profile in profiles:
+            key = profile_fingerprint(profile['product'], profile['market'], profile['company_size'],
+                                      profile['zip_code'], profile['keywords'])
+            groups.setdefault(key, []).append(profile)
+        logger.info(f"Batch of {len(profiles)} profiles has {len(groups)} unique fingerprints")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate(key: str, rows: List[Dict]):
+            profile = rows[0]
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    recommendations, tier = await self.recommender.recommend_for_profile(
+                        profile['product'],
+                        profile['market'],
+                        profile['company_size'],
+                        zip_code=profile['zip_code'],
+                        keywords=profile['keywords'],
+                        linkedin_consent=profile['linkedin_consent'],
+                        count=max(row['count'] for row in rows),
+                        # Batch runs are not interactive, so wait for fresh results instead of degrading
+                        deadline=0
+                    )
+                    return key, recommendations, tier, None, time.perf_counter() - started
+                except Exception as e:
+                    logger.error(f"Batch generation failed for profile {profile['id']}: {str(e)}")
+                    return key, [], None, str(e), time.perf_counter() - started
+
+        tasks = [asyncio.ensure_future(generate(key, rows)) for key, rows in groups.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, recommendations, tier, error, elapsed = await next_done
+                for row in groups[key]:
+                    result = {
+                        'id': row['id'],
+                        'index': row['index'],
+                        'fingerprint': key[:16],
+                        'tier': tier,
+                        'elapsed': round(elapsed, 3),
+                        'recommendations': shape(recommendations[:row['count']], fields, view)
+                    }
+                    if error:
+                        result['error'] = error
+                    yield result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def stream(self, profiles: List[Dict], fields: Optional[str] = None,
+                     view: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Results of run() encoded as NDJSON lines"""
+        async for result in self.run(profiles, fields, view):
+            yield dumps(result) + b"\n"
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from company_recommender import CompanyRecommender
+    from flow_controller import FlowController
+
+    text = sys.stdin.read() if args.input == '-' else open(args.input, encoding='utf-8').read()
+    profiles = parse_profiles(text, args.format, args.count)
+    batch = BatchRecommender(CompanyRecommender(FlowController()), concurrency=args.concurrency)
+
+    output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        async for line in batch.stream(profiles, args.fields, args.view):
+            output.write(line)
+            output.flush()
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate recommendations for a batch of profiles")
+    parser.add_argument("input", help="NDJSON or CSV file of profiles, or - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Input format (detected by default)")
+    parser.add_argument("--concurrency", type=int, help="Profiles generated at the same time")
+    parser.add_argument("--count", type=int, default=3, help="Recommendations per profile without a count column")
+    parser.add_argument("--fields", help="Comma separated fields to keep in each recommendation")
+    parser.add_argument("--view", choices=["summary", "full"], help="Recommendation view")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,267 @@
+"""
+Candidate Pool Module
+
+This module holds an over-generated set of company candidates for one user
+profile. Candidates are deduplicated by normalized name and website domain as
+they arrive. Pools are cached and shared by every user with the same profile,
+so ranking never modifies them: each ranking is a separate RankedView that one
+user pages through with opaque cursors, and re-ranking needs no LLM call.
+"""
+
+import base64
+import json
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from company_registry import canonical_domain, normalize_company_name
+from recommendation_cache import normalize_terms
+from recommendation_views import recommendation_id
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(profile_key: str, offset: int, ranking_key: Optional[str] = None) -> str:
+    """
+    Build an opaque "load more" cursor for a position in a ranked view of a profile's pool
+
+    Args:
+        profile_key: Fingerprint of the profile being paged through
+        offset: Number of ranked candidates already served
+        ranking_key: Key of the RankedView the pages are sliced from
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {'p': profile_key[:16], 'o': offset}
+    if ranking_key:
+        payload['r'] = ranking_key
+    payload = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, profile_key: str) -> Tuple[int, Optional[str]]:
+    """
+    Read the offset and ranking key from a cursor issued for the same profile
+
+    Args:
+        cursor: Cursor from a previous page
+        profile_key: Fingerprint of the current profile
+
+    Returns:
+        Tuple of (offset of the next page, key of the RankedView or None)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another profile
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        offset = int(payload['o'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if payload.get('p') != profile_key[:16] or offset < 0:
+        raise ValueError("Cursor does not belong to the current profile")
+    return offset, payload.get('r')
+
+
+def _personal_copy(candidate: Dict) -> Dict:
+    """Copy the parts of a candidate that ranking and personalization modify"""
+    copied = candidate.copy()
+    if isinstance(candidate.get('fit_score'), dict):
+        copied['fit_score'] = dict(candidate['fit_score'])
+    return copied
+
+
+class RankedView:
+    """One user's ranking of a candidate pool, kept apart from the shared pool so a cursor pages through a stable order"""
+
+    def __init__(self, pool: 'CandidatePool', ranked: List[Dict]):
+        """
+        Initialize the view
+
+        Args:
+            pool: Pool the candidates were ranked from
+            ranked: Ranked, personalized copies of the pool's candidates
+        """
+        self.key = uuid.uuid4().hex[:12]
+        self.pool = pool
+        self.ranked = ranked
+        # Pool candidates are only appended, so this many of them are in the view
+        self.ranked_count = len(pool.candidates)
+        self.created_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.ranked)
+
+    def page(self, offset: int = 0, count: int = 3) -> List[Dict]:
+        """
+        Get a slice of the ranking
+
+        Args:
+            offset: Number of ranked candidates to skip
+            count: Number of candidates to return
+
+        Returns:
+            Ranked candidates in the requested range
+        """
+        return self.ranked[offset:offset + count]
+
+
+class CandidatePool:
+    """Deduplicated, ranked pool of company candidates for a single profile"""
+
+    def __init__(self, profile_key: str):
+        """
+        Initialize an empty pool
+
+        Args:
+            profile_key: Key of the profile the candidates were generated for
+        """
+        self.profile_key = profile_key
+        self.created_at = time.time()
+        self.candidates: List[Dict] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._by_domain: Dict[str, Dict] = {}
+        self._by_id: Dict[str, Dict] = {}
+        self._terms: Optional[set] = None
+
+        # Generation rounds so far, and whether the last top-up found nothing new
+        self.rounds = 0
+        self.exhausted = False
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def _find(self, candidate: Dict) -> Optional[Dict]:
+        name_key = normalize_company_name(candidate.get('name', ''))
+        domain = canonical_domain(candidate.get('website', ''))
+        return self._by_name.get(name_key) or (self._by_domain.get(domain) if domain else None)
+
+    def add(self, candidates: List[Dict]) -> int:
+        """
+        Add candidates, merging duplicates into the entry already in the pool
+
+        Args:
+            candidates: Company recommendations from one or more LLM responses
+
+        Returns:
+            Number of new companies added
+        """
+        added = 0
+        for candidate in candidates:
+            if not isinstance(candidate, dict) or not candidate.get('name'):
+                continue
+
+            existing = self._find(candidate)
+            if existing is not None:
+                # Keep the first answer but fill in anything it was missing
+                for field, value in candidate.items():
+                    if value and not existing.get(field):
+                        existing[field] = value
+                continue
+
+            candidate.setdefault('id', recommendation_id(candidate))
+            self.candidates.append(candidate)
+            self._by_id[candidate['id']] = candidate
+            self._by_name[normalize_company_name(candidate['name'])] = candidate
+            domain = canonical_domain(candidate.get('website', ''))
+            if domain:
+                self._by_domain[domain] = candidate
+            added += 1
+
+        if added:
+            self._terms = None
+            logger.info(f"Added {added} candidates to pool {self.profile_key[:8]} ({len(self.candidates)} total)")
+        return added
+
+    def get(self, candidate_id: str) -> Optional[Dict]:
+        """
+        Get a candidate by its recommendation id
+
+        Args:
+            candidate_id: Id assigned when the candidate was added
+
+        Returns:
+            The stored candidate, or None
+        """
+        return self._by_id.get(candidate_id)
+
+    def keyword_coverage(self, keywords: List[str]) -> float:
+        """
+        Get the fraction of keywords that some candidate in the pool is about
+
+        A keyword counts as covered when all of its stemmed terms appear in the
+        name, industry, description or investment areas of one of the candidates.
+
+        Args:
+            keywords: User keywords
+
+        Returns:
+            Coverage between 0 and 1, or 1 when there are no keywords
+        """
+        if self._terms is None:
+            self._terms = set()
+            for candidate in self.candidates:
+                text = " ".join(str(candidate.get(field) or '') for field in ('name', 'industry', 'description', 'investment_areas'))
+                self._terms.update(normalize_terms(text))
+
+        keyword_terms = [terms for terms in (normalize_terms(keyword) for keyword in keywords or []) if terms]
+        if not keyword_terms:
+            return 1.0
+        covered = sum(1 for terms in keyword_terms if self._terms.issuperset(terms))
+        return covered / len(keyword_terms)
+
+    def _rank_candidates(self, candidates: List[Dict], scorer, keywords: List[str], zip_code: str,
+                         user_memory=None, linkedin_consent: bool = False) -> List[Dict]:
+        """Rank personalized copies of candidates, so preference boosts never touch the stored ones"""
+        candidates = [_personal_copy(candidate) for candidate in candidates]
+        if user_memory is not None:
+            candidates = user_memory.apply_preferences_to_recommendations(candidates)
+        return scorer.rank(candidates, keywords, zip_code, linkedin_consent=linkedin_consent)
+
+    def rank(self, scorer, keywords: List[str], zip_code: str, user_memory=None,
+             linkedin_consent: bool = False) -> RankedView:
+        """
+        Apply user preferences and rank the pool
+
+        The pool itself is left unchanged; the ranking is returned as a new view.
+
+        Args:
+            scorer: RecommendationScorer
+            keywords: User keywords
+            zip_code: User zip code
+            user_memory: UserMemory whose preferences filter and boost candidates
+            linkedin_consent: Whether the user connected LinkedIn
+
+        Returns:
+            RankedView of the pool's current candidates
+        """
+        return RankedView(self, self._rank_candidates(self.candidates, scorer, keywords, zip_code,
+                                                      user_memory, linkedin_consent))
+
+    def extend_ranking(self, view: RankedView, scorer, keywords: List[str], zip_code: str, user_memory=None,
+                       linkedin_consent: bool = False) -> RankedView:
+        """
+        Rank candidates added since a view was ranked and append them to the view
+
+        Pages that were already served keep their order, so a cursor never skips or
+        repeats a company when a background top-up grows the pool.
+
+        Args:
+            view: RankedView of this pool
+            scorer: RecommendationScorer
+            keywords: User keywords
+            zip_code: User zip code
+            user_memory: UserMemory whose preferences filter and boost candidates
+            linkedin_consent: Whether the user connected LinkedIn
+
+        Returns:
+            The extended view
+        """
+        if view.ranked_count >= len(self.candidates):
+            return view
+        added = self.candidates[view.ranked_count:]
+        view.ranked = view.ranked + self._rank_candidates(added, scorer, keywords, zip_code, user_memory, linkedin_consent)
+        view.ranked_count = len(self.candidates)
+        return view
@@ -2,17 +2,101 @@ import os
 import logging
 import requests
 import json
+import asyncio
+import math
 import random
 from dotenv import load_dotenv
-from datetime import datetime
 import httpx
 from typing import List, Dict, Any, Optional
 import hashlib
 import time
-from recommendation_verifier import verify_recommendations
+from collections import OrderedDict
+from candidate_pool import CandidatePool, decode_cursor, encode_cursor
+from company_store import CompanyProfileStore
+from gemini_cache import GeminiContextCache
+from keyword_set import KeywordSet
+from local_recommender import LocalRecommender
+from pattern_matcher import get_matcher
+from prompt_budget import PromptBudget
+from provider_orchestrator import ProviderOrchestrator
+from recommendation_cache import RecommendationCache, base_fingerprint, profile_fingerprint
+from recommendation_ranker import RecommendationScorer
+from recommendation_schema import RECOMMENDATIONS_SCHEMA, decode_recommendations
+from recommendation_views import recommendation_id
+from verification_jobs import VerificationJobManager
 from user_memory import UserMemory
 import traceback
 
+# Terms signalling a technology or startup focus, matched as whole words so "ai" does not match "retail"
+TECH_TERMS = ("gemini", "flash", "2.0", "ai", "ml", "llm", "gpt", "claude", "anthropic", "openai")
+STARTUP_TERMS = ("startup", "early stage", "seed", "series a", "emerging")
+STARTUP_SIZE_TERMS = ("small", "startup", "early", "seed", "series a")
+
+# Static instructions and output format of recommendation prompts; the per-user profile follows them,
+# so Gemini can serve this part from its context cache
+RECOMMENDATION_INSTRUCTIONS = """You are a financial analyst specializing in B2B company research. You generate TARGET company recommendations for B2B sales professionals. Each request ends with the sales professional's profile (product/service, target market, target company size, keywords, location and LinkedIn availability) and the number of companies to recommend.
+
+IMPORTANT CLARIFICATION: The user is selling their PRODUCT/SERVICE to companies in their TARGET MARKET. Recommend POTENTIAL CUSTOMER COMPANIES that the user could sell to, NOT competitors who offer similar products. Focus on companies that might NEED or BUY the user's product/service.
+
+IMPORTANT: Focus on REAL companies only. DO NOT make up or hallucinate information. If you're uncertain about details, provide less information rather than inventing facts. Only include information you are confident is accurate.
+
+For each company, you MUST provide ALL of the following information:
+1. Company name (must be a real company)
+2. Website URL (must be a real website)
+3. Industry (specific industry the company operates in)
+4. Company size (employees or revenue) and headquarters city
+5. Brief description (1-2 sentences about what they actually do)
+6. Current year's investment areas and focus (list at least 3 specific areas)
+7. Budget allocation information (how they're allocating resources)
+8. 2-3 recent news articles with direct quotes from executives (include the source, date, and URL for each)
+9. 3-5 key leads/decision makers with titles, emails, and LinkedIn profiles
+10. Upcoming events where company representatives will be present (include date, location, and URL)
+11. Why they would be a good CUSTOMER for the user's product/service
+
+Take your time to provide detailed, high-quality recommendations. Quality is more important than speed.
+
+Format each recommendation as a JSON object with the following structure:
+{
+  "name": "Company Name",
+  "website": "https://company-website.com",
+  "fit_reason": "Why this company would be a good CUSTOMER for the user's product/service",
+  "industry": "Industry",
+  "size": "Size (employees/revenue)",
+  "headquarters": "City, ST",
+  "description": "Brief description",
+  "investment_areas": ["Area 1", "Area 2", "Area 3"],
+  "budget_allocation": "Budget allocation details",
+  "articles": [
+    {
+      "title": "Article Title",
+      "source": "Source Name",
+      "date": "Publication Date",
+      "url": "https://article-url.com",
+      "quote": "Direct quote from executive"
+    }
+  ],
+  "leads": [
+    {
+      "name": "Lead Name",
+      "title": "Job Title",
+      "email": "email@company.com",
+      "linkedin": "https://linkedin.com/in/profile"
+    }
+  ],
+  "events": [
+    {
+      "name": "Event Name",
+      "date": "Event Date",
+      "location": "Event Location",
+      "url": "https://event-url.com",
+      "description": "Brief description of the event and why it's relevant",
+      "attending_companies": ["Company 1", "Company 2"]
+    }
+  ]
+}
+
+Return your response as a valid JSON array of company objects."""
+
 # Load environment variables
 load_dotenv()
 
@@ -52,86 +136,611 @@ class CompanyRecommender:
             "summit.com"
         ]
         
+        # Scores the candidate pool in one vectorized pass
+        self.scorer = RecommendationScorer(self.priority_news_sources, self.priority_event_sources)
+        
+        # Configured LLM providers are hedged or merged; routing adapts to their latency and error rates
+        providers = {}
+        if self.gemini_api_key:
+            providers["gemini"] = self._generate_with_gemini
+        if self.perplexity_api_key:
+            providers["perplexity"] = self._generate_with_perplexity
+        if self.openai_api_key:
+            providers["openai"] = self._generate_with_openai
+        provider_rpm = float(os.getenv("RECOMMENDATION_PROVIDER_RPM", "0"))
+        self.providers = ProviderOrchestrator(
+            providers,
+            mode=os.getenv("RECOMMENDATION_PROVIDER_MODE", "first"),
+            rate_limits={name: provider_rpm for name in providers} if provider_rpm > 0 else None,
+            probe_after=float(os.getenv("RECOMMENDATION_PROVIDER_PROBE", "60"))
+        )
+        
+        # Keyword lists and optional prompt sections are trimmed to per-call-site token budgets
+        self.prompt_budget = PromptBudget()
+        
+        # Gemini serves the static recommendation instructions from its context cache once uploaded
+        self.context_cache = GeminiContextCache.get_instance()
+        
+        # Ask Gemini for JSON matching the recommendation schema instead of free text to parse
+        self.structured_output = os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() == "true"
+        
+        # Over-generate candidates per profile so "show more" and re-ranking need no new LLM calls
+        self.pool_size = int(os.getenv("RECOMMENDATION_POOL_SIZE", "12"))
+        self.pool_prompts = int(os.getenv("RECOMMENDATION_POOL_PROMPTS", "2"))
+        
+        # Paging tops the pool up in the background once fewer than pool_low_water unserved candidates remain
+        self.pool_max_size = int(os.getenv("RECOMMENDATION_POOL_MAX", "48"))
+        self.pool_low_water = int(os.getenv("RECOMMENDATION_POOL_LOW_WATER", "6"))
+        self._pool_top_ups = {}
+        
+        # Pools are shared across users with equivalent profiles, personalization happens after lookup
+        self.recommendation_cache = RecommendationCache.get_instance()
+        
+        # Keyword edits rescore the pool for the same product/market/size while it still covers this share of keywords
+        self.keyword_coverage_threshold = float(os.getenv("RECOMMENDATION_KEYWORD_COVERAGE", "0.5"))
+        
+        # Company enrichment is shared across all users, so the LLM only fills in what is missing or stale
+        self.company_store = CompanyProfileStore.get_instance()
+        
         # Get or create user memory
         self.user_id = flow_controller.user_id if hasattr(flow_controller, 'user_id') else "default_user"
         self.user_memory = UserMemory(self.user_id)
         
+        # Networked verification runs in the background after recommendations are returned
+        self.verification_jobs = VerificationJobManager()
+        
+        # Offline TF-IDF recommender, the last degradation tier and a source of real companies to seed prompts
+        self.seed_count = int(os.getenv("LOCAL_RECOMMENDER_SEEDS", "10"))
+        try:
+            self.local_recommender = LocalRecommender.get_instance()
+        except Exception as e:
+            logger.error(f"Error loading local recommender: {str(e)}")
+            self.local_recommender = None
+        
+        # Time budget for generate_recommendations before degrading to a stale or local tier (0 disables it)
+        self.deadline = float(os.getenv("RECOMMENDATION_DEADLINE", "25"))
+        self.last_tier = None
+        
+        # Onboarding starts generating once the answers the pool depends on are in (after speculate_after),
+        # location and LinkedIn only re-rank the pool when the user finishes
+        self.speculative = os.getenv("RECOMMENDATION_SPECULATIVE", "true").lower() == "true"
+        self.speculate_after = "company_size"
+        self._speculation = None
+        
+        # Recently served recommendations by id, so list views can stay compact and fetch detail on demand
+        self._served = OrderedDict()
+        self.served_limit = 512
+        
+        # Rankings served from shared pools, by key; "load more" cursors reference them so later pages
+        # continue the same order even when the pool is re-ranked for another user or request
+        self._rankings = OrderedDict()
+        self.rankings_limit = 256
+        
         if not self.use_llm:
             logger.warning("No API keys found for LLM. This will cause an exception when generating recommendations.")
     
-    async def generate_recommendations(self, count=3, verify=True):
-        """Generate company recommendations based on user preferences."""
+    async def generate_recommendations(self, count=3, verify=True, offset=0, regenerate=False, deadline=None):
+        """
+        Generate company recommendations based on user preferences.
+        
+        Candidates are over-generated into a ranked pool for the user's profile. Later
+        calls for the same profile, e.g. "show more" with an offset, are served from
+        the pool without calling the LLM unless regenerate is set.
+        
+        Within the deadline (seconds, defaults to RECOMMENDATION_DEADLINE) the best
+        available tier is returned: "fresh" LLM results, a "stale" pool cached for a
+        similar profile, or "local" offline recommendations. The tier served is stored
+        in self.last_tier.
+        """
+        recommendations, _ = await self._recommend_session(count, verify=verify, offset=offset, regenerate=regenerate, deadline=deadline)
+        return recommendations
+    
+    async def _recommend_session(self, count, verify=True, offset=0, regenerate=False, deadline=None):
+        """Serve the onboarding session's profile, keeping its ranking for cursors. Returns (recommendations, view)."""
+        recommendations, self.last_tier, view = await self._recommend(
+            self._get_profile(), count, offset=offset, verify=verify, background_verify=verify,
+            regenerate=regenerate, deadline=deadline, user_memory=self.user_memory
+        )
+        if view is not None:
+            self._store_ranking(view)
+        return self._remember(recommendations), view
+    
+    async def recommend_for_profile(self, product, market, company_size, zip_code="", keywords=None, linkedin_consent=False,
+                                    count=3, verify=True, deadline=None):
+        """
+        Generate recommendations for an explicit profile instead of the onboarding session.
+        
+        Used by batch runs: candidates are validated but not verified in the background. These
+        profiles are not the session user, so neither generation nor ranking sees the session's
+        preferences (user_memory=None), the ranking is not kept for cursors and last_tier is left
+        untouched. Pools are shared with sessions through the profile-fingerprint cache, which
+        ranking never modifies.
+        
+        Returns a (recommendations, tier) tuple.
+        """
+        profile = (product or "", market or "", company_size or "", zip_code or "", bool(linkedin_consent), list(keywords or []))
+        recommendations, tier, _ = await self._recommend(profile, count, verify=verify, background_verify=False,
+                                                         deadline=deadline, user_memory=None)
+        return recommendations, tier
+    
+    async def _recommend(self, profile, count, offset=0, verify=True, background_verify=True, regenerate=False,
+                         deadline=None, user_memory=None):
+        """
+        Serve recommendations for a (product, market, company_size, zip_code, linkedin_consent, keywords) profile.
+        
+        Returns a (recommendations, tier, view) tuple; view is the RankedView the page was sliced from,
+        None for the local tier.
+        """
+        started = time.monotonic()
+        deadline = self.deadline if deadline is None else deadline
+        product, market, company_size, zip_code, linkedin_consent, keywords = profile
         try:
             logger.info("Generating company recommendations...")
             
-            # Get user preferences from flow controller
-            product = self.flow_controller.get_product() if hasattr(self.flow_controller, 'get_product') else ""
-            market = self.flow_controller.get_market() if hasattr(self.flow_controller, 'get_market') else ""
-            company_size = self.flow_controller.get_company_size() if hasattr(self.flow_controller, 'get_company_size') else ""
-            zip_code = self.flow_controller.get_location() if hasattr(self.flow_controller, 'get_location') else ""
-            linkedin_consent = self.flow_controller.get_linkedin_consent() if hasattr(self.flow_controller, 'get_linkedin_consent') else False
-            keywords = self.flow_controller.get_keywords() if hasattr(self.flow_controller, 'get_keywords') else []
-            
             # Log input data
             logger.info(f"Recommendation inputs: product='{product}', market='{market}', company_size='{company_size}', zip_code='{zip_code}', linkedin_consent={linkedin_consent}, keywords={keywords}")
             
             # Check if we have valid API keys
             if not self.use_llm:
-                logger.warning("No API keys found for LLM. Using mock recommendations.")
-                return self._get_mock_recommendations(count)
-                
-            # Generate recommendations using Gemini
-            try:
-                recommendations = await self._generate_with_gemini(
+                logger.warning("No API keys found for LLM. Using local recommendations.")
+                return self._get_local_recommendations(profile, count, offset), "local", None
+            
+            profile_key = profile_fingerprint(product, market, company_size, zip_code, keywords)
+            base_key = base_fingerprint(product, market, company_size)
+            unlocated_key = profile_fingerprint(product, market, company_size, "", keywords)
+            if regenerate:
+                # Including the speculative pool, which is cached under the profile without location
+                for key in (profile_key, base_key, unlocated_key):
+                    self.recommendation_cache.invalidate(key)
+            
+            # Generate a pool of candidates with the configured providers, unless an equivalent or keyword-only variant profile already has one
+            pool, tier = (None, None) if regenerate else self._find_rescorable_pool(profile_key, base_key, keywords, unlocated_key)
+            if pool is None:
+                remaining = max(0.0, deadline - (time.monotonic() - started)) if deadline and deadline > 0 else None
+                # Join a speculative generation still running for this product/market/size instead of starting another
+                speculation = None if regenerate else self._pending_speculation(base_key)
+                wait_for_pool = self._join_speculation if speculation is not None else self._get_pool_within_deadline
+                pool, tier = await wait_for_pool(
+                    remaining,
+                    profile_key=profile_key,
+                    base_key=base_key,
                     product=product,
                     market=market,
                     company_size=company_size,
                     zip_code=zip_code,
                     keywords=keywords,
                     linkedin_consent=linkedin_consent,
-                    count=count
+                    verify=verify
                 )
-            except Exception as e:
-                logger.error(f"Error with Gemini API: {str(e)}")
-                logger.info("Falling back to mock recommendations")
-                return self._get_mock_recommendations(count)
+            else:
+                tier = "fresh"
             
-            # Verify recommendations if requested
-            if verify and recommendations:
-                logger.info(f"Verifying {len(recommendations)} recommendations...")
-                verified_recommendations = []
+            if pool is None:
+                logger.info("No candidate pool available, falling back to local recommendations")
+                return self._get_local_recommendations(profile, count, offset), "local", None
+            
+            logger.info(f"Serving recommendations from {tier} pool of {len(pool)} candidates")
+            
+            # Rank the shared pool with this user's preferences; the pool itself stays unchanged
+            view = pool.rank(self.scorer, keywords, zip_code, user_memory, linkedin_consent)
+            recommendations = [rec.copy() for rec in view.page(offset, count)]
+            
+            # Check sources and quotes in the background so the response isn't held up
+            if background_verify and recommendations:
+                job_id = self.verification_jobs.start(recommendations)
                 for rec in recommendations:
-                    if self._verify_recommendation(rec):
-                        verified_recommendations.append(rec)
-                    else:
-                        logger.warning(f"Removed invalid recommendation: {rec.get('name', 'Unknown')}")
-                
-                recommendations = verified_recommendations
-                logger.info(f"Verified {len(recommendations)} recommendations")
+                    rec['verification'] = {'status': 'pending', 'job_id': job_id}
             
-            # If we have no valid recommendations, use mock data
-            if not recommendations:
-                logger.warning("No valid recommendations generated, using mock data")
-                return self._get_mock_recommendations(count)
-                
-            return recommendations
+            # If we have no valid recommendations, use local data
+            if not recommendations and offset == 0:
+                logger.warning("No valid recommendations generated, using local recommendations")
+                return self._get_local_recommendations(profile, count, offset), "local", None
+            
+            return recommendations, tier, view
         
         except Exception as e:
             logger.error(f"Error generating recommendations: {str(e)}")
             logger.error(traceback.format_exc())
-            # Return mock recommendations as fallback
-            return self._get_mock_recommendations(count)
+            # Return local recommendations as fallback
+            return self._get_local_recommendations(profile, count, offset), "local", None
     
-    async def _generate_with_llm(self, product, market, company_size, zip_code, keywords, linkedin_consent, count):
-        """Generate recommendations using an LLM"""
-        # Only use Gemini Flash 2.0
-        return await self._generate_with_gemini(product, market, company_size, zip_code, keywords, linkedin_consent, count)
+    async def get_recommendation_page(self, cursor=None, limit=3, verify=True, deadline=None):
+        """
+        Get one page of recommendations for "load more" paging.
+        
+        The first page (no cursor) is served like generate_recommendations. Later pages are
+        sliced from the ranking the cursor was issued for, without calling the LLM and unaffected
+        by other users re-ranking the shared pool; when few unserved candidates remain, more are generated in the background for the next pages.
+        
+        Returns a dict with the recommendations, the cursor of the next page (None at the end)
+        and whether more results may follow. Raises ValueError for a cursor issued to another profile.
+        """
+        product, market, company_size, zip_code, linkedin_consent, keywords = self._get_profile()
+        profile_key = profile_fingerprint(product, market, company_size, zip_code, keywords)
+        base_key = base_fingerprint(product, market, company_size)
+        offset, ranking_key = decode_cursor(cursor, profile_key) if cursor else (0, None)
+        
+        # Later pages continue the ranking the cursor was issued for
+        view = None
+        if offset > 0:
+            view = self._rankings.get(ranking_key) if ranking_key else None
+            if view is not None:
+                view.pool.extend_ranking(view, self.scorer, keywords, zip_code, self.user_memory, linkedin_consent)
+            else:
+                # The ranking was evicted, rank the cached pool again
+                pool = self._cached_pool(profile_key, base_key)
+                if pool is not None:
+                    view = pool.rank(self.scorer, keywords, zip_code, self.user_memory, linkedin_consent)
+        
+        if view is None:
+            recommendations, view = await self._recommend_session(limit, verify=verify, offset=offset, deadline=deadline)
+        else:
+            self.last_tier = "fresh"
+            self._store_ranking(view)
+            recommendations = [rec.copy() for rec in view.page(offset, limit)]
+            if verify and recommendations:
+                job_id = self.verification_jobs.start(recommendations)
+                for rec in recommendations:
+                    rec['verification'] = {'status': 'pending', 'job_id': job_id}
+            self._remember(recommendations)
+        
+        next_offset = offset + len(recommendations)
+        if view is None:
+            has_more = len(recommendations) == limit
+        else:
+            pool = view.pool
+            # Preferences can filter the view below the pool size, so both checks count what this user can still page through
+            if len(view) - next_offset < self.pool_low_water:
+                self._schedule_pool_top_up(
+                    pool,
+                    product=product,
+                    market=market,
+                    company_size=company_size,
+                    zip_code=zip_code,
+                    keywords=keywords,
+                    linkedin_consent=linkedin_consent,
+                    verify=verify
+                )
+            has_more = next_offset < len(view) or pool.profile_key in self._pool_top_ups
+        
+        return {
+            "recommendations": recommendations,
+            "next_cursor": encode_cursor(profile_key, next_offset, view.key if view else None) if has_more else None,
+            "has_more": has_more
+        }
+    
+    def get_recommendation(self, recommendation_id):
+        """
+        Get the full detail of a recommendation by id.
+        
+        Looks in the recently served recommendations first, then in the candidate pool
+        for the current profile. Returns None if the id is unknown.
+        """
+        recommendation = self._served.get(recommendation_id)
+        if recommendation is not None:
+            return recommendation
+        product, market, company_size, zip_code, _, keywords = self._get_profile()
+        pool = self._cached_pool(
+            profile_fingerprint(product, market, company_size, zip_code, keywords),
+            base_fingerprint(product, market, company_size)
+        )
+        return pool.get(recommendation_id) if pool is not None else None
     
-    async def _generate_with_perplexity(self, product, market, company_size, zip_code, keywords, linkedin_consent, count):
-        """Generate recommendations using the Perplexity API"""
+    def _remember(self, recommendations):
+        """Give served recommendations an id and keep the most recent ones for detail lookups."""
+        for rec in recommendations:
+            rec_id = rec.setdefault('id', recommendation_id(rec))
+            self._served[rec_id] = rec
+            self._served.move_to_end(rec_id)
+        while len(self._served) > self.served_limit:
+            self._served.popitem(last=False)
+        return recommendations
+    
+    def _store_ranking(self, view):
+        """Keep a ranking for its cursors, dropping the least recently used ones beyond rankings_limit."""
+        self._rankings[view.key] = view
+        self._rankings.move_to_end(view.key)
+        while len(self._rankings) > self.rankings_limit:
+            self._rankings.popitem(last=False)
+    
+    def _cached_pool(self, profile_key, base_key):
+        """Get the cached pool for a profile, or the one for its product/market/size, fresh or stale."""
+        for key in (profile_key, base_key):
+            pool, _ = self.recommendation_cache.get(key)
+            if pool is not None:
+                return pool
+        return None
+    
+    def _schedule_pool_top_up(self, pool, **profile):
+        """Start generating more candidates for a pool in the background, at most one top-up per pool at a time."""
+        if pool.exhausted or len(pool) >= self.pool_max_size or pool.profile_key in self._pool_top_ups:
+            return
+        logger.info(f"Pool {pool.profile_key[:8]} is running low, generating more candidates in the background")
+        task = asyncio.ensure_future(self._top_up_pool(pool, **profile))
+        self._pool_top_ups[pool.profile_key] = task
+        task.add_done_callback(lambda _: self._pool_top_ups.pop(pool.profile_key, None))
+    
+    async def _top_up_pool(self, pool, **profile):
+        """Add a round of new candidates to a pool, marking it exhausted when the providers return nothing new."""
+        try:
+            added, errors = await self._fill_pool(pool, exclude_companies=[rec['name'] for rec in pool.candidates], **profile)
+        except Exception as e:
+            logger.error(f"Error topping up candidate pool: {str(e)}")
+            return
+        if not added and not errors:
+            pool.exhausted = True
+        logger.info(f"Topped up pool {pool.profile_key[:8]} with {added} new candidates ({len(pool)} total)")
+    
+    def start_speculative_generation(self):
+        """
+        Start generating the candidate pool before onboarding is complete.
+        
+        Called once product, market, differentiation and company size are answered. The pool
+        is generated without location and cached under the product/market/size fingerprint,
+        so the completed profile rescores it; a request made while it is still running joins it.
+        Returns True if a generation was started.
+        """
+        if not self.use_llm or not self.speculative:
+            return False
+        product, market, company_size, _, _, keywords = self._get_profile()
+        base_key = base_fingerprint(product, market, company_size)
+        if self._pending_speculation(base_key) is not None:
+            return False
+        _, state = self.recommendation_cache.get(base_key)
+        if state == 'fresh':
+            return False
+        
+        logger.info(f"Starting speculative generation for pool {base_key[:8]}")
+        task = asyncio.ensure_future(self._get_or_generate_pool(
+            profile_fingerprint(product, market, company_size, "", keywords),
+            base_key,
+            product=product,
+            market=market,
+            company_size=company_size,
+            zip_code="",
+            keywords=KeywordSet(keywords),
+            linkedin_consent=False,
+            verify=True
+        ))
+        # Nobody may ever await the speculation, so don't leave its exception unretrieved
+        task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._speculation = (base_key, task)
+        return True
+    
+    def _pending_speculation(self, base_key):
+        """Get the speculative generation task still running for a product/market/size fingerprint, if any."""
+        if self._speculation is None:
+            return None
+        speculation_key, task = self._speculation
+        if task.done():
+            self._speculation = None
+            return None
+        return task if speculation_key == base_key else None
+    
+    async def _join_speculation(self, timeout, profile_key, base_key, **profile):
+        """
+        Wait up to timeout seconds for the speculative generation, then rescore its pool for the full profile.
+        
+        Falls back to generating for the full profile when the finished pool no longer covers
+        the keywords, and to a stale pool or the local tier when the speculation misses the deadline.
+        Returns a (pool, tier) tuple like _get_pool_within_deadline.
+        """
+        started = time.monotonic()
+        task = self._pending_speculation(base_key)
+        try:
+            if task is not None:
+                await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Speculative pool not ready within {timeout:.1f}s, generation continues in the background")
+            pool = self._cached_pool(profile_key, base_key)
+            return (pool, "stale") if pool is not None else (None, "local")
+        except Exception as e:
+            logger.error(f"Error in speculative generation: {str(e)}")
+        
+        pool, _ = self._find_rescorable_pool(
+            profile_key, base_key, profile['keywords'],
+            profile_fingerprint(profile['product'], profile['market'], profile['company_size'], "", profile['keywords'])
+        )
+        if pool is not None:
+            logger.info("Serving the speculatively generated pool")
+            return pool, "fresh"
+        remaining = max(0.0, timeout - (time.monotonic() - started)) if timeout is not None else None
+        return await self._get_pool_within_deadline(remaining, profile_key, base_key, **profile)
+    
+    async def _get_pool_within_deadline(self, timeout, profile_key, base_key, **profile):
+        """
+        Wait up to timeout seconds for the candidate pool, then fall back to a stale pool for a similar profile.
+        
+        Generation that misses the deadline keeps running in the background and fills the
+        cache for the next request. Returns a (pool, tier) tuple with pool None when nothing
+        is available.
+        """
+        generation = asyncio.ensure_future(self._get_or_generate_pool(profile_key, base_key, **profile))
+        # Generation may finish after we stop waiting, so don't leave its exception unretrieved
+        generation.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            pool, cache_state = await asyncio.wait_for(asyncio.shield(generation), timeout=timeout)
+            return pool, "stale" if cache_state == "stale" else "fresh"
+        except asyncio.TimeoutError:
+            logger.warning(f"Candidate pool not ready within {timeout:.1f}s, generation continues in the background")
+        except Exception as e:
+            logger.error(f"Error generating candidate pool: {str(e)}")
+        
+        pool = self._cached_pool(profile_key, base_key)
+        return (pool, "stale") if pool is not None else (None, "local")
+    
+    async def _get_or_generate_pool(self, profile_key, base_key, **profile):
+        """Get the pool for a profile from the cache, generating it on a miss, and index it under the base fingerprint."""
+        pool, cache_state = await self.recommendation_cache.get_or_create(
+            profile_key,
+            lambda: self._generate_candidate_pool(profile_key=profile_key, **profile)
+        )
+        if cache_state == 'miss':
+            self.recommendation_cache.set(base_key, pool)
+        return pool, cache_state
+    
+    def _get_local_recommendations(self, profile, count, offset=0):
+        """Recommend from the offline TF-IDF index, used without API keys and as the last tier."""
+        product, market, company_size, zip_code, linkedin_consent, keywords = profile
+        candidates = []
+        if self.local_recommender is not None:
+            candidates = self.local_recommender.recommend(product, market, company_size, keywords, count=count, offset=offset)
+        if not candidates:
+            logger.info("No local matches for the profile, using mock recommendations")
+            return self.scorer.rank(self._get_mock_recommendations(offset + count), keywords, zip_code,
+                                    linkedin_consent=linkedin_consent)[offset:offset + count]
+        return self.scorer.rank(candidates, keywords, zip_code, linkedin_consent=linkedin_consent)
+    
+    async def rerank_recommendations(self, count=3):
+        """Re-rank the cached candidate pool for the current profile without calling the LLM."""
+        product, market, company_size, zip_code, linkedin_consent, keywords = self._get_profile()
+        pool, _ = self._find_rescorable_pool(
+            profile_fingerprint(product, market, company_size, zip_code, keywords),
+            base_fingerprint(product, market, company_size),
+            keywords,
+            profile_fingerprint(product, market, company_size, "", keywords)
+        )
+        if pool is None:
+            return await self.generate_recommendations(count=count)
+        
+        self.last_tier = "fresh"
+        view = pool.rank(self.scorer, keywords, zip_code, self.user_memory, linkedin_consent)
+        return self._remember([rec.copy() for rec in view.page(0, count)])
+    
+    def _find_rescorable_pool(self, profile_key, base_key, keywords, unlocated_key=None):
+        """
+        Find a cached pool for the exact profile, or one generated for the same product/market/size.
+        
+        A pool generated for the same answers before the location was known (unlocated_key, see
+        start_speculative_generation) is reused as is, location only affects ranking. A pool from a
+        different keyword set is only reused while it still covers enough of the new keywords.
+        Reused pools are cached under the new profile key too.
+        
+        Returns a (pool, state) tuple, or (None, None) when the pool has to be generated.
+        """
+        pool, state = self.recommendation_cache.get(profile_key)
+        if state == 'fresh':
+            return pool, state
+        
+        if unlocated_key and unlocated_key != profile_key:
+            pool, state = self.recommendation_cache.get(unlocated_key)
+            if state == 'fresh':
+                self.recommendation_cache.set(profile_key, pool)
+                return pool, 'rescored'
+        
+        pool, state = self.recommendation_cache.get(base_key)
+        if state != 'fresh':
+            return None, None
+        
+        coverage = pool.keyword_coverage(keywords)
+        if coverage < self.keyword_coverage_threshold:
+            logger.info(f"Cached pool covers {coverage:.0%} of the new keywords, regenerating")
+            return None, None
+        
+        self.recommendation_cache.set(profile_key, pool)
+        return pool, 'rescored'
+    
+    def _get_profile(self):
+        """Read the user's profile from the flow controller."""
+        product = self.flow_controller.get_product() if hasattr(self.flow_controller, 'get_product') else ""
+        market = self.flow_controller.get_market() if hasattr(self.flow_controller, 'get_market') else ""
+        company_size = self.flow_controller.get_company_size() if hasattr(self.flow_controller, 'get_company_size') else ""
+        zip_code = self.flow_controller.get_location() if hasattr(self.flow_controller, 'get_location') else ""
+        linkedin_consent = self.flow_controller.get_linkedin_consent() if hasattr(self.flow_controller, 'get_linkedin_consent') else False
+        keywords = self.flow_controller.get_keywords() if hasattr(self.flow_controller, 'get_keywords') else []
+        return product, market, company_size, zip_code, linkedin_consent, keywords
+    
+    async def _generate_candidate_pool(self, profile_key, product, market, company_size, zip_code, keywords, linkedin_consent, verify=True):
+        """
+        Over-generate candidates with parallel prompts using different seeds and dedupe them; each request ranks the pool.
+        
+        Raises an exception if every prompt fails.
+        """
+        pool = CandidatePool(profile_key)
+        _, errors = await self._fill_pool(pool, product, market, company_size, zip_code, keywords, linkedin_consent, verify)
+        
+        if not len(pool):
+            raise Exception(f"No candidates generated: {'; '.join(errors) or 'empty responses'}")
+        
+        logger.info(f"Candidate pool ready with {len(pool)} unique companies")
+        return pool
+    
+    async def _fill_pool(self, pool, product, market, company_size, zip_code, keywords, linkedin_consent, verify=True, exclude_companies=None):
+        """
+        Run one round of parallel prompts with seeds the pool has not used yet and add the results to it.
+        
+        Returns a tuple of (number of new companies, provider errors).
+        """
+        per_prompt = max(3, math.ceil(self.pool_size / self.pool_prompts))
+        seeds = range(pool.rounds * self.pool_prompts, (pool.rounds + 1) * self.pool_prompts)
+        pool.rounds += 1
+        logger.info(f"Generating candidate pool with {self.pool_prompts} prompts of {per_prompt} companies")
+        
+        # Companies we already hold profiles for only need fit reasoning and refreshed fields
+        known_companies = self.company_store.relevant_profiles([product, market] + list(keywords or []))
+        
+        # Real companies from the local index give the LLM a grounded starting point
+        seed_companies = []
+        if self.local_recommender is not None and self.seed_count > 0:
+            excluded = set(exclude_companies or [])
+            seed_companies = [
+                company for company in self.local_recommender.seed_candidates(
+                    product, market, company_size, keywords, limit=self.seed_count + len(excluded)
+                )
+                if company['name'] not in excluded
+            ][:self.seed_count]
+        
+        results = await asyncio.gather(*(
+            self.providers.generate(
+                validate=self._has_named_recommendation,
+                product=product,
+                market=market,
+                company_size=company_size,
+                zip_code=zip_code,
+                keywords=keywords,
+                linkedin_consent=linkedin_consent,
+                count=per_prompt,
+                seed=seed,
+                known_companies=known_companies,
+                seed_companies=seed_companies,
+                exclude_companies=exclude_companies
+            )
+            for seed in seeds
+        ), return_exceptions=True)
+        
+        added = 0
+        errors = []
+        for result in results:
+            if isinstance(result, Exception):
+                errors.append(str(result))
+                continue
+            result, _ = result
+            
+            # Store fresh enrichment, then fill fields the LLM was told to skip from the shared profiles.
+            # Only companies the registry knows by this name and website are stored: the store feeds the
+            # local index and prompt seeds, so a made-up company saved here would come back as a real one.
+            for rec in result:
+                if isinstance(rec, dict) and rec.get('name'):
+                    if self.company_store.registry.lookup(rec['name'], rec.get('website')):
+                        self.company_store.update(rec)
+                    self.company_store.hydrate(rec)
+            
+            if verify:
+                result = [rec for rec in result if self._verify_recommendation(rec)]
+            added += pool.add(result)
+        
+        return added, errors
+    
+    @staticmethod
+    def _has_named_recommendation(recommendations):
+        """Check that a provider response contains at least one usable company"""
+        return any(isinstance(rec, dict) and rec.get('name') for rec in recommendations)
+    
+    async def _generate_with_perplexity(self, product, market, company_size, zip_code, keywords, linkedin_consent, count, seed=None, known_companies=None, seed_companies=None, exclude_companies=None):
+        """Generate recommendations using the Perplexity API (seed is not supported and ignored)"""
         try:
             # Construct a prompt based on user preferences
-            prompt = self._construct_recommendation_prompt(product, market, company_size, zip_code, keywords, linkedin_consent)
+            prompt = self._construct_recommendation_prompt(product, market, company_size, zip_code, keywords, linkedin_consent, count, known_companies, seed_companies, exclude_companies)
             
             # Call the Perplexity API
             async with httpx.AsyncClient() as client:
@@ -169,15 +778,8 @@ class CompanyRecommender:
                     try:
                         recommendations = self._parse_recommendations_from_llm_response(recommendations_text)
                         
-                        # Rank the recommendations based on various factors
-                        ranked_recommendations = self._rank_recommendations(
-                            recommendations=recommendations,
-                            keywords=keywords,
-                            zip_code=zip_code
-                        )
-                        
-                        # Return the top N recommendations
-                        return ranked_recommendations[:count]
+                        # Return every candidate, ranking and truncation happen in generate_recommendations
+                        return recommendations
                     except Exception as e:
                         logger.error(f"Error parsing recommendations: {str(e)}")
                         raise Exception(f"Failed to parse recommendations: {str(e)}")
@@ -189,8 +791,14 @@ class CompanyRecommender:
             logger.error(f"Error generating recommendations with Perplexity: {str(e)}")
             raise Exception(f"Failed to generate recommendations: {str(e)}")
     
-    async def _generate_with_openai(self, product, market, company_size, zip_code, keywords, linkedin_consent, count=5):
-        """Generate recommendations using OpenAI"""
+    async def _generate_with_openai(self, product, market, company_size, zip_code, keywords, linkedin_consent, count=5, seed=None, known_companies=None, seed_companies=None, exclude_companies=None):
+        """
+        Generate recommendations using OpenAI
+        
+        seed, known_companies, seed_companies and exclude_companies are accepted so all providers share one signature, but this
+        provider uses its own prompt and ignores them. Raises an exception on failure so the
+        orchestrator can fall through to another provider.
+        """
         logger.info("Generating recommendations with OpenAI")
         
         # Prepare the system prompt
@@ -230,13 +838,13 @@ class CompanyRecommender:
                     }
                 ],
                 "website": "https://company-website.com",
-                "fit_score": {{
+                "fit_score": {
                     "product_fit": 85,
                     "market_fit": 90,
                     "size_fit": 75,
                     "keyword_fit": 80,
                     "overall_score": 85
-                }}
+                }
             }
         ]
         """
@@ -249,7 +857,7 @@ class CompanyRecommender:
         Target Company Size: {company_size if company_size else 'Not specified'}
         Location (Zip Code): {zip_code if zip_code else 'Not specified'}
         
-        Keywords: {', '.join(keywords) if keywords else 'Not specified'}
+        Keywords: {', '.join(self._prompt_keywords(keywords)) if keywords else 'Not specified'}
         
         Please provide detailed information for each company including investment areas, recent articles with executive quotes, key decision makers, and relevant events they'll be attending.
         Format your response as a valid JSON array of company objects as specified.
@@ -276,32 +884,27 @@ class CompanyRecommender:
             # Extract the response content
             content = response.choices[0].message.content
             
-            # Parse the JSON response
+            # Parse the recommendations from the response
             try:
-                import json
-                recommendations = json.loads(content)
+                recommendations = self._parse_recommendations_from_llm_response(content)
                 
-                # Validate the structure
-                if not isinstance(recommendations, list):
-                    logger.error("OpenAI response is not a list")
-                    return self._get_mock_recommendations(count)
-                
-                # Process and return the recommendations
-                return recommendations[:count]
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse OpenAI response as JSON: {e}")
-                logger.error(f"Raw response: {content}")
-                return self._get_mock_recommendations(count)
+                # Return every candidate, ranking and truncation happen in generate_recommendations
+                return recommendations
+            except Exception as e:
+                logger.error(f"Failed to parse OpenAI response: {e}")
+                logger.error(f"Raw response: {content[:500]}...")
+                raise Exception(f"Failed to parse recommendations: {str(e)}")
                 
         except Exception as e:
             logger.error(f"Error generating recommendations with OpenAI: {e}")
-            return self._get_mock_recommendations(count)
+            raise Exception(f"Failed to generate recommendations: {str(e)}")
     
-    async def _generate_with_gemini(self, product, market, company_size, zip_code, keywords, linkedin_consent, count):
-        """Generate recommendations using the Gemini API"""
+    async def _generate_with_gemini(self, product, market, company_size, zip_code, keywords, linkedin_consent, count, seed=None, known_companies=None, seed_companies=None, exclude_companies=None):
+        """Generate recommendations using the Gemini API, sending only the per-user prompt when the instructions are cached"""
         try:
-            # Construct a prompt based on user preferences
-            prompt = self._construct_recommendation_prompt(product, market, company_size, zip_code, keywords, linkedin_consent)
+            # Construct the per-user part of the prompt based on user preferences
+            suffix = self._construct_recommendation_suffix(product, market, company_size, zip_code, keywords, linkedin_consent, count, known_companies, seed_companies, exclude_companies)
+            full_prompt = f"{RECOMMENDATION_INSTRUCTIONS}\n\n{suffix}"
             
             # Check if API key is valid
             if not self.gemini_api_key or len(self.gemini_api_key) < 10:
@@ -309,33 +912,48 @@ class CompanyRecommender:
                 raise Exception("Invalid Gemini API key")
                 
             # Call the Gemini API with optimized settings
-            async with httpx.AsyncClient(timeout=90.0) as client:  
-                url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.gemini_api_key}"
+            async with httpx.AsyncClient(timeout=90.0) as client:
+                model = "gemini-2.0-flash"
                 
                 # Check if we need to use a more capable model for complex queries
                 use_pro_model = False
-                tech_terms = ["gemini", "flash", "2.0", "ai", "ml", "llm", "gpt", "claude", "anthropic", "openai"]
-                startup_terms = ["startup", "early stage", "seed", "series a", "emerging"]
+                focus_terms = get_matcher(TECH_TERMS + STARTUP_TERMS, whole_words=True)
                 
                 # Use Pro model for more complex queries about startups or specific technologies
-                if (product and any(term in product.lower() for term in tech_terms + startup_terms)) or \
-                   (keywords and any(term in " ".join(keywords).lower() for term in tech_terms + startup_terms)):
+                if focus_terms.search(product or "") or focus_terms.search("\n".join(keywords or [])):
                     use_pro_model = True
-                    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-pro:generateContent?key={self.gemini_api_key}"
+                    model = "gemini-2.0-pro"
                     logger.info("Using Gemini 2.0 Pro model for more detailed startup/technology search")
+                url = f"{self.context_cache.base_url}/v1beta/models/{model}:generateContent?key={self.gemini_api_key}"
+                
+                # Reference the cached instructions if they are uploaded, otherwise send the full prompt
+                cached_content = self.context_cache.lookup(model, RECOMMENDATION_INSTRUCTIONS)
                 
                 data = {
                     "contents": [{
-                        "parts": [{"text": prompt}]
+                        "role": "user",
+                        "parts": [{"text": suffix if cached_content else full_prompt}]
                     }],
                     "generationConfig": {
                         "temperature": 0.2 if not use_pro_model else 0.4,  # Higher temperature for more diverse results with Pro
                         "topP": 0.95,
                         "topK": 40,
-                        "maxOutputTokens": 4096 if not use_pro_model else 8192  # Increased token limit for Pro model
+                        "maxOutputTokens": 4096 if not use_pro_model and count <= 3 else 8192  # Increased token limit for Pro model and larger pools
                     }
                 }
                 
+                # Seeded prompts fan out over the candidate space, so let later seeds sample more freely
+                if seed is not None:
+                    data["generationConfig"]["seed"] = seed
+                    data["generationConfig"]["temperature"] += min(0.4, 0.2 * seed)
+                
+                if cached_content:
+                    data["cachedContent"] = cached_content
+                
+                if self.structured_output:
+                    data["generationConfig"]["responseMimeType"] = "application/json"
+                    data["generationConfig"]["responseSchema"] = RECOMMENDATIONS_SCHEMA
+                
                 logger.info(f"Calling Gemini {'2.0 Pro' if use_pro_model else '2.0 Flash'} API for recommendations")
                 response = await client.post(
                     url,
@@ -343,9 +961,19 @@ class CompanyRecommender:
                     timeout=90.0  # Increased timeout for more detailed responses
                 )
                 
+                # An expired or deleted cache is rejected; drop it and send the full prompt
+                if cached_content and response.status_code in (400, 403, 404):
+                    logger.warning(f"Gemini rejected context cache {cached_content} ({response.status_code}), retrying with the full prompt")
+                    self.context_cache.forget(model, RECOMMENDATION_INSTRUCTIONS)
+                    del data["cachedContent"]
+                    data["contents"][0]["parts"][0]["text"] = full_prompt
+                    response = await client.post(url, json=data, timeout=90.0)
+                
                 if response.status_code == 200:
                     result = response.json()
-                    logger.info("Received response from Gemini API")
+                    usage = result.get("usageMetadata", {})
+                    logger.info(f"Received response from Gemini API ({usage.get('promptTokenCount')} prompt tokens, "
+                                f"{usage.get('cachedContentTokenCount', 0)} cached)")
                     
                     if "candidates" in result and len(result["candidates"]) > 0:
                         content = result["candidates"][0]["content"]
@@ -355,11 +983,15 @@ class CompanyRecommender:
                             
                             # Parse the recommendations from the response
                             try:
-                                recommendations = self._parse_recommendations_from_llm_response(recommendations_text)
+                                if self.structured_output:
+                                    # Schema-conforming JSON decodes directly, without text extraction or repair
+                                    recommendations = [record.to_dict() for record in decode_recommendations(recommendations_text)]
+                                else:
+                                    recommendations = self._parse_recommendations_from_llm_response(recommendations_text)
                                 logger.info(f"Successfully parsed {len(recommendations)} recommendations")
                                 
-                                # Return the recommendations
-                                return recommendations[:count]
+                                # Return every candidate, ranking and truncation happen in generate_recommendations
+                                return recommendations
                             except Exception as e:
                                 logger.error(f"Error parsing recommendations: {str(e)}")
                                 logger.error(f"Raw response: {recommendations_text[:500]}...")
@@ -375,10 +1007,15 @@ class CompanyRecommender:
             logger.error(f"Error generating recommendations with Gemini: {str(e)}")
             raise Exception(f"Failed to generate recommendations: {str(e)}")
     
-    def _construct_recommendation_prompt(self, product, market, company_size, zip_code, keywords, linkedin_consent):
-        """Construct a prompt for the LLM to generate company recommendations"""
-        # Format keywords as a comma-separated list
-        keywords_context = ", ".join(keywords) if keywords else "No specific keywords provided"
+    def _construct_recommendation_prompt(self, product, market, company_size, zip_code, keywords, linkedin_consent, count=3, known_companies=None, seed_companies=None, exclude_companies=None):
+        """Construct a prompt for the LLM to generate company recommendations: the static instructions followed by the user's profile"""
+        suffix = self._construct_recommendation_suffix(product, market, company_size, zip_code, keywords, linkedin_consent, count, known_companies, seed_companies, exclude_companies)
+        return f"{RECOMMENDATION_INSTRUCTIONS}\n\n{suffix}"
+    
+    def _construct_recommendation_suffix(self, product, market, company_size, zip_code, keywords, linkedin_consent, count=3, known_companies=None, seed_companies=None, exclude_companies=None):
+        """Construct the per-user part of the recommendation prompt, keeping the whole prompt within the "recommendations" token budget"""
+        # Format the most relevant keywords as a comma-separated list
+        keywords_context = ", ".join(self._prompt_keywords(keywords)) if keywords else "No specific keywords provided"
         
         # Add location context if available
         location_context = f"LOCATION: {zip_code}" if zip_code else "LOCATION: Not specified"
@@ -386,31 +1023,81 @@ class CompanyRecommender:
         # Add LinkedIn context if available
         linkedin_context = "LinkedIn data is available for network-based recommendations." if linkedin_consent else "LinkedIn data is not available."
         
-        # Get user preference context from memory
-        user_preference_context = self.user_memory.get_llm_preference_prompt() if hasattr(self, 'user_memory') else ""
+        # No user preferences here: the pool is cached and shared by everyone with this profile,
+        # each user's liked and disliked companies are applied when the pool is ranked for them
         
         from datetime import datetime
         current_date = datetime.now().strftime("%Y-%m-%d")
         
         # Check if we're looking for startups specifically
+        keyword_text = "\n".join(keywords or [])
         startup_focus = ""
-        if product and "startup" in product.lower():
-            startup_focus = "\nIMPORTANT: Focus specifically on EARLY-STAGE STARTUPS and EMERGING COMPANIES rather than established enterprises."
-        elif company_size and any(term in company_size.lower() for term in ["small", "startup", "early", "seed", "series a"]):
-            startup_focus = "\nIMPORTANT: Focus specifically on EARLY-STAGE STARTUPS and EMERGING COMPANIES rather than established enterprises."
-        elif keywords and any(term in " ".join(keywords).lower() for term in ["startup", "early stage", "seed", "series a", "emerging"]):
+        if get_matcher(("startup",)).search(product or "") or \
+           get_matcher(STARTUP_SIZE_TERMS).search(company_size or "") or \
+           get_matcher(STARTUP_TERMS, whole_words=True).search(keyword_text):
             startup_focus = "\nIMPORTANT: Focus specifically on EARLY-STAGE STARTUPS and EMERGING COMPANIES rather than established enterprises."
         
         # Check if we're looking for companies using specific technologies
         tech_focus = ""
-        tech_terms = ["gemini", "flash", "2.0", "ai", "ml", "llm", "gpt", "claude", "anthropic", "openai"]
-        if product and any(term in product.lower() for term in tech_terms):
+        tech_matcher = get_matcher(TECH_TERMS, whole_words=True)
+        matching_terms = tech_matcher.matches(keyword_text)
+        if tech_matcher.search(product or ""):
             tech_focus = f"\nIMPORTANT: Focus on companies that are actively using or developing {product} technology."
-        elif keywords and any(term in " ".join(keywords).lower() for term in tech_terms):
-            matching_terms = [term for term in tech_terms if term in " ".join(keywords).lower()]
+        elif matching_terms:
             tech_focus = f"\nIMPORTANT: Focus on companies that are actively using or developing {', '.join(matching_terms)} technology."
         
-        return f"""You are a financial analyst specializing in B2B company research. Generate TARGET company recommendations for a B2B sales professional with the following profile:
+        # Tell the LLM which companies we already have profiles for, so it only returns what we lack
+        known_context = ""
+        if known_companies:
+            lines = []
+            for company in known_companies:
+                stale = ", ".join(company['stale_fields']) if company['stale_fields'] else "nothing"
+                lines.append(f"- {company['name']} ({company['domain'] or 'no website'}): refresh {stale}")
+            known_context = (
+                "\n\nKNOWN COMPANY PROFILES: We already hold up-to-date profiles for the companies below. "
+                "If you recommend one of them, return only \"name\", \"website\", \"fit_reason\" and the fields listed "
+                "after \"refresh\", and omit every other field:\n" + "\n".join(lines)
+            )
+        
+        # Real companies from the local index that match the profile
+        seed_context = ""
+        if seed_companies:
+            lines = [f"- {company['name']} ({company['domain']}, {company['industry'] or 'industry unknown'})" for company in seed_companies]
+            seed_context = (
+                "\n\nCANDIDATE COMPANIES: These real companies from our index match the profile. Consider them "
+                "alongside others you know of, and only recommend them if they are genuinely good customers:\n" + "\n".join(lines)
+            )
+        
+        # Companies already in the candidate pool, when generating more for "load more"
+        exclude_context = ""
+        if exclude_companies:
+            exclude_context = (
+                "\n\nALREADY RECOMMENDED: Do NOT recommend any of these companies again: " + ", ".join(exclude_companies)
+            )
+        
+        # Optional sections, most important first, are shortened or dropped when the prompt runs over budget
+        sections = {
+            'exclude': exclude_context,
+            'known': known_context,
+            'seeds': seed_context
+        }
+        def render(sections):
+            return self._render_recommendation_prompt(
+                product, market, company_size, keywords_context, location_context, linkedin_context, current_date,
+                startup_focus, tech_focus, sections, count
+            )
+        fixed = f"{RECOMMENDATION_INSTRUCTIONS}\n\n{render(dict.fromkeys(sections, ''))}"
+        return render(self.prompt_budget.fit('recommendations', fixed, sections))
+    
+    def _prompt_keywords(self, keywords):
+        """The highest-weighted keywords that fit the keyword share of the recommendation prompt."""
+        return self.prompt_budget.select_keywords(keywords, max_tokens=self.prompt_budget.budget('recommendations') // 20)
+    
+    @staticmethod
+    def _render_recommendation_prompt(product, market, company_size, keywords_context, location_context, linkedin_context,
+                                      current_date, startup_focus, tech_focus, sections, count):
+        """Fill the recommendation prompt template."""
+        return f"""Generate TARGET company recommendations for a B2B sales professional with the following profile:
 
 PRODUCT/SERVICE: {product}
 TARGET MARKET/INDUSTRY: {market}
@@ -421,65 +1108,11 @@ KEYWORDS: {keywords_context}
 
 CURRENT DATE: {current_date}
 
-{user_preference_context}{startup_focus}{tech_focus}
-
-IMPORTANT CLARIFICATION: The user is selling {product} to companies in the {market} market. I need you to recommend POTENTIAL CUSTOMER COMPANIES that the user could sell to, NOT competitors who offer similar products. Focus on companies that might NEED or BUY {product}.
+{startup_focus}{tech_focus}{sections['known']}{sections['seeds']}{sections['exclude']}
 
-IMPORTANT: Focus on REAL companies only. DO NOT make up or hallucinate information. If you're uncertain about details, provide less information rather than inventing facts. Only include information you are confident is accurate.
-
-For each company, you MUST provide ALL of the following information:
-1. Company name (must be a real company)
-2. Website URL (must be a real website)
-3. Industry (specific industry the company operates in)
-4. Company size (employees or revenue)
-5. Brief description (1-2 sentences about what they actually do)
-6. Current year's investment areas and focus (list at least 3 specific areas)
-7. Budget allocation information (how they're allocating resources)
-8. 2-3 recent news articles with direct quotes from executives (include the source, date, and URL for each)
-9. 3-5 key leads/decision makers with titles, emails, and LinkedIn profiles
-10. Upcoming events where company representatives will be present (include date, location, and URL)
+The user is selling {product} to companies in the {market} market. Recommend companies that might NEED or BUY {product}.
 
-Take your time to provide detailed, high-quality recommendations. Quality is more important than speed.
-
-Format each recommendation as a JSON object with the following structure:
-{{
-  "name": "Company Name",
-  "website": "https://company-website.com",
-  "industry": "Industry",
-  "size": "Size (employees/revenue)",
-  "description": "Brief description",
-  "investment_areas": ["Area 1", "Area 2", "Area 3"],
-  "budget_allocation": "Budget allocation details",
-  "articles": [
-    {{
-      "title": "Article Title",
-      "source": "Source Name",
-      "date": "Publication Date",
-      "url": "https://article-url.com",
-      "quote": "Direct quote from executive"
-    }}
-  ],
-  "leads": [
-    {{
-      "name": "Lead Name",
-      "title": "Job Title",
-      "email": "email@company.com",
-      "linkedin": "https://linkedin.com/in/profile"
-    }}
-  ],
-  "events": [
-    {{
-      "name": "Event Name",
-      "date": "Event Date",
-      "location": "Event Location",
-      "url": "https://event-url.com",
-      "description": "Brief description of the event and why it's relevant",
-      "attending_companies": ["Company 1", "Company 2"]
-    }}
-  ]
-}}
-
-Return your response as a valid JSON array of company objects. Include at least 3 detailed company recommendations.
+Include at least {count} detailed company recommendations.
 """
     
     def _parse_recommendations_from_llm_response(self, response: str) -> List[Dict]:
@@ -534,229 +1167,6 @@ Return your response as a valid JSON array of company objects. Include at least
             logger.error(f"Response: {response[:500]}...")
             raise Exception(f"Failed to parse recommendations: {str(e)}")
     
-    def _validate_recommendations_quality(self, recommendations, product, market, company_size):
-        """
-        Validate that recommendations meet quality standards
-        Returns True if recommendations are valid, False otherwise
-        """
-        # Skip validation for test runs
-        if product and "test" in product.lower():
-            logger.info("Test product detected, skipping validation")
-            return True
-            
-        # Check if we have recommendations
-        if not recommendations or len(recommendations) == 0:
-            logger.error("No recommendations provided")
-            return False
-            
-        # Check each recommendation for required fields
-        for i, rec in enumerate(recommendations):
-            if not isinstance(rec, dict):
-                logger.error(f"Recommendation {i+1} is not a dictionary")
-                return False
-                
-            # Check for required fields
-            required_fields = ['name', 'description', 'fit_reason']
-            missing_fields = [field for field in required_fields if field not in rec or not rec[field]]
-            
-            if missing_fields:
-                logger.error(f"Recommendation {i+1} ({rec.get('name', 'Unknown')}) is missing required fields: {', '.join(missing_fields)}")
-                return False
-                
-            # Validate fit scores if present
-            if 'fit_score' in rec and isinstance(rec['fit_score'], dict):
-                score_fields = ['product_fit', 'market_fit', 'size_fit', 'keyword_fit', 'overall_score']
-                for field in score_fields:
-                    if field not in rec['fit_score']:
-                        logger.warning(f"Recommendation {i+1} ({rec['name']}) is missing fit score field: {field}")
-                        # Add default score
-                        if 'fit_score' not in rec:
-                            rec['fit_score'] = {}
-                        rec['fit_score'][field] = 75
-            else:
-                # Add default fit scores
-                logger.warning(f"Recommendation {i+1} ({rec['name']}) is missing fit scores, adding defaults")
-                rec['fit_score'] = {
-                    'product_fit': 75,
-                    'market_fit': 75,
-                    'size_fit': 75,
-                    'keyword_fit': 75,
-                    'overall_score': 75
-                }
-                
-            # Ensure recent_news is properly formatted
-            if 'recent_news' in rec:
-                if isinstance(rec['recent_news'], list):
-                    # Convert string items to structured format
-                    for j, news in enumerate(rec['recent_news']):
-                        if isinstance(news, str):
-                            rec['recent_news'][j] = {
-                                'title': 'Investment Focus',
-                                'date': 'March 2025',
-                                'summary': news,
-                                'url': ''
-                            }
-                elif isinstance(rec['recent_news'], str):
-                    # Convert single string to structured format
-                    rec['recent_news'] = [{
-                        'title': 'Investment Focus',
-                        'date': 'March 2025',
-                        'summary': rec['recent_news'],
-                        'url': ''
-                    }]
-            else:
-                rec['recent_news'] = [{
-                    'title': 'Investment Focus',
-                    'date': 'March 2025',
-                    'summary': 'No investment information available.',
-                    'url': ''
-                }]
-                
-            # Ensure events is properly formatted
-            if 'events' not in rec or not rec['events']:
-                rec['events'] = [{
-                    'name': 'No upcoming events',
-                    'date': 'TBD',
-                    'location': 'N/A',
-                    'url': '',
-                    'description': 'No upcoming events available for this company.'
-                }]
-                
-        logger.info(f"Validated {len(recommendations)} recommendations, all meet quality standards")
-        return True
-    
-    def _rank_recommendations(self, recommendations: List[Dict], keywords: List[str], zip_code: str) -> List[Dict]:
-        """
-        Rank recommendations based on various factors
-        
-        Ranking factors:
-        1. Fit score provided by the LLM
-        2. Recency of news articles
-        3. Number of key personnel with relevant quotes
-        4. Upcoming events (more recent events score higher)
-        5. Location proximity if zip code is provided
-        6. Keyword relevance in company description and news
-        """
-        for company in recommendations:
-            # Start with the base fit score from the LLM
-            base_score = company.get("fit_score", {}).get("overall_score", 50)
-            
-            # Initialize additional scores
-            news_score = 0
-            personnel_score = 0
-            events_score = 0
-            location_score = 0
-            keyword_score = 0
-            
-            # Calculate news score based on recency and priority sources
-            news_articles = company.get("news", [])
-            if news_articles:
-                for article in news_articles:
-                    # Check if the source is a priority source
-                    source = article.get("source", "").lower()
-                    priority_multiplier = 1.5 if any(ps in source for ps in self.priority_news_sources) else 1.0
-                    
-                    # Calculate recency score (more recent = higher score)
-                    try:
-                        date_str = article.get("date", "")
-                        if date_str:
-                            date = datetime.strptime(date_str, "%Y-%m-%d")
-                            days_ago = (datetime.now() - date).days
-                            recency_score = max(0, 365 - days_ago) / 365 * 10  # 0-10 points based on recency
-                            news_score += recency_score * priority_multiplier
-                    except:
-                        # If date parsing fails, give a default score
-                        news_score += 5 * priority_multiplier
-                
-                # Normalize news score to 0-20 range
-                news_score = min(20, news_score)
-            
-            # Calculate personnel score based on relevant quotes and positions
-            personnel = company.get("personnel", [])
-            if personnel:
-                for person in personnel:
-                    # Higher scores for C-level executives
-                    title = person.get("title", "").lower()
-                    if "ceo" in title or "cto" in title or "cfo" in title or "chief" in title:
-                        personnel_score += 3
-                    elif "vp" in title or "vice president" in title or "director" in title:
-                        personnel_score += 2
-                    else:
-                        personnel_score += 1
-                    
-                    # Additional points for having a recent quote
-                    if person.get("recent_quote"):
-                        personnel_score += 2
-                
-                # Normalize personnel score to 0-15 range
-                personnel_score = min(15, personnel_score)
-            
-            # Calculate events score based on upcoming events
-            events = company.get("events", [])
-            if events:
-                for event in events:
-                    # Check if the event source is a priority source
-                    event_url = event.get("url", "").lower()
-                    priority_multiplier = 1.5 if any(ps in event_url for ps in self.priority_event_sources) else 1.0
-                    
-                    # Calculate timing score (upcoming events score higher)
-                    try:
-                        date_str = event.get("date", "")
-                        if date_str:
-                            event_date = datetime.strptime(date_str, "%Y-%m-%d")
-                            days_until = (event_date - datetime.now()).days
-                            if 0 <= days_until <= 90:  # Event within next 90 days
-                                timing_score = (90 - days_until) / 90 * 10  # 0-10 points based on how soon
-                                events_score += timing_score * priority_multiplier
-                    except:
-                        # If date parsing fails, give a default score
-                        events_score += 5 * priority_multiplier
-                
-                # Normalize events score to 0-15 range
-                events_score = min(15, events_score)
-            
-            # Calculate location score if zip code is provided
-            if zip_code:
-                # For now, this is a placeholder. In a real implementation, this would
-                # use a geocoding service to calculate proximity
-                location_score = 10 if "location" in company else 0
-            
-            # Calculate keyword relevance score
-            if keywords:
-                description = company.get("description", "").lower()
-                keyword_matches = sum(1 for kw in keywords if kw.lower() in description)
-                keyword_score = min(10, keyword_matches * 2)  # 2 points per keyword match, max 10
-            
-            # Calculate final score
-            # Base score (0-100) contributes 40% of final score
-            # Other factors contribute 60% of final score
-            final_score = (
-                base_score * 0.4 +
-                news_score * 0.15 +
-                personnel_score * 0.15 +
-                events_score * 0.15 +
-                location_score * 0.05 +
-                keyword_score * 0.1
-            )
-            
-            # Add the ranking factors to the company object
-            company["ranking"] = {
-                "final_score": round(final_score, 2),
-                "factors": {
-                    "base_score": base_score,
-                    "news_score": round(news_score, 2),
-                    "personnel_score": round(personnel_score, 2),
-                    "events_score": round(events_score, 2),
-                    "location_score": round(location_score, 2),
-                    "keyword_score": round(keyword_score, 2)
-                }
-            }
-        
-        # Sort recommendations by final score (descending)
-        ranked_recommendations = sorted(recommendations, key=lambda x: x.get("ranking", {}).get("final_score", 0), reverse=True)
-        
-        return ranked_recommendations
-
     def _get_mock_recommendations(self, count=5):
         """Generate mock recommendations for testing or when API calls fail"""
         logger.info(f"Generating {count} mock recommendations")
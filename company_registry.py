@@ -0,0 +1,335 @@
+"""
+Company Registry Module
+
+This module provides an in-process company existence index so that recommended
+companies can be checked without scraping a search engine. Known companies are
+stored in a sorted, memory-mapped table keyed by normalized name, alias and
+domain, and companies whose own website confirmed them are remembered in a
+learned tier that is saved to disk in batches.
+"""
+
+import csv
+import json
+import logging
+import mmap
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from quote_matcher import tokenize
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Legal and filler words that don't distinguish one company from another
+_NAME_NOISE_WORDS = frozenset([
+    'the', 'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'llc',
+    'ltd', 'limited', 'plc', 'gmbh', 'ag', 'sa', 'lp', 'llp'
+])
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Normalize a company name for lookups
+
+    Folds case, diacritics and punctuation and drops legal suffixes, so that
+    "The Boeing Company" and "boeing" share a key.
+
+    Args:
+        name: Company name as written
+
+    Returns:
+        Normalized name key, empty if nothing distinctive is left
+    """
+    tokens = [t for t in tokenize(name or "") if t not in _NAME_NOISE_WORDS]
+    return " ".join(tokens)
+
+
+def canonical_domain(url: str) -> str:
+    """
+    Reduce a URL or host name to a canonical lowercase domain
+
+    Args:
+        url: Website URL or bare domain
+
+    Returns:
+        Domain without scheme, "www." prefix, port or path
+    """
+    if not url:
+        return ""
+    url = url.strip().lower()
+    host = urlparse(url if "://" in url else f"//{url}").hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+class SortedTable:
+    """Read-only memory-mapped table of tab-separated lines sorted by their first field"""
+
+    def __init__(self, path: str):
+        """
+        Open the table
+
+        Args:
+            path: Path to a file written by build_registry_table()
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.size = size
+
+    def close(self) -> None:
+        if self.size:
+            self._mm.close()
+        self._file.close()
+
+    def _line_end(self, start: int) -> int:
+        end = self._mm.find(b'\n', start)
+        return self.size if end < 0 else end
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Return the offset of the first line whose key is >= key"""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._mm.rfind(b'\n', 0, mid) + 1
+            end = self._line_end(start)
+            line_key = self._mm[start:end].split(b'\t', 1)[0]
+            if line_key < key:
+                lo = end + 1
+            else:
+                hi = start
+        return lo
+
+    def _rows_from(self, offset: int) -> Iterable[Tuple[str, List[str]]]:
+        while offset < self.size:
+            end = self._line_end(offset)
+            fields = self._mm[offset:end].decode('utf-8').split('\t')
+            yield fields[0], fields[1:]
+            offset = end + 1
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Look up a key with a binary search over the mapped file
+
+        Args:
+            key: Exact key
+
+        Returns:
+            Remaining fields of the matching line, or None
+        """
+        for line_key, fields in self._rows_from(self._lower_bound(key.encode('utf-8'))):
+            return fields if line_key == key else None
+        return None
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[Tuple[str, List[str]]]:
+        """
+        List entries whose key starts with a prefix
+
+        Args:
+            prefix: Key prefix
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of (key, fields) tuples in key order
+        """
+        results = []
+        for line_key, fields in self._rows_from(self._lower_bound(prefix.encode('utf-8'))):
+            if not line_key.startswith(prefix) or len(results) >= limit:
+                break
+            results.append((line_key, fields))
+        return results
+
+
+def build_registry_table(source_path: str, table_path: str) -> int:
+    """
+    Build the sorted registry table from a CSV of companies
+
+    The CSV has name, domain and aliases columns, with aliases separated by "|";
+    other columns (industry, size, headquarters, description) are used by the local recommender.
+    Every name, alias and domain becomes its own key pointing at the company.
+
+    Args:
+        source_path: CSV source file
+        table_path: Output table file
+
+    Returns:
+        Number of keys written
+    """
+    entries: Dict[bytes, bytes] = {}
+    with open(source_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = (row.get('name') or '').strip()
+            domain = canonical_domain(row.get('domain') or '')
+            if not name:
+                continue
+            keys = [normalize_company_name(name), domain]
+            keys += [normalize_company_name(alias) for alias in (row.get('aliases') or '').split('|')]
+            for key in keys:
+                if key:
+                    entries.setdefault(key.encode('utf-8'), f"{name}\t{domain}".encode('utf-8'))
+
+    tmp_path = f"{table_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for key in sorted(entries):
+            f.write(key + b'\t' + entries[key] + b'\n')
+    os.replace(tmp_path, table_path)
+
+    logger.info(f"Built company registry table with {len(entries)} keys at {table_path}")
+    return len(entries)
+
+
+class CompanyRegistry:
+    """Answers company existence checks from a bundled table and a learned tier"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = CompanyRegistry()
+        return cls._instance
+
+    def __init__(self, source_path: Optional[str] = None, table_path: Optional[str] = None, learned_path: Optional[str] = None,
+                 save_delay: float = 5.0):
+        """
+        Initialize the registry, rebuilding the table if the CSV source is newer
+
+        Args:
+            source_path: CSV of known companies
+            table_path: Sorted table built from the CSV
+            learned_path: JSON file of companies verified over the network
+            save_delay: Seconds learned companies are collected before they are written in one batch
+        """
+        self.source_path = source_path or os.path.join(DATA_DIR, "companies.csv")
+        self.table_path = table_path or os.path.join(DATA_DIR, "company_registry.tsv")
+        self.learned_path = learned_path or os.path.join(DATA_DIR, "verified_companies.json")
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+
+        self.table = None
+        try:
+            if os.path.exists(self.source_path) and (
+                not os.path.exists(self.table_path)
+                or os.path.getmtime(self.table_path) < os.path.getmtime(self.source_path)
+            ):
+                build_registry_table(self.source_path, self.table_path)
+            if os.path.exists(self.table_path):
+                self.table = SortedTable(self.table_path)
+        except Exception as e:
+            logger.error(f"Error loading company registry table: {str(e)}")
+
+        self.learned: Dict[str, Dict[str, str]] = {}
+        try:
+            if os.path.exists(self.learned_path):
+                with open(self.learned_path) as f:
+                    self.learned = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading learned companies: {str(e)}")
+
+    def _get(self, key: str) -> Optional[Dict[str, str]]:
+        """Entry for a normalized name or domain key, learned entries first"""
+        if not key:
+            return None
+        if key in self.learned:
+            return {**self.learned[key], 'source': 'learned'}
+        fields = self.table.get(key) if self.table is not None else None
+        if fields:
+            return {'name': fields[0], 'domain': fields[1], 'source': 'registry'}
+        return None
+
+    def lookup(self, name: str, website: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        Check whether a company is known, by name, alias or website domain
+
+        When both are given and the domain is known, the name must belong to the
+        company at that domain: a made-up company with a real website is not known.
+
+        Args:
+            name: Company name
+            website: Company website URL, if known
+
+        Returns:
+            Dictionary with name, domain and source ('registry' or 'learned'),
+            or None if the company is not known
+        """
+        name_key = normalize_company_name(name)
+        by_name = self._get(name_key)
+        by_domain = self._get(canonical_domain(website or ''))
+        if by_domain is None or not name_key:
+            return by_name or by_domain
+        if normalize_company_name(by_domain['name']) == name_key or (by_name and by_name['domain'] == by_domain['domain']):
+            return by_domain
+        logger.info(f"{name} does not match {by_domain['name']}, the company at {by_domain['domain']}")
+        return None
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        List known companies whose normalized name starts with a prefix
+
+        Args:
+            prefix: Name prefix as typed
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of dictionaries with name and domain
+        """
+        key = normalize_company_name(prefix)
+        if not key or self.table is None:
+            return []
+        seen = set()
+        suggestions = []
+        for _, (company, domain) in self.table.prefix(key, limit * 2):
+            if company not in seen:
+                seen.add(company)
+                suggestions.append({'name': company, 'domain': domain})
+        return suggestions[:limit]
+
+    def learn(self, name: str, website: str) -> None:
+        """
+        Remember a company whose own website confirmed it
+
+        Only call this with evidence from the company's domain; search result pages echo
+        the query, so finding the name there would store made-up companies for good.
+        The learned tier is written to disk in the background, batching companies
+        learned within save_delay seconds.
+
+        Args:
+            name: Company name
+            website: Company website URL
+        """
+        entry = {
+            'name': name,
+            'domain': canonical_domain(website or ''),
+            'verified_at': datetime.now().isoformat()
+        }
+        if not entry['domain']:
+            return
+        with self._lock:
+            for key in (normalize_company_name(name), entry['domain']):
+                if key:
+                    self.learned[key] = entry
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def save(self) -> None:
+        """Write the learned tier to disk"""
+        with self._lock:
+            self._save_timer = None
+            learned = dict(self.learned)
+        try:
+            tmp_path = f"{self.learned_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(learned, f, indent=2)
+            os.replace(tmp_path, self.learned_path)
+        except Exception as e:
+            logger.error(f"Error saving learned companies: {str(e)}")
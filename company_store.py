@@ -0,0 +1,259 @@
+"""
+Company Store Module
+
+This module keeps one shared profile per company, keyed by canonical website
+domain, so that expensive enrichment (description, investment areas, articles,
+leads, events) generated for one user can be reused for every other user who
+gets the same company recommended. Each field carries its own timestamp and
+is only asked for again once it goes stale.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from company_registry import DATA_DIR, CompanyRegistry, canonical_domain, normalize_company_name
+from recommendation_cache import normalize_terms
+
+logger = logging.getLogger(__name__)
+
+# How long each enrichment field stays fresh, in days
+FIELD_TTL_DAYS = {
+    'website': 365,
+    'headquarters': 365,
+    'industry': 180,
+    'size': 90,
+    'description': 90,
+    'investment_areas': 30,
+    'budget_allocation': 30,
+    'leads': 60,
+    'articles': 14,
+    'events': 7,
+}
+
+
+class CompanyProfileStore:
+    """Shared store of company enrichment with per-field freshness"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = CompanyProfileStore()
+        return cls._instance
+
+    def __init__(self, path: Optional[str] = None, registry: Optional[CompanyRegistry] = None, save_delay: float = 5.0):
+        """
+        Initialize the store
+
+        Args:
+            path: JSON file the profiles are persisted to
+            registry: Company registry used to resolve name variants to a domain
+            save_delay: Seconds updates are collected before the store is written in one batch
+        """
+        self.path = path or os.path.join(DATA_DIR, "company_profiles.json")
+        self.registry = registry or CompanyRegistry.get_instance()
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self.profiles: Dict[str, Dict] = {}
+        self._aliases: Dict[str, str] = {}
+        self._terms: Dict[str, set] = {}
+
+        try:
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    self.profiles = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading company profiles: {str(e)}")
+
+        for key, profile in self.profiles.items():
+            self._index(key, profile)
+
+    def _index(self, key: str, profile: Dict) -> None:
+        """Index a profile's name variants and descriptive terms"""
+        for alias in profile.get('aliases', []):
+            self._aliases[normalize_company_name(alias)] = key
+        if profile.get('domain'):
+            self._aliases[profile['domain']] = key
+
+        fields = profile.get('fields', {})
+        text = " ".join([profile.get('name', '')] + [
+            json.dumps(fields[field]['value']) if not isinstance(fields[field]['value'], str) else fields[field]['value']
+            for field in ('industry', 'description', 'investment_areas') if field in fields
+        ])
+        self._terms[key] = set(normalize_terms(text))
+
+    def resolve(self, name: str, website: Optional[str] = None) -> str:
+        """
+        Resolve a company to its store key, merging name variants onto one entity
+
+        Args:
+            name: Company name as written
+            website: Company website, if known
+
+        Returns:
+            Canonical domain, or "name:<normalized name>" when no domain is known
+        """
+        domain = canonical_domain(website or '')
+        name_key = normalize_company_name(name)
+
+        if domain:
+            return domain
+        if name_key in self._aliases:
+            return self._aliases[name_key]
+
+        known = self.registry.lookup(name)
+        if known and known.get('domain'):
+            return known['domain']
+        return f"name:{name_key}"
+
+    def get(self, name: str, website: Optional[str] = None) -> Optional[Dict]:
+        """Get the stored profile for a company, if any"""
+        return self.profiles.get(self.resolve(name, website))
+
+    def stale_fields(self, profile: Optional[Dict], now: Optional[float] = None) -> List[str]:
+        """
+        List enrichment fields that are missing or past their freshness window
+
+        Args:
+            profile: Stored profile, or None for an unknown company
+            now: Reference timestamp
+
+        Returns:
+            Names of fields that need to be (re)generated
+        """
+        now = now or time.time()
+        fields = (profile or {}).get('fields', {})
+        return [
+            field for field, ttl_days in FIELD_TTL_DAYS.items()
+            if field not in fields or now - fields[field]['updated_at'] > ttl_days * 86400
+        ]
+
+    def update(self, rec: Dict) -> str:
+        """
+        Store the enrichment fields present in a recommendation
+
+        The store is written to disk in the background, batching updates made
+        within save_delay seconds.
+
+        Args:
+            rec: Company recommendation from the LLM
+
+        Returns:
+            Store key of the company
+        """
+        name = rec.get('name', '')
+        key = self.resolve(name, rec.get('website'))
+        now = time.time()
+
+        with self._lock:
+            # A name-keyed entity learned its domain, so move it under the domain
+            name_key = f"name:{normalize_company_name(name)}"
+            if key != name_key and name_key in self.profiles:
+                merged = self.profiles.pop(name_key)
+                self._terms.pop(name_key, None)
+                existing = self.profiles.get(key)
+                if existing:
+                    for field, entry in merged['fields'].items():
+                        if field not in existing['fields'] or existing['fields'][field]['updated_at'] < entry['updated_at']:
+                            existing['fields'][field] = entry
+                    existing['aliases'] = sorted(set(existing['aliases']) | set(merged['aliases']))
+                else:
+                    merged['domain'] = key
+                    self.profiles[key] = merged
+
+            profile = self.profiles.setdefault(key, {
+                'name': name,
+                'domain': '' if key.startswith('name:') else key,
+                'aliases': [],
+                'fields': {}
+            })
+            if name and name not in profile['aliases']:
+                profile['aliases'].append(name)
+
+            for field in FIELD_TTL_DAYS:
+                value = rec.get(field)
+                if value:
+                    profile['fields'][field] = {'value': value, 'updated_at': now}
+
+            self._index(key, profile)
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+        return key
+
+    def hydrate(self, rec: Dict) -> List[str]:
+        """
+        Fill a recommendation's missing enrichment fields from the stored profile
+
+        Args:
+            rec: Company recommendation, updated in place
+
+        Returns:
+            Names of the fields that were filled in
+        """
+        profile = self.get(rec.get('name', ''), rec.get('website'))
+        if not profile:
+            return []
+
+        filled = []
+        for field, entry in profile['fields'].items():
+            if not rec.get(field):
+                rec[field] = entry['value']
+                filled.append(field)
+        return filled
+
+    def relevant_profiles(self, terms: List[str], limit: int = 15) -> List[Dict]:
+        """
+        Find stored companies whose profile overlaps with the given terms
+
+        Args:
+            terms: Keywords and answers describing what the user is looking for
+            limit: Maximum number of companies
+
+        Returns:
+            List of dictionaries with name, domain and the fields that need refreshing
+        """
+        query = set(normalize_terms(" ".join(terms)))
+        if not query:
+            return []
+
+        scored = sorted(
+            ((len(query & company_terms), key) for key, company_terms in self._terms.items()),
+            reverse=True
+        )
+        results = []
+        for overlap, key in scored[:limit]:
+            if overlap == 0:
+                break
+            profile = self.profiles[key]
+            results.append({
+                'name': profile['name'],
+                'domain': profile['domain'],
+                'stale_fields': self.stale_fields(profile)
+            })
+        return results
+
+    def save(self) -> None:
+        """Persist the store to disk"""
+        with self._lock:
+            self._save_timer = None
+            # Field entries are replaced rather than mutated, so copying the containers is a consistent snapshot
+            profiles = {
+                key: dict(profile, aliases=list(profile['aliases']), fields=dict(profile['fields']))
+                for key, profile in self.profiles.items()
+            }
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(profiles, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving company profiles: {str(e)}")
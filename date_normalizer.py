@@ -0,0 +1,175 @@
+"""
+Date Normalizer Module
+
+This module turns the date strings found in LLM output, event pages and
+scraped listings ("2025-05-10", "May 10-12, 2025", "May 30 - June 2, 2025",
+"10 May 2025", "March 2025", "5/10/2025") into calendar ranges. Patterns are
+compiled once and results are memoized, so ranking a large candidate pool or
+scanning event pages parses each distinct string only once.
+"""
+
+import calendar
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+DateRange = Tuple[datetime, datetime]
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_MONTH = r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+_DAY = r'\d{1,2}(?:st|nd|rd|th)?'
+_YEAR = r'\d{4}'
+_DASH = r'\s*(?:-|–|—|to|through|until)\s*'
+
+# Patterns in priority order; ranges come before the single dates they start with
+_PATTERNS = [
+    ('iso_range', re.compile(
+        rf'\b(?P<y1>{_YEAR})-(?P<m1>\d{{1,2}})-(?P<d1>\d{{1,2}}){_DASH}(?P<y2>{_YEAR})-(?P<m2>\d{{1,2}})-(?P<d2>\d{{1,2}})\b', re.I)),
+    ('iso', re.compile(
+        rf'\b(?P<y1>{_YEAR})[-/](?P<m1>\d{{1,2}})[-/](?P<d1>\d{{1,2}})(?:[T ]\d{{1,2}}:\d{{2}}(?::\d{{2}}(?:\.\d+)?)?(?:Z|[+-]\d{{2}}:?\d{{2}})?)?(?!\d)', re.I)),
+    ('month_day_range', re.compile(
+        rf'\b(?P<m1>{_MONTH})\s+(?P<d1>{_DAY})(?:,?\s+(?P<y1>{_YEAR}))?{_DASH}(?:(?P<m2>{_MONTH})\s+)?(?P<d2>{_DAY}),?\s+(?P<y2>{_YEAR})\b', re.I)),
+    ('day_month_range', re.compile(
+        rf'\b(?P<d1>{_DAY}){_DASH}(?P<d2>{_DAY})\s+(?P<m1>{_MONTH}),?\s+(?P<y1>{_YEAR})\b', re.I)),
+    ('month_day_year', re.compile(
+        rf'\b(?P<m1>{_MONTH})\s+(?P<d1>{_DAY}),?\s+(?P<y1>{_YEAR})\b', re.I)),
+    ('day_month_year', re.compile(
+        rf'\b(?P<d1>{_DAY})\s+(?P<m1>{_MONTH}),?\s+(?P<y1>{_YEAR})\b', re.I)),
+    ('numeric', re.compile(
+        r'\b(?P<m1>\d{1,2})[/.-](?P<d1>\d{1,2})[/.-](?P<y1>\d{4}|\d{2})\b', re.I)),
+    ('month_year', re.compile(
+        rf'\b(?P<m1>{_MONTH}),?\s+(?P<y1>{_YEAR})\b', re.I)),
+    ('month_day', re.compile(
+        rf'\b(?P<m1>{_MONTH})\s+(?P<d1>{_DAY})\b(?!\s*,?\s*\d)', re.I)),
+]
+
+
+def _month(name: str) -> int:
+    return int(name) if name.isdigit() else _MONTHS[name[:3].lower()]
+
+
+def _day(text: str) -> int:
+    return int(re.match(r'\d+', text).group(0))
+
+
+def _year(text: Optional[str], default: int) -> int:
+    if not text:
+        return default
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+def _to_range(kind: str, groups: dict, reference_year: int) -> Optional[DateRange]:
+    """Build the calendar range of one pattern match, or None for impossible dates"""
+    try:
+        if kind == 'month_year':
+            year, month = _year(groups['y1'], reference_year), _month(groups['m1'])
+            last_day = calendar.monthrange(year, month)[1]
+            return datetime(year, month, 1), datetime(year, month, last_day)
+
+        end_year = _year(groups.get('y2') or groups.get('y1'), reference_year)
+        start = datetime(
+            _year(groups.get('y1'), end_year),
+            _month(groups['m1']),
+            _day(groups['d1'])
+        )
+        if 'd2' not in groups or groups['d2'] is None:
+            return start, start
+
+        end = datetime(end_year, _month(groups.get('m2') or groups['m1']), _day(groups['d2']))
+        # "Dec 30 - Jan 2, 2026" starts in the previous year
+        if end < start and not groups.get('y1'):
+            start = start.replace(year=start.year - 1)
+        return (start, end) if start <= end else None
+    except (ValueError, KeyError):
+        return None
+
+
+def _scan(text: str, reference_year: int) -> Optional[Tuple[int, int, DateRange]]:
+    """Find the earliest (then longest) date mention in a text"""
+    best = None
+    for kind, pattern in _PATTERNS:
+        for match in pattern.finditer(text):
+            if best is not None and match.start() > best[0]:
+                break
+            date_range = _to_range(kind, match.groupdict(), reference_year)
+            if date_range is None:
+                continue
+            candidate = (match.start(), -(match.end() - match.start()), date_range, match.end())
+            if best is None or candidate[:2] < best[:2]:
+                best = candidate
+            break
+    if best is None:
+        return None
+    return best[0], best[3], best[2]
+
+
+@lru_cache(maxsize=8192)
+def _parse(text: str, reference_year: int) -> Optional[Tuple[int, int, DateRange]]:
+    return _scan(text, reference_year)
+
+
+def parse_date_range(text: str, reference_year: Optional[int] = None) -> Optional[DateRange]:
+    """
+    Parse the first date or date range in a string
+
+    Args:
+        text: Date string, possibly with surrounding words ("Tuesday, May 10, 2025")
+        reference_year: Year assumed when none is given, defaults to the current year
+
+    Returns:
+        Tuple of (start, end) at midnight, equal for single days, or None if no date is found
+    """
+    if not text or not isinstance(text, str):
+        return None
+    result = _parse(text.strip(), reference_year or datetime.now().year)
+    return result[2] if result else None
+
+
+def parse_date(text: str, reference_year: Optional[int] = None) -> Optional[datetime]:
+    """
+    Parse the first date in a string, taking the start of a range
+
+    Returns:
+        Start date, or None if no date is found
+    """
+    date_range = parse_date_range(text, reference_year)
+    return date_range[0] if date_range else None
+
+
+def find_date(text: str) -> Optional[str]:
+    """
+    Find the first date mention in a longer text such as a scraped page
+
+    Returns:
+        The matched substring, or None
+    """
+    if not text:
+        return None
+    result = _scan(text, datetime.now().year)
+    return text[result[0]:result[1]] if result else None
+
+
+def date_similarity(a: str, b: str, tolerance_days: int = 7) -> Optional[float]:
+    """
+    Compare two date strings as calendar ranges
+
+    Args:
+        a: First date string
+        b: Second date string
+        tolerance_days: Gap between the ranges at which similarity reaches zero
+
+    Returns:
+        1.0 for overlapping ranges, decreasing linearly with the gap between them,
+        or None if either string has no parseable date
+    """
+    range_a, range_b = parse_date_range(a), parse_date_range(b)
+    if range_a is None or range_b is None:
+        return None
+    gap = max((range_a[0] - range_b[1]).days, (range_b[0] - range_a[1]).days, 0)
+    return max(0.0, 1.0 - gap / tolerance_days)
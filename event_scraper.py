@@ -6,6 +6,11 @@ from urllib.parse import quote_plus
 import json
 import re
 from datetime import datetime, timedelta
+import numpy as np
+from date_normalizer import parse_date_range
+from geo import Geocoder, haversine_km
+from keyword_set import KeywordSet
+from pattern_matcher import get_matcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,13 +32,14 @@ class EventScraper:
             "Upgrade-Insecure-Requests": "1",
             "Cache-Control": "max-age=0"
         }
+        self.geocoder = Geocoder.get_instance()
     
     async def search_events(self, keywords, location=None, max_results=10):
         """
         Search for events based on keywords and location.
         
         Args:
-            keywords (list): List of keywords to search for
+            keywords (list or KeywordSet): Keywords to search for; a KeywordSet's weights pick the search terms and rank events
             location (str, optional): Location to search in. Defaults to None.
             max_results (int, optional): Maximum number of results to return. Defaults to 10.
             
@@ -47,9 +53,9 @@ class EventScraper:
         # Combine keywords into a search query
         search_query = " ".join(search_keywords)
         
-        # Add location if provided
+        # Add location if provided, searching by the nearest city name when given a ZIP code
         if location:
-            search_query += f" {location}"
+            search_query += f" {self.geocoder.place_near_zip(location) or location if location.strip().isdigit() else location}"
         
         # Encode the search query for URL
         encoded_query = quote_plus(search_query)
@@ -67,6 +73,10 @@ class EventScraper:
                 # Extract events
                 events = self._extract_events_from_html(soup, keywords)
                 
+                # Prefer events close to the user among those with equal keyword scores
+                if location:
+                    events = self._sort_by_distance(events, location)
+                
                 # Limit the number of results
                 return events[:max_results]
                 
@@ -79,15 +89,16 @@ class EventScraper:
         Select the most relevant keywords for the search.
         
         Args:
-            keywords (list): List of all keywords
+            keywords (list or KeywordSet): List of all keywords
             max_keywords (int, optional): Maximum number of keywords to select. Defaults to 5.
             
         Returns:
             list: List of selected keywords
         """
-        # For now, just take the first few keywords
-        # In a more sophisticated implementation, we could use TF-IDF or other relevance metrics
-        return keywords[:max_keywords]
+        # Weighted keywords: the highest weights; plain lists: the first few keywords
+        if isinstance(keywords, KeywordSet):
+            return keywords.top(max_keywords)
+        return list(keywords)[:max_keywords]
     
     def _extract_events_from_html(self, soup, all_keywords):
         """
@@ -95,7 +106,7 @@ class EventScraper:
         
         Args:
             soup (BeautifulSoup): BeautifulSoup object of the search results page
-            all_keywords (list): List of all keywords to match against event descriptions
+            all_keywords (list or KeywordSet): Keywords to match against event descriptions
             
         Returns:
             list: List of event dictionaries
@@ -150,17 +161,18 @@ class EventScraper:
             }
         ]
         
-        # Filter and rank mock events based on keyword matches
+        # Filter and rank mock events based on keyword matches, skipping events that are already over
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        matcher = get_matcher(all_keywords)
+        weight = all_keywords.weight if isinstance(all_keywords, KeywordSet) else (lambda keyword: 1.0)
         for event in mock_events:
-            # Count how many keywords match
-            matching_keywords = []
-            for keyword in all_keywords:
-                # Check if the keyword is in the title, description, or event keywords
-                keyword_lower = keyword.lower()
-                if (keyword_lower in event["title"].lower() or 
-                    keyword_lower in event["description"].lower() or 
-                    any(keyword_lower in k.lower() for k in event["keywords"])):
-                    matching_keywords.append(keyword)
+            date_range = parse_date_range(event["date"])
+            if date_range and date_range[1] < today:
+                continue
+            
+            # Find the keywords in the title, description, or event keywords in one pass
+            event_text = "\n".join([event["title"], event["description"]] + event["keywords"])
+            matching_keywords = matcher.matches(event_text)
             
             # Only include events with at least one matching keyword
             if matching_keywords:
@@ -170,12 +182,36 @@ class EventScraper:
                     "location": event["location"],
                     "description": event["description"],
                     "url": event["url"],
-                    "matchingKeywords": matching_keywords
+                    "matchingKeywords": matching_keywords,
+                    "keywordScore": round(sum(weight(keyword) for keyword in matching_keywords), 3)
                 })
         
-        # Sort events by number of matching keywords (most matches first)
-        events.sort(key=lambda x: len(x["matchingKeywords"]), reverse=True)
+        # Sort events by the total weight of their matching keywords (the number of matches for plain lists)
+        events.sort(key=lambda x: x["keywordScore"], reverse=True)
+        
+        return events
+
+    def _sort_by_distance(self, events, location):
+        """
+        Annotate events with their distance from a location and sort them by keyword score, then distance.
+        
+        Args:
+            events (list): Event dictionaries with a "location" field
+            location (str): ZIP code or city of the user
+            
+        Returns:
+            list: Events with a "distanceKm" field (None if unknown), sorted
+        """
+        origin = self.geocoder.locate(location)
+        if origin is None or not events:
+            return events
+        
+        lats, lons = self.geocoder.locate_many(event.get("location") for event in events)
+        distances = haversine_km(origin[0], origin[1], lats, lons)
+        for event, distance in zip(events, distances.tolist()):
+            event["distanceKm"] = None if np.isnan(distance) else round(distance, 1)
         
+        events.sort(key=lambda x: (-x["keywordScore"], x["distanceKm"] if x["distanceKm"] is not None else float("inf")))
         return events
 
 # For testing
@@ -6,6 +6,8 @@ import json
 import httpx
 from pathlib import Path
 from dotenv import load_dotenv
+from keyword_set import KeywordSet
+from prompt_budget import PromptBudget
 from question_engine import QuestionEngine
 import traceback
 
@@ -16,6 +18,26 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Answers to the LinkedIn question that count as consent
+CONSENT_ANSWERS = ['yes', 'y', 'true', 'sure', 'ok', 'okay']
+
+# Answers that feed keyword extraction, in the order they are asked
+KEYWORD_STEPS = ['product', 'market', 'differentiation', 'company_size']
+
+# Gemini response schema for weighted keyword extraction
+WEIGHTED_KEYWORDS_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "keyword": {"type": "STRING"},
+            "weight": {"type": "NUMBER"},
+            "step": {"type": "STRING", "enum": KEYWORD_STEPS}
+        },
+        "required": ["keyword", "weight"]
+    }
+}
+
 class FlowController:
     """Controls the multi-step B2B sales flow"""
     
@@ -38,13 +60,18 @@ class FlowController:
         self.current_product_line = ""
         self.current_sector = ""
         self.current_segment = ""
-        self.keywords = []
+        self.differentiation = ""
+        self.keywords = KeywordSet()
         self.linkedin_consent = False
         self.zip_code = ""
         
-        # Conversation memory
+        # Keywords extracted in one call by submit_answers
+        self.onboarding_keyword_count = int(os.getenv("ONBOARDING_KEYWORDS", "30"))
+        
+        # Conversation memory; older turns are folded into context_summary to keep prompts within budget
         self.conversation_memory = []
         self.context_summary = ""
+        self.prompt_budget = PromptBudget()
         
         # Flow state
         self.steps = [
@@ -120,16 +147,18 @@ class FlowController:
                 return "Can you tell me more about that?"
             
             # Generate a more conversational follow-up question based on the current context
-            prompt = f"""
+            def render(answer, summary):
+                return f"""
             You are a friendly B2B research assistant helping a user set up their company research preferences.
             
             Current context:
             - Product/Service: {self.current_product_line or 'Not provided yet'}
             - Target Market: {self.current_sector or 'Not provided yet'}
             - Company Size: {self.current_segment or 'Not provided yet'}
+            {f"- Earlier conversation: {summary}" if summary else ""}
             
             Current step: {step}
-            User's answer: "{previous_answer}"
+            User's answer: "{answer}"
             Follow-up count: {follow_up_count + 1}
             
             Generate a brief, friendly follow-up question that helps clarify or expand on their answer.
@@ -138,6 +167,13 @@ class FlowController:
             Do not include any thinking process in your response.
             """
             
+            # Long spoken answers and the conversation summary are cut to the follow-up budget
+            sections = self.prompt_budget.fit('follow_up', render("", ""), {
+                'answer': previous_answer,
+                'summary': self.context_summary
+            })
+            prompt = render(sections['answer'], sections['summary'])
+            
             follow_up = await self._call_gemini_api(prompt)
             
             return follow_up
@@ -168,12 +204,12 @@ class FlowController:
                 Example: ["keyword1", "keyword2", "keyword3"]
                 """
                 response = await self._call_gemini_api(prompt)
-                self.keywords = await self._parse_keywords_response(response)
+                self.keywords = KeywordSet(await self._parse_keywords_response(response), source=step)
                 logger.info(f"Generated initial keywords from product: {self.keywords}")
             except Exception as e:
                 logger.error(f"Error generating initial keywords: {str(e)}")
                 # Set default fallback keywords
-                self.keywords = ["B2B", "Sales", "Marketing", "Lead Generation"]
+                self.keywords = KeywordSet(["B2B", "Sales", "Marketing", "Lead Generation"], weight=0.5)
                 
         elif step == 'market':
             self.current_sector = answer
@@ -196,19 +232,14 @@ class FlowController:
                 """
                 response = await self._call_gemini_api(prompt)
                 new_keywords = await self._parse_keywords_response(response)
-                # Merge and deduplicate keywords
-                self.keywords = list(set(self.keywords + new_keywords))
+                self.keywords.merge(new_keywords, source=step)
                 logger.info(f"Updated keywords with market info: {self.keywords}")
             except Exception as e:
                 logger.error(f"Error updating keywords with market info: {str(e)}")
                 
         elif step == 'differentiation':
-            # Add to conversation memory for differentiation
-            self.conversation_memory.append({
-                'step': step,
-                'answer': answer
-            })
-            logger.info(f"Added differentiation to conversation_memory")
+            self.differentiation = answer
+            logger.info(f"Updated differentiation: '{self.differentiation}'")
             
             # Update keywords based on product, market, and differentiation
             try:
@@ -230,8 +261,7 @@ class FlowController:
                 """
                 response = await self._call_gemini_api(prompt)
                 new_keywords = await self._parse_keywords_response(response)
-                # Merge and deduplicate keywords
-                self.keywords = list(set(self.keywords + new_keywords))
+                self.keywords.merge(new_keywords, source=step)
                 logger.info(f"Updated keywords with differentiation info: {self.keywords}")
             except Exception as e:
                 logger.error(f"Error updating keywords with differentiation info: {str(e)}")
@@ -261,34 +291,144 @@ class FlowController:
                 """
                 response = await self._call_gemini_api(prompt)
                 new_keywords = await self._parse_keywords_response(response)
-                # Merge and deduplicate keywords
-                self.keywords = list(set(self.keywords + new_keywords))
+                self.keywords.merge(new_keywords, source=step)
                 logger.info(f"Updated keywords with company size info: {self.keywords}")
             except Exception as e:
                 logger.error(f"Error updating keywords with company size info: {str(e)}")
             
         elif step == 'linkedin':
-            self.linkedin_consent = answer.lower() in ['yes', 'y', 'true', 'sure', 'ok', 'okay']
+            self.linkedin_consent = answer.lower() in CONSENT_ANSWERS
             logger.info(f"Updated linkedin_consent: {self.linkedin_consent}")
         elif step == 'location':
             self.zip_code = answer
             logger.info(f"Updated zip_code: '{self.zip_code}'")
         
-        # Add to conversation memory if not already added
-        if step != 'differentiation':  # We already added differentiation above
-            self.conversation_memory.append({
-                'step': step,
-                'answer': answer
-            })
-            logger.info(f"Added to conversation_memory, current memory: {self.conversation_memory}")
+        self._remember(step, answer)
+    
+    def _remember(self, step, answer):
+        """Add an answer to the conversation memory, folding older turns into context_summary when it runs over budget."""
+        self.conversation_memory.append({
+            'step': step,
+            'answer': answer
+        })
+        self.context_summary, self.conversation_memory = self.prompt_budget.summarize_conversation(
+            self.conversation_memory, self.context_summary
+        )
+        logger.info(f"Added to conversation_memory, current memory: {self.conversation_memory}")
+    
+    async def submit_answers(self, answers):
+        """
+        Store all onboarding answers at once and extract weighted keywords with a single LLM call.
+        
+        Replaces the per-step keyword prompts of store_answer for clients that collect the whole
+        form first. Returns the keywords, most relevant first.
+        """
+        logger.info(f"Storing submitted onboarding answers: {answers}")
+        answers = {step: str(answers.get(step) or '').strip() for step in self.steps if step != 'complete'}
+        
+        self.current_product_line = answers['product']
+        self.current_sector = answers['market']
+        self.current_segment = answers['company_size']
+        self.differentiation = answers['differentiation']
+        self.linkedin_consent = answers['linkedin'].lower() in CONSENT_ANSWERS
+        self.zip_code = answers['location']
+        for step, answer in answers.items():
+            if answer:
+                self._remember(step, answer)
+        
+        def render(answers):
+            return f"""
+        You are a B2B sales assistant helping to generate relevant keywords for targeting.
+        
+        Onboarding answers:
+        - Product/Service: {answers['product'] or 'Not provided'}
+        - Target Market: {answers['market'] or 'Not provided'}
+        - Differentiation: {answers['differentiation'] or 'Not provided'}
+        - Company Size: {answers['company_size'] or 'Not provided'}
+        
+        Generate up to {self.onboarding_keyword_count} highly relevant keywords or short phrases that would be useful for targeting
+        potential customers based on these answers. Focus on industry terms, job roles, and specific needs.
+        Do not repeat a keyword in singular and plural or different capitalization.
+        
+        For each keyword give a weight between 0 and 1 for how strongly it identifies a good target company,
+        and the answer it was derived from (product, market, differentiation or company_size).
+        Order the keywords by weight, highest first.
+        
+        Format your response as a JSON array of objects. Do not include any explanation, markdown formatting, or additional text.
+        Example: [{{"keyword": "keyword1", "weight": 0.9, "step": "product"}}, {{"keyword": "keyword2", "weight": 0.6, "step": "market"}}]
+        """
+        
+        # Long answers are cut to the keyword budget, differentiation first
+        prompt = render(self.prompt_budget.fit('keywords', render(dict.fromkeys(KEYWORD_STEPS, "")), {
+            step: answers[step] for step in ('product', 'market', 'company_size', 'differentiation')
+        }))
+        try:
+            response = await self._call_gemini_api(prompt, response_schema=WEIGHTED_KEYWORDS_SCHEMA)
+            weighted = self._parse_weighted_keywords_response(response)
+        except Exception as e:
+            logger.error(f"Error generating weighted keywords: {str(e)}")
+            weighted = []
+        if not weighted:
+            weighted = [(keyword, 0.5) for keyword in ["B2B", "Sales", "Marketing", "Lead Generation"]]
+        
+        self.keywords = KeywordSet(weighted)
+        logger.info(f"Generated {len(self.keywords)} weighted keywords from submitted answers: {self.keywords}")
+        return self.keywords.top()
+    
+    def _parse_weighted_keywords_response(self, response):
+        """
+        Parse a weighted keyword response into (keyword, weight, step) tuples, highest weight first.
+        
+        Plain string arrays (e.g. the fallback responses of _call_gemini_api) get weights
+        decreasing with their position.
+        """
+        text = response.strip()
+        if text.startswith('```'):
+            text = text.split('\n', 1)[1] if '\n' in text else text[3:]
+            text = text.rsplit('```', 1)[0].strip()
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse weighted keywords: {e}, response: {text}")
+            return []
+        if not isinstance(items, list):
+            return []
+        
+        weighted = []
+        for position, item in enumerate(items):
+            if isinstance(item, str):
+                weighted.append((item, 1.0 - position / (len(items) + 1), None))
+            elif isinstance(item, dict) and isinstance(item.get('keyword'), str):
+                try:
+                    weight = min(1.0, max(0.0, float(item.get('weight', 0.5))))
+                except (TypeError, ValueError):
+                    weight = 0.5
+                step = item.get('step') if item.get('step') in KEYWORD_STEPS else None
+                weighted.append((item['keyword'], weight, step))
+        
+        return sorted(weighted, key=lambda item: -item[1])[:self.onboarding_keyword_count]
     
-    async def _call_gemini_api(self, prompt):
-        """Call the Gemini API with a prompt and return the response."""
+    async def _call_gemini_api(self, prompt, response_schema=None):
+        """
+        Call the Gemini API with a prompt and return the response.
+        
+        With a response_schema, Gemini is asked for JSON matching the schema instead of free text.
+        """
         try:
             if not self.gemini_api_key:
                 logger.warning("No Gemini API key found. Using fallback default response.")
                 # Return a simple JSON-formatted array of default keywords
                 return '["B2B", "Sales", "Marketing", "Lead Generation", "Customer Acquisition"]'
+            
+            generation_config = {
+                "temperature": 0.2,
+                "topP": 0.8,
+                "topK": 40,
+                "maxOutputTokens": 1024
+            }
+            if response_schema is not None:
+                generation_config["responseMimeType"] = "application/json"
+                generation_config["responseSchema"] = response_schema
                 
             async with httpx.AsyncClient() as client:
                 response = await client.post(
@@ -300,12 +440,7 @@ class FlowController:
                                 "parts": [{"text": prompt}]
                             }
                         ],
-                        "generationConfig": {
-                            "temperature": 0.2,
-                            "topP": 0.8,
-                            "topK": 40,
-                            "maxOutputTokens": 1024
-                        }
+                        "generationConfig": generation_config
                     },
                     timeout=10.0  # Increased timeout for more reliable API calls
                 )
@@ -428,11 +563,8 @@ class FlowController:
         if self.current_segment:
             context['company_size'] = self.current_segment
         
-        # Add differentiation from conversation memory if available
-        for item in self.conversation_memory:
-            if item['step'] == 'differentiation':
-                context['differentiation'] = item['answer']
-                break
+        if self.differentiation:
+            context['differentiation'] = self.differentiation
         
         if self.linkedin_consent:
             context['linkedin_consent'] = True
@@ -442,16 +574,38 @@ class FlowController:
         
         return context
     
+    def get_product(self):
+        """Get the product/service description."""
+        return self.current_product_line
+    
+    def get_market(self):
+        """Get the target market."""
+        return self.current_sector
+    
+    def get_company_size(self):
+        """Get the target company size."""
+        return self.current_segment
+    
+    def get_location(self):
+        """Get the user's zip code."""
+        return self.zip_code
+    
+    def get_linkedin_consent(self):
+        """Get whether the user consented to LinkedIn data."""
+        return self.linkedin_consent
+    
+    def get_keywords(self):
+        """Get the current keywords as a KeywordSet with weights."""
+        return self.keywords
+    
+    def set_keywords(self, keywords):
+        """Replace the keywords with the user's edited list."""
+        self.keywords = self.keywords.select(keywords, source='user')
+        logger.info(f"Keywords updated by user: {self.keywords}")
+    
     async def clean_keywords(self):
-        """Clean up keywords and return them."""
-        # Remove duplicates and empty strings
-        cleaned_keywords = list(set([k.strip() for k in self.keywords if k.strip()]))
-        
-        # Sort alphabetically
-        cleaned_keywords.sort()
-        
-        # Log the cleaned keywords
-        logger.info(f"Cleaned keywords: {cleaned_keywords}")
+        """Return the keywords in alphabetical order; the KeywordSet is already deduplicated and caches this view."""
+        cleaned_keywords = self.keywords.sorted()
         
         # If we still have no keywords, provide some defaults
         if not cleaned_keywords:
@@ -465,7 +619,8 @@ class FlowController:
         self.current_product_line = ""
         self.current_sector = ""
         self.current_segment = ""
-        self.keywords = []
+        self.differentiation = ""
+        self.keywords = KeywordSet()
         self.linkedin_consent = False
         self.zip_code = ""
         self.conversation_memory = []
@@ -0,0 +1,145 @@
+"""
+Gemini Context Cache Module
+
+This module uploads static prompt prefixes (the recommendation instructions and
+JSON format) to Gemini's cachedContents API once per model, so generation
+requests only send the per-user part of the prompt and reference the cached
+prefix by name. Caches are created and their TTL refreshed in the background;
+until a cache is ready, or when the API rejects caching (e.g. a prefix below
+the model's minimum size), callers send the full prompt as before.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://generativelanguage.googleapis.com"
+
+
+class GeminiContextCache:
+    """Names of Gemini cachedContents per (model, prefix), created and refreshed in the background"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance shared by all recommenders"""
+        if cls._instance is None:
+            cls._instance = GeminiContextCache()
+        return cls._instance
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Initialize the cache registry
+
+        Args:
+            api_key: Gemini API key, defaults to GEMINI_API_KEY
+            base_url: API base URL, defaults to GEMINI_API_BASE (point it at gemini_mock.py for local testing)
+            ttl: Lifetime of cached contents in seconds, defaults to GEMINI_CACHE_TTL
+        """
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.base_url = (base_url or os.getenv("GEMINI_API_BASE", DEFAULT_API_BASE)).rstrip("/")
+        self.enabled = os.getenv("GEMINI_CONTEXT_CACHE", "true").lower() == "true"
+        self.ttl = ttl or float(os.getenv("GEMINI_CACHE_TTL", "3600"))
+        # Refresh the TTL once less than this share of it is left, stop using a cache about to expire
+        self.refresh_margin = self.ttl * 0.2
+        self.expiry_margin = min(60.0, self.ttl * 0.05)
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    @staticmethod
+    def _key(model: str, prefix: str) -> Tuple[str, str]:
+        return model, hashlib.sha256(prefix.encode()).hexdigest()
+
+    def lookup(self, model: str, prefix: str) -> Optional[str]:
+        """
+        Get the cachedContents name for a prompt prefix, creating or refreshing it in the background
+
+        Must be called from within a running event loop.
+
+        Args:
+            model: Gemini model the cache is used with, e.g. "gemini-2.0-flash"
+            prefix: Static prompt text
+
+        Returns:
+            Name such as "cachedContents/abc123" to send as cachedContent, or None to send the full prompt
+        """
+        if not self.enabled or not self.api_key:
+            return None
+
+        key = self._key(model, prefix)
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry and entry.get('failed_until', 0) > now:
+            return None
+        if entry and entry.get('name') and entry['expires_at'] - now > self.expiry_margin:
+            if entry['expires_at'] - now < self.refresh_margin:
+                self._schedule(key, lambda: self._refresh(key, entry['name']))
+            return entry['name']
+
+        self._schedule(key, lambda: self._create(key, model, prefix))
+        return None
+
+    def forget(self, model: str, prefix: str) -> None:
+        """Drop a cache the API no longer accepts, so the next lookup creates a new one"""
+        self._entries.pop(self._key(model, prefix), None)
+
+    def _schedule(self, key: Tuple[str, str], factory) -> None:
+        """Run one create or refresh task per prefix at a time"""
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            return
+        task = asyncio.ensure_future(factory())
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    async def _create(self, key: Tuple[str, str], model: str, prefix: str) -> None:
+        """Upload a prefix as cached content"""
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.post(
+                    f"{self.base_url}/v1beta/cachedContents?key={self.api_key}",
+                    json={
+                        "model": f"models/{model}",
+                        "contents": [{"role": "user", "parts": [{"text": prefix}]}],
+                        "ttl": f"{int(self.ttl)}s"
+                    }
+                )
+            if response.status_code == 200:
+                data = response.json()
+                self._entries[key] = {'name': data['name'], 'expires_at': time.time() + self.ttl}
+                tokens = data.get('usageMetadata', {}).get('totalTokenCount')
+                logger.info(f"Created Gemini context cache {data['name']} for {model} ({tokens} tokens)")
+                return
+            logger.warning(f"Gemini context cache not created for {model}: {response.status_code} {response.text[:200]}")
+        except Exception as e:
+            logger.warning(f"Error creating Gemini context cache for {model}: {str(e)}")
+        # Don't retry on every request; send full prompts until the TTL has passed
+        self._entries[key] = {'failed_until': time.time() + self.ttl}
+
+    async def _refresh(self, key: Tuple[str, str], name: str) -> None:
+        """Extend the TTL of cached content"""
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.patch(
+                    f"{self.base_url}/v1beta/{name}?key={self.api_key}&updateMask=ttl",
+                    json={"ttl": f"{int(self.ttl)}s"}
+                )
+            if response.status_code == 200:
+                entry = self._entries.get(key)
+                if entry and entry.get('name') == name:
+                    entry['expires_at'] = time.time() + self.ttl
+                logger.info(f"Refreshed Gemini context cache {name}")
+            elif response.status_code == 404:
+                self._entries.pop(key, None)
+            else:
+                logger.warning(f"Gemini context cache {name} not refreshed: {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Error refreshing Gemini context cache {name}: {str(e)}")
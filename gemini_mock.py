@@ -0,0 +1,171 @@
+"""
+Gemini Mock Server
+
+This module is a local stand-in for the parts of the Gemini API the recommender
+uses: creating, refreshing and deleting cachedContents, and generateContent with
+or without a cachedContent reference. It returns canned company recommendations
+as bare JSON in structured-output mode or a JSON code block otherwise, and
+reports prompt and cached token counts, so context caching and structured
+output can be tested without an API key or network access.
+
+Usage:
+    python gemini_mock.py
+    GEMINI_API_BASE=http://127.0.0.1:9002 python app.py
+"""
+
+import json
+import os
+import time
+import uuid
+
+from quart import Quart, jsonify, request
+
+from prompt_budget import estimate_tokens
+
+app = Quart(__name__)
+
+# Cache name -> {'model', 'text', 'tokens', 'expires_at'}
+CACHES = {}
+
+MOCK_COMPANIES = [
+    {
+        "name": "Northwind Logistics",
+        "website": "https://northwind.example.com",
+        "fit_reason": "Expanding its fleet operations and evaluating new vendors",
+        "industry": "Logistics",
+        "size": "1,200 employees",
+        "headquarters": "Chicago, IL",
+        "description": "Regional freight and warehousing provider.",
+        "investment_areas": ["Fleet telematics", "Warehouse automation", "Customer portals"],
+        "budget_allocation": "Technology budget up year over year",
+        "articles": [],
+        "leads": [],
+        "events": []
+    },
+    {
+        "name": "Contoso Health",
+        "website": "https://contoso.example.com",
+        "fit_reason": "Modernizing patient scheduling and billing systems",
+        "industry": "Healthcare",
+        "size": "3,500 employees",
+        "headquarters": "Austin, TX",
+        "description": "Network of outpatient clinics.",
+        "investment_areas": ["Patient experience", "Billing automation", "Data security"],
+        "budget_allocation": "IT spending focused on cloud migration",
+        "articles": [],
+        "leads": [],
+        "events": []
+    },
+    {
+        "name": "Fabrikam Manufacturing",
+        "website": "https://fabrikam.example.com",
+        "fit_reason": "Investing in plant-floor analytics and supplier management",
+        "industry": "Manufacturing",
+        "size": "800 employees",
+        "headquarters": "Columbus, OH",
+        "description": "Maker of industrial components.",
+        "investment_areas": ["Predictive maintenance", "Supply chain visibility", "Quality control"],
+        "budget_allocation": "Capital budget weighted toward automation",
+        "articles": [],
+        "leads": [],
+        "events": []
+    }
+]
+
+
+def _error(code, message):
+    return jsonify({"error": {"code": code, "message": message}}), code
+
+
+def _ttl_seconds(ttl):
+    """Parse a duration such as "3600s" """
+    return float(str(ttl or "3600s").rstrip("s"))
+
+
+def _live_cache(name):
+    cache = CACHES.get(name)
+    if cache and cache['expires_at'] <= time.time():
+        del CACHES[name]
+        return None
+    return cache
+
+
+def _describe(name, cache):
+    return {
+        "name": name,
+        "model": cache['model'],
+        "expireTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(cache['expires_at'])),
+        "usageMetadata": {"totalTokenCount": cache['tokens']}
+    }
+
+
+def _text(contents):
+    return "\n".join(part.get("text", "") for content in contents or [] for part in content.get("parts", []))
+
+
+@app.route('/v1beta/cachedContents', methods=['POST'])
+async def create_cache():
+    data = await request.get_json()
+    if not data or not data.get("model") or not data.get("contents"):
+        return _error(400, "model and contents are required")
+    text = _text(data["contents"])
+    name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+    CACHES[name] = {
+        'model': data["model"],
+        'text': text,
+        'tokens': estimate_tokens(text),
+        'expires_at': time.time() + _ttl_seconds(data.get("ttl"))
+    }
+    return jsonify(_describe(name, CACHES[name]))
+
+
+@app.route('/v1beta/cachedContents/<cache_id>', methods=['GET', 'PATCH', 'DELETE'])
+async def cache_content(cache_id):
+    name = f"cachedContents/{cache_id}"
+    cache = _live_cache(name)
+    if cache is None:
+        return _error(404, f"{name} not found")
+    if request.method == 'DELETE':
+        del CACHES[name]
+        return jsonify({})
+    if request.method == 'PATCH':
+        data = await request.get_json()
+        cache['expires_at'] = time.time() + _ttl_seconds((data or {}).get("ttl"))
+    return jsonify(_describe(name, cache))
+
+
+@app.route('/v1beta/models/<model_action>', methods=['POST'])
+async def generate_content(model_action):
+    model, _, action = model_action.partition(':')
+    if action != 'generateContent':
+        return _error(404, f"Unknown method {action}")
+    data = await request.get_json()
+    if not data or not data.get("contents"):
+        return _error(400, "contents are required")
+
+    cached_tokens = 0
+    if data.get("cachedContent"):
+        cache = _live_cache(data["cachedContent"])
+        if cache is None:
+            return _error(404, f"{data['cachedContent']} not found")
+        if cache['model'] != f"models/{model}":
+            return _error(400, f"{data['cachedContent']} was created for {cache['model']}")
+        cached_tokens = cache['tokens']
+
+    # Structured output is bare JSON; free-text responses come wrapped in a code block like the real model's
+    if data.get("generationConfig", {}).get("responseMimeType") == "application/json":
+        text = json.dumps(MOCK_COMPANIES)
+    else:
+        text = f"```json\n{json.dumps(MOCK_COMPANIES, indent=2)}\n```"
+    return jsonify({
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+        "usageMetadata": {
+            "promptTokenCount": estimate_tokens(_text(data["contents"])) + cached_tokens,
+            "cachedContentTokenCount": cached_tokens,
+            "candidatesTokenCount": estimate_tokens(text)
+        }
+    })
+
+
+if __name__ == "__main__":
+    app.run(host="127.0.0.1", port=int(os.getenv("GEMINI_MOCK_PORT", "9002")))
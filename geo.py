@@ -0,0 +1,247 @@
+"""
+Geo Module
+
+This module scores proximity without network geocoding. A compact table of US
+ZIP centroids (data/zip_centroids.csv, with 5-digit ZIPs for specific towns and
+3-digit prefixes for whole regions) is loaded into NumPy arrays, indexed by ZIP
+and by city, and bucketed into a one-degree grid for nearest-place lookups.
+Distances are computed with a vectorized haversine, so a whole candidate pool
+is scored in one call.
+"""
+
+import csv
+import logging
+import os
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from company_registry import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+_ZIP_RE = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+_VIRTUAL_RE = re.compile(r'\b(?:virtual|online|remote|webinar|zoom)\b', re.IGNORECASE)
+
+# Full state names as they appear in free-text locations
+_STATES = {
+    'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR', 'california': 'CA', 'colorado': 'CO',
+    'connecticut': 'CT', 'delaware': 'DE', 'florida': 'FL', 'georgia': 'GA', 'hawaii': 'HI', 'idaho': 'ID',
+    'illinois': 'IL', 'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS', 'kentucky': 'KY', 'louisiana': 'LA',
+    'maine': 'ME', 'maryland': 'MD', 'massachusetts': 'MA', 'michigan': 'MI', 'minnesota': 'MN',
+    'mississippi': 'MS', 'missouri': 'MO', 'montana': 'MT', 'nebraska': 'NE', 'nevada': 'NV',
+    'new hampshire': 'NH', 'new jersey': 'NJ', 'new mexico': 'NM', 'new york': 'NY', 'north carolina': 'NC',
+    'north dakota': 'ND', 'ohio': 'OH', 'oklahoma': 'OK', 'oregon': 'OR', 'pennsylvania': 'PA',
+    'rhode island': 'RI', 'south carolina': 'SC', 'south dakota': 'SD', 'tennessee': 'TN', 'texas': 'TX',
+    'utah': 'UT', 'vermont': 'VT', 'virginia': 'VA', 'washington': 'WA', 'west virginia': 'WV',
+    'wisconsin': 'WI', 'wyoming': 'WY', 'district of columbia': 'DC'
+}
+_STATE_CODES = frozenset(_STATES.values())
+
+# Common abbreviations of city names
+_CITY_ALIASES = {'nyc': 'new york', 'sf': 'san francisco', 'la': 'los angeles', 'dc': 'washington', 'saint louis': 'st. louis'}
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances from one point to many, in kilometers
+
+    Args:
+        lat: Latitude of the origin in degrees
+        lon: Longitude of the origin in degrees
+        lats: Latitudes in degrees, NaN for unknown points
+        lons: Longitudes in degrees, NaN for unknown points
+
+    Returns:
+        Array of distances, NaN where the point is unknown
+    """
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class ZipCentroids:
+    """Array-backed ZIP centroid table with ZIP, city and grid indexes"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = ZipCentroids()
+        return cls._instance
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Load the centroid table
+
+        Args:
+            path: CSV with zip, city, state, lat and lon columns
+        """
+        self.path = path or os.path.join(DATA_DIR, "zip_centroids.csv")
+        zips, cities, states, lats, lons = [], [], [], [], []
+        with open(self.path, newline='') as f:
+            for row in csv.DictReader(f):
+                zips.append(row['zip'])
+                cities.append(row['city'])
+                states.append(row['state'])
+                lats.append(float(row['lat']))
+                lons.append(float(row['lon']))
+
+        self.zips = zips
+        self.cities = cities
+        self.states = states
+        self.lats = np.array(lats)
+        self.lons = np.array(lons)
+
+        self._by_zip = {z: i for i, z in enumerate(zips)}
+        self._by_city: Dict[str, int] = {}
+        for i, (city, state) in enumerate(zip(cities, states)):
+            key = city.lower()
+            self._by_city.setdefault(f"{key}|{state}", i)
+            self._by_city.setdefault(key, i)
+
+        # One-degree grid cells for nearest-place lookups
+        self._grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            self._grid[(int(np.floor(lat)), int(np.floor(lon)))].append(i)
+
+        logger.info(f"Loaded {len(zips)} ZIP centroids from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self.zips)
+
+    def lookup_zip(self, zip_code: str) -> Optional[int]:
+        """Row of a ZIP code, falling back to its 3-digit prefix"""
+        digits = ''.join(ch for ch in (zip_code or '') if ch.isdigit())[:5]
+        if len(digits) < 3:
+            return None
+        if digits in self._by_zip:
+            return self._by_zip[digits]
+        return self._by_zip.get(digits[:3])
+
+    def lookup_city(self, city: str, state: str = '') -> Optional[int]:
+        """Row of a city, in the given state if one is given (None if the state has no such city)"""
+        key = city.strip().lower()
+        key = _CITY_ALIASES.get(key, key)
+        if state:
+            return self._by_city.get(f"{key}|{state.upper()}")
+        return self._by_city.get(key)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[int]:
+        """
+        Rows within a radius of a point, checking only nearby grid cells
+
+        Args:
+            lat: Latitude in degrees
+            lon: Longitude in degrees
+            radius_km: Search radius
+
+        Returns:
+            Row indexes sorted by distance
+        """
+        lat_cells = int(np.ceil(radius_km / 111.0))
+        lon_cells = int(np.ceil(radius_km / max(1.0, 111.0 * np.cos(np.radians(lat)))))
+        base_lat, base_lon = int(np.floor(lat)), int(np.floor(lon))
+        rows = [
+            row
+            for dlat in range(-lat_cells, lat_cells + 1)
+            for dlon in range(-lon_cells, lon_cells + 1)
+            for row in self._grid.get((base_lat + dlat, base_lon + dlon), ())
+        ]
+        if not rows:
+            return []
+        rows = np.array(rows)
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        order = np.argsort(distances)
+        return [int(rows[i]) for i in order if distances[i] <= radius_km]
+
+    def nearest(self, lat: float, lon: float, max_km: float = 250.0) -> Optional[int]:
+        """Row closest to a point, if any is within max_km"""
+        rows = self.within(lat, lon, max_km)
+        return rows[0] if rows else None
+
+    def place_name(self, row: int) -> str:
+        """Human readable "City, ST" of a row"""
+        return f"{self.cities[row]}, {self.states[row]}"
+
+
+class Geocoder:
+    """Resolves ZIP codes and free-text locations to coordinates using the bundled table"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = Geocoder(ZipCentroids.get_instance())
+        return cls._instance
+
+    def __init__(self, table: ZipCentroids):
+        self.table = table
+        self.locate = lru_cache(maxsize=8192)(self._locate)
+
+    def _coordinates(self, row: Optional[int]) -> Optional[Tuple[float, float]]:
+        if row is None:
+            return None
+        return float(self.table.lats[row]), float(self.table.lons[row])
+
+    def locate_zip(self, zip_code: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of a ZIP code, or None if its region is not in the table"""
+        return self._coordinates(self.table.lookup_zip(zip_code))
+
+    def _locate(self, text: str) -> Optional[Tuple[float, float]]:
+        """
+        Coordinates of a free-text location such as "Austin, TX", "Boston, Massachusetts" or "94107"
+
+        Virtual events and unknown places resolve to None.
+        """
+        if not text or _VIRTUAL_RE.search(text):
+            return None
+
+        match = _ZIP_RE.search(text)
+        if match:
+            return self.locate_zip(match.group(1))
+
+        parts = [part.strip() for part in text.split(',') if part.strip()]
+        if not parts:
+            return None
+
+        # "City, ST", "City, State" or "Venue, City, ST, USA"; other two-letter parts such as "US" are skipped
+        for i in range(len(parts) - 1, -1, -1):
+            state = parts[i].upper() if len(parts[i]) == 2 else _STATES.get(parts[i].lower(), '')
+            if state in _STATE_CODES and i > 0:
+                return self._coordinates(self.table.lookup_city(parts[i - 1], state))
+        for part in parts:
+            row = self.table.lookup_city(part)
+            if row is not None:
+                return self._coordinates(row)
+        return None
+
+    def locate_many(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Coordinates of many free-text locations
+
+        Returns:
+            Tuple of (latitudes, longitudes), NaN where a location is unknown
+        """
+        points = [self.locate(text) if isinstance(text, str) else None for text in texts]
+        lats = np.array([point[0] if point else np.nan for point in points], dtype=float)
+        lons = np.array([point[1] if point else np.nan for point in points], dtype=float)
+        return lats, lons
+
+    def place_near_zip(self, zip_code: str) -> Optional[str]:
+        """"City, ST" of the closest known place to a ZIP code"""
+        point = self.locate_zip(zip_code)
+        if point is None:
+            return None
+        row = self.table.nearest(*point)
+        return self.table.place_name(row) if row is not None else None
@@ -0,0 +1,184 @@
+"""
+Job Queue Module
+
+This module runs long recommendation work (generation after onboarding) outside
+the HTTP request. Jobs are queued in process and executed by a fixed pool of
+worker tasks; clients get a job ID immediately and poll for status, progress and
+the result, which is retained for a while after the job finishes. The queue has
+a depth limit, so a burst of submissions is rejected early instead of piling up
+behind the workers.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Called by a job to report its progress (0 to 1) and what it is doing
+ProgressFn = Callable[[float, str], None]
+JobFn = Callable[[ProgressFn], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobQueue:
+    """In-process job queue with a worker pool, progress reporting and result retention"""
+
+    def __init__(self, workers: Optional[int] = None, max_queued: Optional[int] = None,
+                 retention: Optional[float] = None, max_jobs: int = 500):
+        """
+        Initialize the queue; workers start with the first submitted job
+
+        Args:
+            workers: Jobs executed at the same time, defaults to JOB_WORKERS
+            max_queued: Jobs waiting for a worker before submissions are rejected, defaults to JOB_QUEUE_DEPTH
+            retention: Seconds finished jobs and their results are kept, defaults to JOB_RETENTION
+            max_jobs: Maximum number of finished jobs retained
+        """
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.max_queued = max_queued or int(os.getenv("JOB_QUEUE_DEPTH", "20"))
+        self.retention = retention if retention is not None else float(os.getenv("JOB_RETENTION", "3600"))
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending: List[str] = []
+        self._done: Dict[str, asyncio.Event] = {}
+
+    def submit(self, kind: str, fn: JobFn) -> str:
+        """
+        Queue a job
+
+        Must be called from within a running event loop.
+
+        Args:
+            kind: Short job type shown in its status, e.g. "recommendations"
+            fn: Coroutine function receiving a progress callback and returning the result
+
+        Returns:
+            Job ID to poll
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        self._start_workers()
+        self._evict()
+
+        job_id = uuid.uuid4().hex[:12]
+        try:
+            self._queue.put_nowait((job_id, fn))
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+        self.jobs[job_id] = {
+            'job_id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'progress': 0.0,
+            'message': 'Waiting for a worker',
+            'created_at': time.time()
+        }
+        self._pending.append(job_id)
+        self._done[job_id] = asyncio.Event()
+        logger.info(f"Queued {kind} job {job_id} ({len(self._pending)} waiting)")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a snapshot of a job's status, progress and result
+
+        Args:
+            job_id: Job ID returned by submit()
+
+        Returns:
+            Job status dictionary with the queue position of waiting jobs, or None if the job is unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        snapshot = dict(job)
+        if job['status'] == 'queued' and job_id in self._pending:
+            snapshot['position'] = self._pending.index(job_id) + 1
+        return snapshot
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a job to finish, up to timeout seconds
+
+        Returns:
+            The job snapshot, finished or not, or None if the job is unknown
+        """
+        done = self._done.get(job_id)
+        if done is not None:
+            try:
+                await asyncio.wait_for(done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of waiting and running jobs, and the queue limits"""
+        running = sum(1 for job in self.jobs.values() if job['status'] == 'running')
+        return {'queued': len(self._pending), 'running': running, 'workers': self.workers, 'max_queued': self.max_queued}
+
+    def _start_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        """Run queued jobs one at a time"""
+        while True:
+            job_id, fn = await self._queue.get()
+            try:
+                await self._run(job_id, fn)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, fn: JobFn) -> None:
+        """Execute one job, recording its progress, result or error"""
+        if job_id in self._pending:
+            self._pending.remove(job_id)
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+
+        def report(progress: float, message: str) -> None:
+            job['progress'] = round(min(1.0, max(0.0, progress)), 3)
+            job['message'] = message
+
+        job['status'] = 'running'
+        job['started_at'] = time.time()
+        report(0.0, 'Started')
+        try:
+            job['result'] = await fn(report)
+            job['status'] = 'complete'
+            report(1.0, 'Done')
+        except Exception as e:
+            logger.error(f"{job['kind']} job {job_id} failed: {str(e)}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = time.time()
+            done = self._done.pop(job_id, None)
+            if done is not None:
+                done.set()
+            logger.info(f"{job['kind']} job {job_id} finished with status {job['status']} "
+                        f"in {job['finished_at'] - job['started_at']:.1f}s")
+
+    def _evict(self) -> None:
+        """Drop finished jobs past their retention, then the oldest ones beyond max_jobs"""
+        now = time.time()
+        finished = [job_id for job_id, job in self.jobs.items() if 'finished_at' in job]
+        for job_id in finished:
+            if now - self.jobs[job_id]['finished_at'] > self.retention or len(self.jobs) > self.max_jobs:
+                del self.jobs[job_id]
@@ -0,0 +1,150 @@
+"""
+Keyword Set Module
+
+This module holds the user's targeting keywords. Keywords are keyed by a
+canonical form (case, plural and word-order insensitive, the same terms the
+profile fingerprint uses), keep their insertion order and first spelling, and
+carry a weight and the onboarding step they came from. Merges and lookups are
+O(1) per keyword, and the alphabetical and by-weight views are cached until
+the set changes.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from recommendation_cache import normalize_terms
+
+KeywordInput = Union[str, Tuple[str, float], Tuple[str, float, Optional[str]]]
+
+
+def canonical_keyword(keyword: str) -> str:
+    """
+    Canonical key of a keyword, equal for "CRM Platforms" and "crm platform"
+
+    Args:
+        keyword: Keyword or short phrase
+
+    Returns:
+        Stemmed, stopword-free terms joined by spaces, or the lowercased keyword if it has none
+    """
+    return ' '.join(normalize_terms(keyword)) or keyword.strip().lower()
+
+
+class KeywordSet:
+    """Ordered set of keywords with canonical keys, weights and source steps"""
+
+    def __init__(self, keywords: Iterable[KeywordInput] = (), weight: float = 1.0, source: Optional[str] = None):
+        """
+        Initialize the set
+
+        Args:
+            keywords: Keywords, or (keyword, weight) / (keyword, weight, source) tuples
+            weight: Weight of keywords given without one
+            source: Onboarding step the keywords came from
+        """
+        # Canonical key -> [display form, weight, source]; dicts keep insertion order
+        self._entries: Dict[str, list] = {}
+        self._sorted: Optional[List[str]] = None
+        self._ranked: Optional[List[str]] = None
+        self.merge(keywords, weight, source)
+
+    def add(self, keyword: str, weight: float = 1.0, source: Optional[str] = None) -> bool:
+        """
+        Add a keyword, or raise the weight of an equivalent one already in the set
+
+        Returns:
+            True if the keyword was new
+        """
+        if not isinstance(keyword, str) or not keyword.strip():
+            return False
+        key = canonical_keyword(keyword)
+        entry = self._entries.get(key)
+        self._sorted = self._ranked = None
+        if entry is None:
+            self._entries[key] = [keyword.strip(), float(weight), source]
+            return True
+        entry[1] = max(entry[1], float(weight))
+        entry[2] = entry[2] or source
+        return False
+
+    def merge(self, keywords: Iterable[KeywordInput], weight: float = 1.0, source: Optional[str] = None) -> int:
+        """
+        Add several keywords, e.g. the output of one keyword extraction prompt
+
+        Args:
+            keywords: Keywords, (keyword, weight) / (keyword, weight, source) tuples or another KeywordSet
+            weight: Weight of keywords given without one
+            source: Source of keywords given without one
+
+        Returns:
+            Number of new keywords
+        """
+        if isinstance(keywords, KeywordSet):
+            keywords = keywords.items()
+        added = 0
+        for item in keywords:
+            if isinstance(item, str):
+                added += self.add(item, weight, source)
+            else:
+                added += self.add(item[0], item[1], item[2] if len(item) > 2 else source)
+        return added
+
+    def select(self, keywords: Iterable[str], source: Optional[str] = None) -> 'KeywordSet':
+        """
+        New set of the given keywords, keeping the weights and sources this set knows for them
+
+        Used when the user edits the list: kept keywords stay weighted, new ones get weight 1.
+
+        Args:
+            keywords: Keywords to keep or add
+            source: Source of keywords not in this set
+        """
+        selected = KeywordSet()
+        for keyword in keywords:
+            entry = self._entries.get(canonical_keyword(keyword)) if isinstance(keyword, str) else None
+            if entry is None:
+                selected.add(keyword, 1.0, source)
+            else:
+                selected.add(keyword, entry[1], entry[2])
+        return selected
+
+    def weight(self, keyword: str) -> float:
+        """Weight of a keyword or an equivalent spelling, 0 if it is not in the set"""
+        entry = self._entries.get(canonical_keyword(keyword))
+        return entry[1] if entry else 0.0
+
+    def source(self, keyword: str) -> Optional[str]:
+        """Onboarding step a keyword came from, if known"""
+        entry = self._entries.get(canonical_keyword(keyword))
+        return entry[2] if entry else None
+
+    def weights(self) -> Dict[str, float]:
+        """Weight of every keyword by display form, in insertion order"""
+        return {entry[0]: entry[1] for entry in self._entries.values()}
+
+    def items(self) -> List[Tuple[str, float, Optional[str]]]:
+        """(keyword, weight, source) tuples in insertion order"""
+        return [tuple(entry) for entry in self._entries.values()]
+
+    def sorted(self) -> List[str]:
+        """Keywords in case-insensitive alphabetical order, cached until the set changes"""
+        if self._sorted is None:
+            self._sorted = sorted((entry[0] for entry in self._entries.values()), key=str.lower)
+        return self._sorted
+
+    def top(self, count: Optional[int] = None) -> List[str]:
+        """Keywords by weight, highest first and in insertion order among equal weights"""
+        if self._ranked is None:
+            self._ranked = [entry[0] for entry in sorted(self._entries.values(), key=lambda entry: -entry[1])]
+        return self._ranked if count is None else self._ranked[:count]
+
+    def __contains__(self, keyword: object) -> bool:
+        return isinstance(keyword, str) and canonical_keyword(keyword) in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return (entry[0] for entry in list(self._entries.values()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"KeywordSet({self.weights()!r})"
@@ -0,0 +1,317 @@
+"""
+Local Recommender Module
+
+This module recommends companies without any network access. Company documents
+from the bundled corpus (data/companies.csv) and the shared company profile
+store are turned into hashed TF-IDF vectors, stored column-wise (an inverted
+index) in .npy files and memory-mapped at startup. A profile query touches only
+the postings of its own terms, so cosine top-k over the corpus takes a
+few milliseconds.
+"""
+
+import csv
+import json
+import logging
+import os
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from company_registry import DATA_DIR, canonical_domain
+from quote_matcher import tokenize
+from recommendation_cache import size_bucket, stem
+from recommendation_verifier import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space, large enough that collisions are rare for a company corpus
+N_FEATURES = 2 ** 18
+
+# Score multiplier for companies in the requested size bucket
+SIZE_MATCH_BOOST = 1.25
+
+# Product terms describe what the user sells, which also matches competitors, so they count for less
+PRODUCT_WEIGHT = 0.5
+
+
+def _terms(text: str) -> List[str]:
+    """Stemmed, stopword-free terms of a text, in order"""
+    return [stem(token) for token in tokenize(text) if token not in STOP_WORDS]
+
+
+def _hash_terms(terms: List[str]) -> Counter:
+    """Count the hashed feature of every term"""
+    return Counter(zlib.crc32(term.encode()) % N_FEATURES for term in terms)
+
+
+def _profile_query(product: str, market: str, keywords: List[str]) -> List[Tuple[str, float]]:
+    """Weighted query parts for a user profile"""
+    return [(product or '', PRODUCT_WEIGHT), (market or '', 1.0)] + [(keyword, 1.0) for keyword in keywords or []]
+
+
+def _document_text(doc: Dict) -> str:
+    areas = doc.get('investment_areas') or []
+    if isinstance(areas, list):
+        areas = " ".join(str(area) for area in areas)
+    return " ".join([doc.get('name', ''), doc.get('industry', ''), doc.get('description', ''), str(areas)])
+
+
+def load_corpus(source_path: str, store=None) -> List[Dict]:
+    """
+    Load company documents from the bundled CSV and the company profile store
+
+    Store profiles extend the CSV entry with the same domain, and companies only
+    known to the store are added as new documents.
+
+    Args:
+        source_path: CSV with name, domain, industry, size and description columns
+        store: Optional CompanyProfileStore
+
+    Returns:
+        List of company documents
+    """
+    docs: Dict[str, Dict] = {}
+    with open(source_path, newline='') as f:
+        for row in csv.DictReader(f):
+            domain = canonical_domain(row.get('domain') or '')
+            if not domain:
+                continue
+            docs[domain] = {
+                'name': row['name'],
+                'domain': domain,
+                'industry': row.get('industry') or '',
+                'size': row.get('size') or '',
+                'headquarters': row.get('headquarters') or '',
+                'description': row.get('description') or ''
+            }
+
+    for profile in (store.profiles.values() if store is not None else []):
+        fields = {field: entry['value'] for field, entry in profile.get('fields', {}).items()}
+        if not profile.get('domain') or not fields.get('description'):
+            continue
+        doc = docs.setdefault(profile['domain'], {
+            'name': profile['name'],
+            'domain': profile['domain'],
+            'industry': fields.get('industry') or '',
+            'size': size_bucket(str(fields.get('size') or '')),
+            'headquarters': fields.get('headquarters') or '',
+            'description': ''
+        })
+        if fields['description'] not in doc['description']:
+            doc['description'] = f"{doc['description']} {fields['description']}".strip()
+        if fields.get('investment_areas'):
+            doc['investment_areas'] = fields['investment_areas']
+
+    return list(docs.values())
+
+
+def build_index(docs: List[Dict], index_dir: str) -> None:
+    """
+    Build the hashed TF-IDF inverted index for a corpus
+
+    Writes idf.npy, indptr.npy (postings offsets per feature), postings.npy
+    (document ids), weights.npy (L2-normalized TF-IDF weights) and docs.json.
+
+    Args:
+        docs: Company documents
+        index_dir: Directory the index files are written to
+    """
+    features, doc_ids, counts = [], [], []
+    for i, doc in enumerate(docs):
+        for feature, count in _hash_terms(_terms(_document_text(doc))).items():
+            features.append(feature)
+            doc_ids.append(i)
+            counts.append(count)
+
+    features = np.array(features, dtype=np.int64)
+    doc_ids = np.array(doc_ids, dtype=np.int32)
+    counts = np.array(counts, dtype=np.float64)
+
+    n_docs = len(docs)
+    df = np.bincount(features, minlength=N_FEATURES)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    weights = (1 + np.log(counts)) * idf[features]
+    norms = np.sqrt(np.bincount(doc_ids, weights=weights ** 2, minlength=n_docs))
+    weights /= np.maximum(norms[doc_ids], 1e-12)
+
+    order = np.lexsort((doc_ids, features))
+    indptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+    np.cumsum(df, out=indptr[1:])
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, "idf.npy"), idf.astype(np.float32))
+    np.save(os.path.join(index_dir, "indptr.npy"), indptr)
+    np.save(os.path.join(index_dir, "postings.npy"), doc_ids[order])
+    np.save(os.path.join(index_dir, "weights.npy"), weights[order].astype(np.float32))
+    with open(os.path.join(index_dir, "docs.json"), 'w') as f:
+        json.dump(docs, f)
+
+    logger.info(f"Built local recommender index with {n_docs} companies at {index_dir}")
+
+
+class LocalRecommender:
+    """Offline TF-IDF company recommender over a memory-mapped index"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = LocalRecommender()
+        return cls._instance
+
+    def __init__(self, source_path: Optional[str] = None, index_dir: Optional[str] = None, store=None):
+        """
+        Initialize the recommender, rebuilding the index when its sources changed
+
+        Args:
+            source_path: Bundled company CSV
+            index_dir: Directory holding the index files
+            store: CompanyProfileStore whose profiles are ingested into the corpus
+        """
+        if store is None:
+            from company_store import CompanyProfileStore
+            store = CompanyProfileStore.get_instance()
+        self.source_path = source_path or os.path.join(DATA_DIR, "companies.csv")
+        self.index_dir = index_dir or os.path.join(DATA_DIR, "local_index")
+        self.store = store
+        self.refresh()
+
+    def _source_mtimes(self) -> Dict[str, Optional[float]]:
+        """Modification time of each index source, None for a missing file"""
+        sources = [self.source_path, getattr(self.store, 'path', None)]
+        return {path: os.path.getmtime(path) if os.path.exists(path) else None for path in sources if path}
+
+    def refresh(self) -> None:
+        """
+        Rebuild the index if the CSV or the profile store changed since it was built, then map it
+
+        The source mtimes the index was built from are kept next to it, so a deleted
+        or restored (older) store file also triggers a rebuild.
+        """
+        docs_path = os.path.join(self.index_dir, "docs.json")
+        sources_path = os.path.join(self.index_dir, "sources.json")
+        sources = self._source_mtimes()
+        try:
+            with open(sources_path) as f:
+                built_from = json.load(f)
+        except (OSError, ValueError):
+            built_from = None
+        if not os.path.exists(docs_path) or built_from != sources:
+            build_index(load_corpus(self.source_path, self.store), self.index_dir)
+            with open(sources_path, 'w') as f:
+                json.dump(sources, f)
+
+        with open(docs_path) as f:
+            self.docs: List[Dict] = json.load(f)
+        self._idf = np.load(os.path.join(self.index_dir, "idf.npy"), mmap_mode='r')
+        self._indptr = np.load(os.path.join(self.index_dir, "indptr.npy"), mmap_mode='r')
+        self._postings = np.load(os.path.join(self.index_dir, "postings.npy"), mmap_mode='r')
+        self._weights = np.load(os.path.join(self.index_dir, "weights.npy"), mmap_mode='r')
+        self._sizes = np.array([doc.get('size') or '' for doc in self.docs])
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, query: Union[str, List[Tuple[str, float]]], company_size: str = "", k: int = 10) -> List[Dict]:
+        """
+        Find the companies most similar to a query by cosine similarity
+
+        Args:
+            query: Free text describing what the user is looking for, or (text, weight) parts
+            company_size: Target company size answer, used to boost matching companies
+            k: Number of results
+
+        Returns:
+            List of {'doc', 'score'} dictionaries, best first
+        """
+        parts = [(query, 1.0)] if isinstance(query, str) else query
+        query_tf: Dict[int, float] = {}
+        for text, weight in parts:
+            for feature, count in _hash_terms(_terms(text)).items():
+                query_tf[feature] = query_tf.get(feature, 0.0) + weight * (1 + np.log(count))
+        if not query_tf or not self.docs:
+            return []
+
+        features = np.fromiter(query_tf.keys(), dtype=np.int64)
+        query_weights = np.fromiter(query_tf.values(), dtype=np.float64) * self._idf[features]
+        query_weights /= max(np.linalg.norm(query_weights), 1e-12)
+
+        # Gather the postings of every query feature and accumulate dot products per company
+        starts, ends = self._indptr[features], self._indptr[features + 1]
+        lengths = ends - starts
+        if not lengths.sum():
+            return []
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        contributions = self._weights[positions] * np.repeat(query_weights, lengths)
+        scores = np.bincount(self._postings[positions], weights=contributions, minlength=len(self.docs))
+
+        bucket = size_bucket(company_size)
+        if bucket != 'any':
+            scores = scores * np.where(self._sizes == bucket, SIZE_MATCH_BOOST, 1.0)
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [{'doc': self.docs[i], 'score': float(scores[i])} for i in top]
+
+    def recommend(self, product: str, market: str, company_size: str, keywords: List[str],
+                  count: int = 3, offset: int = 0) -> List[Dict]:
+        """
+        Recommend companies for a profile in the same format as LLM recommendations
+
+        Args:
+            product: Product/service answer
+            market: Target market answer
+            company_size: Target company size answer
+            keywords: User keywords
+            count: Number of recommendations
+            offset: Number of top matches to skip
+
+        Returns:
+            Company recommendations, enriched from the profile store where available
+        """
+        query = _profile_query(product, market, keywords)
+        query_terms = {term for text, _ in query for term in _terms(text)}
+        recommendations = []
+        for match in self.search(query, company_size, k=offset + count)[offset:]:
+            doc = match['doc']
+            matched = sorted(query_terms & set(_terms(_document_text(doc))))
+            rec = {
+                'name': doc['name'],
+                'website': f"https://{doc['domain']}",
+                'industry': doc.get('industry', ''),
+                'size': doc.get('size', ''),
+                'headquarters': doc.get('headquarters', ''),
+                'description': doc.get('description', ''),
+                'fit_reason': f"Matches your profile on: {', '.join(matched)}" if matched else "Similar to your profile",
+                'fit_score': {'overall_score': round(40 + 60 * min(1.0, match['score']))},
+                'investment_areas': list(doc.get('investment_areas') or []),
+                'articles': [],
+                'leads': [],
+                'events': [],
+                'source': 'local'
+            }
+            if self.store is not None:
+                self.store.hydrate(rec)
+            recommendations.append(rec)
+        return recommendations
+
+    def seed_candidates(self, product: str, market: str, company_size: str, keywords: List[str],
+                        limit: int = 10) -> List[Dict]:
+        """
+        Pre-filter real companies to seed an LLM prompt
+
+        Returns:
+            List of {'name', 'domain', 'industry'} dictionaries
+        """
+        query = _profile_query(product, market, keywords)
+        return [
+            {'name': match['doc']['name'], 'domain': match['doc']['domain'], 'industry': match['doc'].get('industry', '')}
+            for match in self.search(query, company_size, k=limit)
+        ]
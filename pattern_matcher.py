@@ -0,0 +1,130 @@
+"""
+Pattern Matcher Module
+
+This module finds every occurrence of a set of keywords in a text in one
+linear pass using an Aho-Corasick automaton. Matchers are built once per
+keyword set and cached, so scoring loops, prompt construction and event
+filtering can replace their nested "keyword in text" loops with a single scan.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class MultiPatternMatcher:
+    """Case-insensitive Aho-Corasick matcher over a fixed set of patterns"""
+
+    def __init__(self, patterns: Iterable[str], whole_words: bool = False):
+        """
+        Build the automaton
+
+        Args:
+            patterns: Keywords to find; empty ones are ignored
+            whole_words: Only report matches not surrounded by letters or digits
+        """
+        self.patterns: Tuple[str, ...] = tuple(p for p in patterns if isinstance(p, str) and p.strip())
+        self.whole_words = whole_words
+
+        # Trie as parallel lists: transitions, failure links and pattern indexes ending at each node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        # Length of each pattern after case folding, the form the automaton matches
+        self._lengths: List[int] = [len(p.strip().casefold()) for p in self.patterns]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern.strip().casefold():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(index)
+
+        # Breadth-first failure links, merging the outputs of each node's suffixes
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Find every occurrence of every pattern
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            Tuples of (start, end, pattern index), offsets into the original text
+        """
+        if not text or not self.patterns:
+            return
+        folded = text.casefold()
+        # Case folding can lengthen the text ("ß" becomes "ss"), then map folded positions back
+        origin = None if len(folded) == len(text) else [i for i, char in enumerate(text) for _ in char.casefold()]
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                start, end = position + 1 - self._lengths[index], position + 1
+                if origin is not None:
+                    start, end = origin[start], origin[position] + 1
+                if self.whole_words and (
+                    (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum())
+                ):
+                    continue
+                yield start, end, index
+
+    def matches(self, text: str) -> List[str]:
+        """
+        Distinct patterns found in a text
+
+        Returns:
+            Matched patterns, in the order they were given
+        """
+        found = {index for _, _, index in self.find_all(text)}
+        return [self.patterns[index] for index in sorted(found)]
+
+    def count(self, text: str) -> int:
+        """Number of distinct patterns found in a text"""
+        return len({index for _, _, index in self.find_all(text)})
+
+    def search(self, text: str) -> bool:
+        """Whether any pattern occurs in a text"""
+        return next(self.find_all(text), None) is not None
+
+
+@lru_cache(maxsize=256)
+def _build_matcher(patterns: Tuple[str, ...], whole_words: bool) -> MultiPatternMatcher:
+    return MultiPatternMatcher(patterns, whole_words)
+
+
+def get_matcher(patterns: Iterable[str], whole_words: bool = False) -> MultiPatternMatcher:
+    """
+    Get the cached matcher for a set of patterns, building it on first use
+
+    Args:
+        patterns: Keywords to find
+        whole_words: Only report matches not surrounded by letters or digits
+
+    Returns:
+        MultiPatternMatcher shared by every caller with the same patterns
+    """
+    return _build_matcher(tuple(patterns), whole_words)
@@ -0,0 +1,173 @@
+"""
+Prompt Budget Module
+
+This module keeps LLM prompts within a token budget per call site. Tokens are
+estimated from text length, keyword lists are cut to their highest-weighted
+entries, optional prompt sections are shortened or dropped in reverse priority
+order when a prompt runs over its budget, and older conversation turns are
+folded into a short summary so the conversation context stops growing.
+"""
+
+import logging
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from keyword_set import KeywordSet
+
+logger = logging.getLogger(__name__)
+
+# Token budget of each prompt call site, overridable with PROMPT_BUDGET_<SITE>
+DEFAULT_BUDGETS = {
+    'recommendations': 3000,
+    'keywords': 600,
+    'follow_up': 400,
+    'conversation': 300
+}
+
+# Average characters per token of English prompt text
+CHARS_PER_TOKEN = 4
+
+_ELLIPSIS = '...'
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def shorten(text: Optional[str], max_tokens: int) -> str:
+    """
+    Cut a text to about max_tokens tokens at a word boundary
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token allowance
+
+    Returns:
+        The text, or its beginning followed by an ellipsis
+    """
+    text = (text or '').strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * CHARS_PER_TOKEN - len(_ELLIPSIS))
+    cut = text[:limit].rsplit(' ', 1)[0] if ' ' in text[:limit] else text[:limit]
+    return cut.rstrip(' ,;:') + _ELLIPSIS if cut else ''
+
+
+class PromptBudget:
+    """Per-call-site token budgets for prompt construction"""
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, max_keywords: Optional[int] = None):
+        """
+        Initialize the budgets
+
+        Args:
+            budgets: Token budget per call site, defaults to DEFAULT_BUDGETS with PROMPT_BUDGET_<SITE> overrides
+            max_keywords: Most keywords put into a prompt, defaults to PROMPT_MAX_KEYWORDS
+        """
+        self.budgets = {
+            site: int(os.getenv(f"PROMPT_BUDGET_{site.upper()}", str(tokens)))
+            for site, tokens in DEFAULT_BUDGETS.items()
+        }
+        self.budgets.update(budgets or {})
+        self.max_keywords = max_keywords or int(os.getenv("PROMPT_MAX_KEYWORDS", "20"))
+
+    def budget(self, site: str) -> int:
+        """Token budget of a call site"""
+        return self.budgets.get(site, DEFAULT_BUDGETS['recommendations'])
+
+    def select_keywords(self, keywords: Iterable[str], max_tokens: Optional[int] = None,
+                        max_count: Optional[int] = None) -> List[str]:
+        """
+        Choose the keywords to put into a prompt
+
+        Args:
+            keywords: KeywordSet (taken by weight) or list (taken in order)
+            max_tokens: Token allowance of the comma separated list
+            max_count: Most keywords to keep, defaults to max_keywords
+
+        Returns:
+            Selected keywords, most relevant first
+        """
+        ordered = keywords.top() if isinstance(keywords, KeywordSet) else [k for k in keywords or [] if k]
+        max_count = max_count or self.max_keywords
+        selected, tokens = [], 0
+        for keyword in ordered[:max_count]:
+            cost = estimate_tokens(keyword + ', ')
+            if max_tokens is not None and tokens + cost > max_tokens:
+                break
+            selected.append(keyword)
+            tokens += cost
+        if len(selected) < len(ordered):
+            logger.info(f"Prompt keywords trimmed from {len(ordered)} to {len(selected)}")
+        return selected
+
+    def fit(self, site: str, fixed: str, sections: Dict[str, str]) -> Dict[str, str]:
+        """
+        Fit optional prompt sections into what the fixed text leaves of a call site's budget
+
+        Sections are given most important first; the least important ones are shortened,
+        then dropped, until the prompt is within budget.
+
+        Args:
+            site: Call site, e.g. "recommendations"
+            fixed: Prompt text that is always sent
+            sections: Optional sections by name, in priority order
+
+        Returns:
+            The sections, with trimmed ones shortened or empty
+        """
+        budget = self.budget(site)
+        fitted = dict(sections)
+        over = estimate_tokens(fixed) + sum(estimate_tokens(text) for text in fitted.values()) - budget
+        if over <= 0:
+            return fitted
+
+        trimmed = []
+        for name in reversed(list(fitted)):
+            if over <= 0:
+                break
+            tokens = estimate_tokens(fitted[name])
+            if not tokens:
+                continue
+            # Keep a shortened section if at least half of it fits, otherwise drop it
+            keep = tokens - over
+            fitted[name] = shorten(fitted[name], keep) if keep >= tokens // 2 else ''
+            over -= tokens - estimate_tokens(fitted[name])
+            trimmed.append(name)
+        logger.info(f"Prompt for {site} over its {budget} token budget, trimmed {', '.join(trimmed)}")
+        return fitted
+
+    def summarize_conversation(self, memory: List[Dict], summary: str,
+                               keep_recent: int = 2) -> Tuple[str, List[Dict]]:
+        """
+        Fold older conversation turns into the summary once the conversation exceeds its budget
+
+        Args:
+            memory: Conversation turns as {'step', 'answer'} dictionaries
+            summary: Current summary of earlier turns
+            keep_recent: Turns kept verbatim
+
+        Returns:
+            Tuple of (summary, remaining turns)
+        """
+        budget = self.budget('conversation')
+        tokens = estimate_tokens(summary) + sum(estimate_tokens(str(turn.get('answer', ''))) for turn in memory)
+        if tokens <= budget or len(memory) <= keep_recent:
+            return summary, memory
+
+        older, recent = memory[:len(memory) - keep_recent], memory[len(memory) - keep_recent:]
+        # Each folded turn keeps a tenth of the budget, so a whole onboarding fits in half of it
+        per_turn = max(8, budget // 10)
+        folded = '; '.join(f"{turn.get('step', 'answer')}: {shorten(str(turn.get('answer', '')), per_turn)}" for turn in older)
+        summary = shorten(f"{summary}; {folded}" if summary else folded, budget // 2)
+        return summary, recent
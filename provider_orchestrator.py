@@ -0,0 +1,258 @@
+"""
+Provider Orchestrator Module
+
+This module fans a recommendation request out to several LLM providers.
+In "first" mode the request is hedged: the cheapest provider starts first and
+the next one only once the previous has failed or run past its expected
+latency; the first valid response wins and the other requests are cancelled.
+In "merge" mode every provider starts at once and every response is collected
+so the candidate pool can dedupe them. Each provider's latency and error rate
+are tracked as exponentially weighted moving averages, which decide the
+routing order and keep persistently failing providers out of the race; an
+excluded provider is retried once per cooldown so it can recover after an
+outage. Optional per-provider rate limits space out calls so batch runs stay
+within provider quotas.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ProviderFn = Callable[..., Awaitable[List[Dict]]]
+
+
+class ProviderStats:
+    """Latency and error EWMA for one provider"""
+
+    def __init__(self, alpha: float = 0.3):
+        """
+        Initialize empty stats
+
+        Args:
+            alpha: Weight of the newest observation in the moving averages
+        """
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        # time.monotonic() of the last call started or finished
+        self.last_called: Optional[float] = None
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Fold one finished call into the moving averages"""
+        self.calls += 1
+        self.last_called = time.monotonic()
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+
+    def record_cancelled(self, elapsed: float) -> None:
+        """Fold in a call that lost the race, whose latency is at least the elapsed time"""
+        self.last_called = time.monotonic()
+        if self.latency is None or elapsed > self.latency:
+            self.latency = elapsed if self.latency is None else self.latency + self.alpha * (elapsed - self.latency)
+
+    def cost(self) -> float:
+        """Expected seconds to a valid response, penalizing providers that fail often"""
+        latency = self.latency if self.latency is not None else 0.0
+        return latency / max(0.05, 1.0 - self.error_rate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'calls': self.calls
+        }
+
+
+class RateLimiter:
+    """Token bucket limiting how many calls start per minute"""
+
+    def __init__(self, per_minute: float, burst: Optional[int] = None):
+        """
+        Initialize a full bucket
+
+        Args:
+            per_minute: Sustained calls per minute
+            burst: Calls that may start at once, defaults to one second's worth (at least 1)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(self.rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a call may start"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ProviderOrchestrator:
+    """Runs configured LLM providers concurrently and picks or merges their responses"""
+
+    def __init__(self, providers: Dict[str, ProviderFn], mode: str = "first", alpha: float = 0.3,
+                 max_error_rate: float = 0.8, rate_limits: Optional[Dict[str, float]] = None,
+                 probe_after: float = 60.0, hedge_factor: float = 1.0):
+        """
+        Initialize the orchestrator
+
+        Args:
+            providers: Provider name to coroutine function returning parsed recommendations
+            mode: "first" to take the first valid response, "merge" to combine all of them
+            alpha: Weight of the newest observation in the latency and error EWMA
+            max_error_rate: Providers failing more often than this are skipped while others are healthy
+            rate_limits: Optional provider name to maximum calls per minute
+            probe_after: Seconds after its last call that a skipped provider is tried again
+            hedge_factor: In "first" mode, multiple of a provider's expected latency to wait
+                before starting the next one; 0 starts every provider at once
+        """
+        if mode not in ("first", "merge"):
+            raise ValueError(f"Unknown provider mode: {mode}")
+        self.providers = providers
+        self.mode = mode
+        self.max_error_rate = max_error_rate
+        self.probe_after = probe_after
+        self.hedge_factor = hedge_factor
+        self.stats = {name: ProviderStats(alpha) for name in providers}
+        self.limiters = {name: RateLimiter(rpm) for name, rpm in (rate_limits or {}).items() if rpm and rpm > 0}
+
+    def route(self) -> List[str]:
+        """
+        Order providers by expected cost, leaving out unhealthy ones while a healthy one exists
+
+        Stats only change when a provider is called, so an unhealthy provider is still
+        tried once every probe_after seconds; a successful probe brings it back.
+
+        Returns:
+            Provider names to call, cheapest first
+        """
+        ordered = sorted(self.providers, key=lambda name: self.stats[name].cost())
+        healthy = [name for name in ordered if self.stats[name].error_rate <= self.max_error_rate]
+        if not healthy:
+            return ordered
+
+        now = time.monotonic()
+        probes = []
+        for name in ordered:
+            stats = self.stats[name]
+            if name not in healthy and (stats.last_called is None or now - stats.last_called >= self.probe_after):
+                # Claim the probe now, so concurrent requests don't all retry the provider
+                stats.last_called = now
+                probes.append(name)
+                logger.info(f"Probing provider {name} (error rate {stats.error_rate:.2f})")
+        return healthy + probes
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to give a provider before the next one is started, 0 while its latency is unknown"""
+        latency = self.stats[name].latency
+        return 0.0 if latency is None else latency * self.hedge_factor
+
+    async def _call(self, name: str, kwargs: Dict[str, Any],
+                    validate: Optional[Callable[[List[Dict]], bool]]) -> Tuple[str, List[Dict]]:
+        """Call one provider, recording its latency and whether it produced a valid response"""
+        if name in self.limiters:
+            await self.limiters[name].acquire()
+        start = time.perf_counter()
+        try:
+            result = await self.providers[name](**kwargs)
+            if not result or (validate is not None and not validate(result)):
+                raise ValueError(f"{name} returned no valid recommendations")
+        except asyncio.CancelledError:
+            self.stats[name].record_cancelled(time.perf_counter() - start)
+            raise
+        except Exception:
+            self.stats[name].record(time.perf_counter() - start, ok=False)
+            raise
+        self.stats[name].record(time.perf_counter() - start, ok=True)
+        return name, result
+
+    async def generate(self, validate: Optional[Callable[[List[Dict]], bool]] = None,
+                       mode: Optional[str] = None, **kwargs) -> Tuple[List[Dict], List[str]]:
+        """
+        Generate recommendations with the routed providers
+
+        In "first" mode providers are started one at a time, cheapest first, each once the
+        previous one failed or exceeded hedge_delay(); probes of skipped providers start
+        right away. In "merge" mode every routed provider starts at once.
+
+        Args:
+            validate: Optional check a response must pass to count as valid
+            mode: Override the orchestrator's mode for this call
+            **kwargs: Arguments passed to every provider
+
+        Returns:
+            Tuple of (recommendations, names of the providers they came from)
+
+        Raises:
+            Exception: If no provider returned a valid response
+        """
+        mode = mode or self.mode
+        names = self.route()
+        if not names:
+            raise Exception("No recommendation providers configured")
+
+        tasks = []
+        errors = []
+        try:
+            if mode == "first":
+                # Probes start at once, otherwise a fast provider would keep them from ever running
+                probes = [name for name in names if self.stats[name].error_rate > self.max_error_rate]
+                pending = [name for name in names if name not in probes]
+                running = {asyncio.create_task(self._call(name, kwargs, validate)) for name in probes}
+                tasks.extend(running)
+                while pending or running:
+                    timeout = None
+                    if pending:
+                        name = pending.pop(0)
+                        task = asyncio.create_task(self._call(name, kwargs, validate))
+                        tasks.append(task)
+                        running.add(task)
+                        if pending:
+                            timeout = self.hedge_delay(name)
+                    done, running = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        try:
+                            name, result = task.result()
+                        except Exception as e:
+                            errors.append(str(e))
+                            continue
+                        logger.info(f"Provider {name} won with {len(result)} recommendations")
+                        return result, [name]
+                raise Exception(f"All providers failed: {'; '.join(errors)}")
+
+            tasks = [asyncio.create_task(self._call(name, kwargs, validate)) for name in names]
+
+            merged, used = [], []
+            for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    errors.append(str(outcome))
+                    continue
+                name, result = outcome
+                merged.extend(result)
+                used.append(name)
+            if not used:
+                raise Exception(f"All providers failed: {'; '.join(errors)}")
+            logger.info(f"Merged {len(merged)} recommendations from {', '.join(used)}")
+            return merged, used
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Failures that lost the race are already counted in the stats
+                    task.exception()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the current stats of every provider"""
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
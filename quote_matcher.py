@@ -0,0 +1,128 @@
+"""
+Quote Matcher Module
+
+This module builds a word-shingle index over fetched article text once so that
+any number of executive quotes and summary sentences can be checked against the
+article with cheap set lookups instead of re-scanning the text for every claim.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+# Typographic characters that LLMs and publishers use interchangeably
+_PUNCTUATION_MAP = str.maketrans({
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2013': '-',
+    '\u2014': '-',
+    '\u2026': '...',
+    '\u00a0': ' ',
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for matching by folding case, diacritics and punctuation variants
+
+    Args:
+        text: Raw text
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    text = text.translate(_PUNCTUATION_MAP)
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized word tokens, dropping all punctuation
+
+    Args:
+        text: Raw text
+
+    Returns:
+        List of tokens
+    """
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class QuoteIndex:
+    """Shingle index over a single article used to score quotes and sentences"""
+
+    def __init__(self, text: str, shingle_size: int = 3):
+        """
+        Build the index
+
+        Args:
+            text: Article text
+            shingle_size: Number of consecutive tokens per shingle
+        """
+        self.shingle_size = shingle_size
+        tokens = tokenize(text)
+        self.token_count = len(tokens)
+        self.tokens = frozenset(tokens)
+        self.shingles = frozenset(self._shingles(tokens))
+
+    def _shingles(self, tokens: List[str]) -> Iterable[int]:
+        """Yield hashed shingles for a token sequence"""
+        size = self.shingle_size
+        for i in range(len(tokens) - size + 1):
+            yield hash(tuple(tokens[i:i + size]))
+
+    def __bool__(self) -> bool:
+        return self.token_count > 0
+
+    def match(self, claim: str) -> Dict[str, float]:
+        """
+        Score how much of a claim is contained in the indexed article
+
+        Shingle containment rewards verbatim word sequences while token
+        containment tolerates reordering and light paraphrasing.
+
+        Args:
+            claim: Quote or sentence to look up
+
+        Returns:
+            Dictionary with the combined score and its components
+        """
+        tokens = tokenize(claim)
+        if not tokens or not self.tokens:
+            return {'score': 0.0, 'shingle_containment': 0.0, 'token_containment': 0.0}
+
+        token_containment = sum(1 for t in tokens if t in self.tokens) / len(tokens)
+
+        if len(tokens) < self.shingle_size:
+            # Too short to shingle, rely on token containment alone
+            shingle_containment = token_containment
+        else:
+            claim_shingles = set(self._shingles(tokens))
+            shingle_containment = len(claim_shingles & self.shingles) / len(claim_shingles)
+
+        score = 0.75 * shingle_containment + 0.25 * token_containment
+        return {
+            'score': round(score, 2),
+            'shingle_containment': round(shingle_containment, 2),
+            'token_containment': round(token_containment, 2)
+        }
+
+    def match_many(self, claims: Iterable[str]) -> List[Dict[str, float]]:
+        """
+        Score a batch of claims against the indexed article
+
+        Args:
+            claims: Quotes or sentences to look up
+
+        Returns:
+            List of match dictionaries in the same order as the claims
+        """
+        return [self.match(claim) for claim in claims]
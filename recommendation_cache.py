@@ -0,0 +1,281 @@
+"""
+Recommendation Cache Module
+
+This module caches generated recommendation pools under a canonical profile
+fingerprint, so users with equivalent product/market/size/keyword profiles share
+one LLM generation. Entries expire after a TTL, the least recently used entries
+are evicted first, and expired entries are served stale while a single
+background task regenerates them.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from quote_matcher import tokenize
+from recommendation_verifier import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+_SIZE_BUCKETS = (
+    ('startup', ('startup', 'seed', 'early', 'series a', 'founder')),
+    ('enterprise', ('enterprise', 'large', 'fortune', 'global', 'corporate')),
+    ('medium', ('medium', 'mid', 'midsize', 'mid-market', 'growth')),
+    ('small', ('small', 'smb', 'sme', 'local')),
+)
+_NUMBER_RE = re.compile(r'\d[\d,]*')
+
+# Suffixes stripped by stem(), first match wins. "es" is only a plural ending after a sibilant
+# ("boxes", "churches"); elsewhere just the "s" goes, so "services" and "service" share a stem.
+_SUFFIXES = (
+    ('ies', 'y'), ('sses', 'ss'), ('ches', 'ch'), ('shes', 'sh'), ('xes', 'x'), ('zes', 'z'),
+    ('ing', ''), ('ed', ''), ('s', '')
+)
+
+
+def stem(word: str) -> str:
+    """
+    Reduce an English word to a crude stem so plural and verb forms share a key
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Stemmed word
+    """
+    if len(word) <= 3:
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            # "business", "status" and "analysis" are not plurals
+            if suffix == 's' and word.endswith(('ss', 'us', 'is')):
+                return word
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def normalize_terms(text: str) -> List[str]:
+    """
+    Tokenize, drop stopwords, stem, dedupe and sort the terms of a text
+
+    Args:
+        text: Free text answer or keyword
+
+    Returns:
+        Sorted list of unique stemmed terms
+    """
+    return sorted({stem(token) for token in tokenize(text) if token not in STOP_WORDS})
+
+
+def size_bucket(company_size: str) -> str:
+    """
+    Map a free-text company size answer to a coarse bucket
+
+    Args:
+        company_size: Answer to the company size question
+
+    Returns:
+        One of 'startup', 'small', 'medium', 'enterprise' or 'any'
+    """
+    text = (company_size or '').lower()
+    for bucket, terms in _SIZE_BUCKETS:
+        if any(term in text for term in terms):
+            return bucket
+
+    # Fall back to the largest employee count mentioned
+    numbers = [int(n.replace(',', '')) for n in _NUMBER_RE.findall(text)]
+    if numbers:
+        largest = max(numbers)
+        if largest < 50:
+            return 'startup'
+        if largest < 250:
+            return 'small'
+        if largest < 1000:
+            return 'medium'
+        return 'enterprise'
+    return 'any'
+
+
+def zip_prefix(zip_code: str) -> str:
+    """Return the 3-digit ZIP prefix, which identifies a regional area"""
+    digits = ''.join(ch for ch in (zip_code or '') if ch.isdigit())
+    return digits[:3] if len(digits) >= 3 else ''
+
+
+def canonical_profile(product: str, market: str, company_size: str, zip_code: str, keywords: List[str]) -> Dict[str, Any]:
+    """
+    Build the canonical form of a recommendation profile
+
+    Args:
+        product: Product/service answer
+        market: Target market answer
+        company_size: Target company size answer
+        zip_code: User zip code
+        keywords: User keywords
+
+    Returns:
+        Dictionary of normalized profile components
+    """
+    return {
+        'product': normalize_terms(product),
+        'market': normalize_terms(market),
+        'size': size_bucket(company_size),
+        'zip': zip_prefix(zip_code),
+        'keywords': sorted({' '.join(normalize_terms(keyword)) for keyword in keywords or []} - {''})
+    }
+
+
+def base_fingerprint(product: str, market: str, company_size: str) -> str:
+    """
+    Hash only the parts of the profile that decide which companies are candidates
+
+    Keyword and location edits keep the same base fingerprint, so the pool
+    generated for it can be rescored instead of regenerated.
+
+    Returns:
+        Hex digest identifying profiles with the same product, market and size
+    """
+    profile = canonical_profile(product, market, company_size, '', [])
+    base = {'product': profile['product'], 'market': profile['market'], 'size': profile['size']}
+    return hashlib.sha1(json.dumps(base, sort_keys=True).encode()).hexdigest()
+
+
+def profile_fingerprint(product: str, market: str, company_size: str, zip_code: str, keywords: List[str]) -> str:
+    """
+    Hash the canonical profile into a cache key
+
+    Returns:
+        Hex digest identifying equivalent profiles
+    """
+    profile = canonical_profile(product, market, company_size, zip_code, keywords)
+    return hashlib.sha1(json.dumps(profile, sort_keys=True).encode()).hexdigest()
+
+
+class RecommendationCache:
+    """TTL + LRU cache with stale-while-revalidate and single-flight generation"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get singleton instance shared by all recommenders"""
+        if cls._instance is None:
+            cls._instance = RecommendationCache(
+                ttl=float(os.getenv("RECOMMENDATION_CACHE_TTL", "3600")),
+                stale_ttl=float(os.getenv("RECOMMENDATION_CACHE_STALE_TTL", "86400")),
+                max_entries=int(os.getenv("RECOMMENDATION_CACHE_SIZE", "256"))
+            )
+        return cls._instance
+
+    def __init__(self, ttl: float = 3600, stale_ttl: float = 86400, max_entries: int = 256):
+        """
+        Initialize the cache
+
+        Args:
+            ttl: Seconds an entry is served as fresh
+            stale_ttl: Additional seconds an expired entry may be served while it is regenerated
+            max_entries: Maximum number of entries before evicting the least recently used
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[Any, Optional[str]]:
+        """
+        Look up an entry without generating it
+
+        Args:
+            key: Profile fingerprint
+
+        Returns:
+            Tuple of (value, state) where state is 'fresh', 'stale' or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+
+        created_at, value = entry
+        age = time.time() - created_at
+        if age > self.ttl + self.stale_ttl:
+            del self._entries[key]
+            return None, None
+
+        self._entries.move_to_end(key)
+        return value, 'fresh' if age <= self.ttl else 'stale'
+
+    def set(self, key: str, value: Any) -> None:
+        """Store an entry, evicting the least recently used ones beyond max_entries"""
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Remove an entry"""
+        self._entries.pop(key, None)
+
+    async def get_or_create(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        Get an entry, generating it on a miss and refreshing it in the background when stale
+
+        Concurrent misses for the same key share one call to the factory.
+
+        Args:
+            key: Profile fingerprint
+            factory: Coroutine function that generates the value
+
+        Returns:
+            Tuple of (value, state) where state is 'fresh', 'stale' or 'miss'
+        """
+        value, state = self.get(key)
+        if state == 'fresh':
+            return value, state
+
+        if state == 'stale':
+            if key not in self._refreshing and key not in self._inflight:
+                task = asyncio.create_task(self._refresh(key, factory))
+                self._refreshing[key] = task
+                task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+            return value, state
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight), 'miss'
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await factory()
+            self.set(key, value)
+            future.set_result(value)
+            return value, 'miss'
+        except BaseException as e:
+            # Cancellation is not an Exception, but callers waiting on the future still need an answer
+            if not isinstance(e, Exception):
+                e = Exception(f"Generation of cache entry {key[:8]} was cancelled")
+            future.set_exception(e)
+            # Nobody else may be waiting on the future, so don't leave its exception unretrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(self, key: str, factory: Callable[[], Awaitable[Any]]) -> None:
+        """Regenerate a stale entry, keeping the stale value if generation fails"""
+        try:
+            self.set(key, await factory())
+            logger.info(f"Refreshed stale recommendation cache entry {key[:8]}")
+        except Exception as e:
+            logger.error(f"Error refreshing recommendation cache entry {key[:8]}: {str(e)}")
@@ -0,0 +1,266 @@
+"""
+Recommendation Ranker Module
+
+This module scores a pool of company recommendations in one vectorized pass.
+Per-company signals (article recency, lead seniority, event proximity, location
+and keyword hits) are flattened into NumPy arrays, reduced per company and then
+combined with a single weighted sum, so ranking hundreds of candidates is cheap.
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from date_normalizer import parse_date_range
+from geo import Geocoder, haversine_km
+from keyword_set import KeywordSet
+from pattern_matcher import MultiPatternMatcher, get_matcher
+
+logger = logging.getLogger(__name__)
+
+# Column order of the feature matrix and the weight of each factor in the final score
+FEATURES = ('base_score', 'news_score', 'personnel_score', 'events_score', 'location_score', 'keyword_score')
+WEIGHTS = np.array([0.4, 0.15, 0.15, 0.15, 0.05, 0.1])
+
+# Distance at which the location score has decayed to 1/e of its maximum
+LOCATION_DECAY_KM = 250.0
+
+_C_LEVEL_RE = re.compile(r'\b(?:ceo|cto|cfo|coo|cio|ciso|chief)\b')
+_VP_RE = re.compile(r'\b(?:vp|svp|evp|vice president|director|head)\b')
+
+
+def _source_matcher(domains: Sequence[str]) -> MultiPatternMatcher:
+    """
+    Build one matcher for any of the domains, or their name without TLD
+
+    Article sources are often given by name ("TechCrunch") and events by URL,
+    so both forms count as a priority source.
+    """
+    stems = sorted({domain.lower().rsplit('.', 1)[0] for domain in domains})
+    return get_matcher(stems, whole_words=True)
+
+
+class RecommendationScorer:
+    """Scores and ranks recommendations with vectorized feature arrays"""
+
+    def __init__(self, priority_news_sources: Sequence[str], priority_event_sources: Sequence[str]):
+        """
+        Initialize the scorer
+
+        Args:
+            priority_news_sources: Domains of news sources whose articles score higher
+            priority_event_sources: Domains of event sites whose events score higher
+        """
+        self._news_sources = _source_matcher(priority_news_sources)
+        self._event_sources = _source_matcher(priority_event_sources)
+        self.geocoder = Geocoder.get_instance()
+
+    def extract_features(self, recommendations: List[Dict], keywords: List[str], zip_code: str,
+                         now: Optional[datetime] = None, linkedin_consent: bool = False) -> np.ndarray:
+        """
+        Build the feature matrix for a pool of recommendations
+
+        Args:
+            recommendations: Company recommendations
+            keywords: User keywords, a KeywordSet's weights scale its keyword hits
+            zip_code: User zip code
+            now: Reference time, defaults to the current time
+            linkedin_consent: Whether the user connected LinkedIn, making leads with a profile reachable
+
+        Returns:
+            Array of shape (len(recommendations), len(FEATURES))
+        """
+        now = now or datetime.now()
+        n = len(recommendations)
+        features = np.zeros((n, len(FEATURES)))
+        if n == 0:
+            return features
+
+        features[:, 0] = [self._base_score(company) for company in recommendations]
+
+        # Articles: 0-10 points for recency within a year, 5 if the date is unparseable
+        owners, days_ago, _, has_date, priority = self._flatten_dated(
+            recommendations, ('articles', 'news'), now, self._news_sources, ('source', 'url')
+        )
+        recency = np.where(np.isnan(days_ago), 5.0, np.clip(365 - days_ago, 0, None) / 365 * 10)
+        recency = np.where(has_date, recency, 0.0) * np.where(priority, 1.5, 1.0)
+        features[:, 1] = np.minimum(20, np.bincount(owners, weights=recency, minlength=n))
+
+        # Leads: seniority counts plus quotes, and leads reachable on LinkedIn when connected, capped at 15
+        seniority = self._seniority_counts(recommendations)
+        features[:, 2] = np.minimum(15, seniority @ np.array([3.0, 2.0, 1.0, 2.0, 1.0 if linkedin_consent else 0.0]))
+
+        # Events: 0-10 points for events within the next 90 days, or in progress, 5 if the date is unparseable
+        owners, days_ago, days_ago_end, has_date, priority = self._flatten_dated(
+            recommendations, ('events',), now, self._event_sources, ('url',)
+        )
+        days_until = np.where((days_ago > 0) & (days_ago_end <= 0), 0.0, -days_ago)
+        timing = np.where((days_until >= 0) & (days_until <= 90), (90 - days_until) / 90 * 10, 0.0)
+        timing = np.where(np.isnan(days_until), 5.0, timing)
+        timing = np.where(has_date, timing, 0.0) * np.where(priority, 1.5, 1.0)
+        features[:, 3] = np.minimum(15, np.bincount(owners, weights=timing, minlength=n))
+
+        # Location: 0-10 points decaying with distance to the headquarters or the closest event
+        if zip_code:
+            features[:, 4] = self._location_scores(recommendations, zip_code)
+
+        # Keywords: 2 points per keyword found in the description, scaled by its weight for a KeywordSet, capped at 10
+        if keywords:
+            matcher = get_matcher(keywords)
+            if isinstance(keywords, KeywordSet):
+                weights = keywords.weights()
+                hits = [sum(weights[keyword] for keyword in matcher.matches(company.get("description") or ""))
+                        for company in recommendations]
+            else:
+                hits = [matcher.count(company.get("description") or "") for company in recommendations]
+            features[:, 5] = np.minimum(10, np.array(hits, dtype=float) * 2)
+
+        return features
+
+    def score(self, recommendations: List[Dict], keywords: List[str], zip_code: str,
+              now: Optional[datetime] = None, linkedin_consent: bool = False) -> np.ndarray:
+        """
+        Score recommendations and attach the ranking factors to each one
+
+        Args:
+            recommendations: Company recommendations, updated in place
+            keywords: User keywords
+            zip_code: User zip code
+            now: Reference time, defaults to the current time
+            linkedin_consent: Whether the user connected LinkedIn
+
+        Returns:
+            Array of final scores
+        """
+        features = self.extract_features(recommendations, keywords, zip_code, now, linkedin_consent)
+        final_scores = features @ WEIGHTS
+
+        for company, row, final_score in zip(recommendations, features.tolist(), final_scores.tolist()):
+            company["ranking"] = {
+                "final_score": round(final_score, 2),
+                "factors": {name: round(value, 2) for name, value in zip(FEATURES, row)}
+            }
+        return final_scores
+
+    def rank(self, recommendations: List[Dict], keywords: List[str], zip_code: str,
+             now: Optional[datetime] = None, linkedin_consent: bool = False) -> List[Dict]:
+        """
+        Score recommendations and return them sorted by final score, best first
+
+        Args:
+            recommendations: Company recommendations
+            keywords: User keywords
+            zip_code: User zip code
+            now: Reference time, defaults to the current time
+            linkedin_consent: Whether the user connected LinkedIn
+
+        Returns:
+            Ranked recommendations
+        """
+        final_scores = self.score(recommendations, keywords, zip_code, now, linkedin_consent)
+        order = np.argsort(-final_scores, kind='stable')
+        return [recommendations[i] for i in order]
+
+    @staticmethod
+    def _base_score(company: Dict) -> float:
+        fit_score = company.get("fit_score")
+        if isinstance(fit_score, dict):
+            try:
+                return float(fit_score.get("overall_score", 50))
+            except (TypeError, ValueError):
+                return 50.0
+        return 50.0
+
+    @staticmethod
+    def _items(company: Dict, fields: Tuple[str, ...]) -> List:
+        for field in fields:
+            items = company.get(field)
+            if isinstance(items, list) and items:
+                return items
+        return []
+
+    def _flatten_dated(self, recommendations: List[Dict], fields: Tuple[str, ...], now: datetime,
+                       sources: MultiPatternMatcher, source_fields: Tuple[str, ...]):
+        """
+        Flatten dated items of every company into parallel arrays
+
+        Returns:
+            Tuple of (owner index, days the date (range) starts and ends before now or NaN
+            if unparseable, whether a date was given, whether the item is from a priority source)
+        """
+        owners, days_ago, days_ago_end, has_date, priority = [], [], [], [], []
+        for i, company in enumerate(recommendations):
+            for item in self._items(company, fields):
+                if not isinstance(item, dict):
+                    continue
+                date_str = item.get("date") or ""
+                parsed = parse_date_range(date_str) if isinstance(date_str, str) else None
+                owners.append(i)
+                days_ago.append((now - parsed[0]).days if parsed else np.nan)
+                days_ago_end.append((now - parsed[1]).days if parsed else np.nan)
+                has_date.append(bool(date_str))
+                source_text = " ".join(str(item.get(field) or "") for field in source_fields)
+                priority.append(sources.search(source_text))
+        return (
+            np.array(owners, dtype=np.intp),
+            np.array(days_ago, dtype=float),
+            np.array(days_ago_end, dtype=float),
+            np.array(has_date, dtype=bool),
+            np.array(priority, dtype=bool)
+        )
+
+    def _location_scores(self, recommendations: List[Dict], zip_code: str) -> np.ndarray:
+        """Score every company by its closest known location to the user's ZIP code"""
+        scores = np.zeros(len(recommendations))
+        origin = self.geocoder.locate_zip(zip_code)
+        if origin is None:
+            return scores
+
+        owners, places = [], []
+        for i, company in enumerate(recommendations):
+            for place in (company.get("headquarters"), company.get("location")):
+                if isinstance(place, str) and place:
+                    owners.append(i)
+                    places.append(place)
+            for event in self._items(company, ("events",)):
+                if isinstance(event, dict) and isinstance(event.get("location"), str):
+                    owners.append(i)
+                    places.append(event["location"])
+        if not places:
+            return scores
+
+        lats, lons = self.geocoder.locate_many(places)
+        distances = haversine_km(origin[0], origin[1], lats, lons)
+        proximity = np.where(np.isnan(distances), 0.0, 10 * np.exp(-np.nan_to_num(distances) / LOCATION_DECAY_KM))
+        np.maximum.at(scores, np.array(owners, dtype=np.intp), proximity)
+        return scores
+
+    def _seniority_counts(self, recommendations: List[Dict]) -> np.ndarray:
+        """Count C-level, VP/director, other leads, leads with quotes and leads with a LinkedIn profile per company"""
+        counts = np.zeros((len(recommendations), 5))
+        for i, company in enumerate(recommendations):
+            for person in self._items(company, ("leads", "personnel", "key_personnel")):
+                if isinstance(person, str):
+                    # "Name, Title" format
+                    title = person.split(",", 1)[1] if "," in person else ""
+                    has_quote = False
+                elif isinstance(person, dict):
+                    title = person.get("title") or ""
+                    has_quote = bool(person.get("recent_quote"))
+                    if "linkedin.com/" in str(person.get("linkedin") or ""):
+                        counts[i, 4] += 1
+                else:
+                    continue
+                title = title.lower()
+                if _C_LEVEL_RE.search(title):
+                    counts[i, 0] += 1
+                elif _VP_RE.search(title):
+                    counts[i, 1] += 1
+                else:
+                    counts[i, 2] += 1
+                if has_quote:
+                    counts[i, 3] += 1
+        return counts
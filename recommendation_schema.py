@@ -0,0 +1,147 @@
+"""
+Recommendation Schema Module
+
+This module defines the company recommendation returned by LLM providers once,
+as slotted dataclasses, and derives the response schema for Gemini's structured
+output mode from it. Structured responses are plain JSON matching the schema,
+so they are decoded straight into these records with a single json.loads and
+need none of the text extraction fallbacks or field repair applied to free-form
+responses.
+"""
+
+import json
+from dataclasses import MISSING, asdict, dataclass, field, fields, is_dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, get_args, get_origin, get_type_hints
+
+# Gemini schema type of each scalar field type
+_SCHEMA_TYPES = {str: "STRING", int: "INTEGER", float: "NUMBER", bool: "BOOLEAN"}
+
+
+@dataclass(slots=True)
+class Article:
+    """Recent news article with an executive quote"""
+    title: str = ''
+    source: str = ''
+    date: str = ''
+    url: str = ''
+    quote: str = ''
+
+
+@dataclass(slots=True)
+class Lead:
+    """Decision maker at the company"""
+    name: str = ''
+    title: str = ''
+    email: str = ''
+    linkedin: str = ''
+
+
+@dataclass(slots=True)
+class Event:
+    """Upcoming event company representatives attend"""
+    name: str = ''
+    date: str = ''
+    location: str = ''
+    url: str = ''
+    description: str = ''
+    attending_companies: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Recommendation:
+    """Company recommendation; fields without a default are required in the response schema"""
+    name: str
+    website: str
+    fit_reason: str
+    industry: str = ''
+    size: str = ''
+    headquarters: str = ''
+    description: str = ''
+    investment_areas: List[str] = field(default_factory=list)
+    budget_allocation: str = ''
+    articles: List[Article] = field(default_factory=list)
+    leads: List[Lead] = field(default_factory=list)
+    events: List[Event] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary in the shape the candidate pool, ranker and views use"""
+        return asdict(self)
+
+
+@lru_cache(maxsize=None)
+def _field_types(cls) -> Dict[str, Any]:
+    return get_type_hints(cls)
+
+
+def _schema(tp) -> Dict[str, Any]:
+    if get_origin(tp) in (list, List):
+        return {"type": "ARRAY", "items": _schema(get_args(tp)[0])}
+    if is_dataclass(tp):
+        return response_schema(tp)
+    return {"type": _SCHEMA_TYPES[tp]}
+
+
+def response_schema(cls) -> Dict[str, Any]:
+    """
+    Derive a Gemini response schema from a record dataclass
+
+    Args:
+        cls: Dataclass such as Recommendation; nested dataclasses and lists are followed
+
+    Returns:
+        OBJECT schema with the fields in declaration order, requiring those without a default
+    """
+    types = _field_types(cls)
+    names = [f.name for f in fields(cls)]
+    return {
+        "type": "OBJECT",
+        "properties": {name: _schema(types[name]) for name in names},
+        "required": [f.name for f in fields(cls) if f.default is MISSING and f.default_factory is MISSING],
+        "propertyOrdering": names
+    }
+
+
+def _decode(tp, value):
+    if get_origin(tp) in (list, List):
+        return [_decode(get_args(tp)[0], item) for item in value or []]
+    if is_dataclass(tp):
+        return from_dict(tp, value)
+    return value
+
+
+def from_dict(cls, data: Dict[str, Any]):
+    """
+    Build a record from a decoded JSON object matching its response schema
+
+    Raises:
+        TypeError: If a required field is missing
+    """
+    types = _field_types(cls)
+    return cls(**{name: _decode(types[name], value) for name, value in data.items() if name in types})
+
+
+# Schema of a structured recommendation response: an array of Recommendation objects
+RECOMMENDATIONS_SCHEMA = {"type": "ARRAY", "items": response_schema(Recommendation)}
+
+
+def decode_recommendations(text: str) -> List[Recommendation]:
+    """
+    Decode a structured-output response into recommendation records
+
+    Args:
+        text: Response text produced with RECOMMENDATIONS_SCHEMA
+
+    Returns:
+        Recommendation records in response order
+
+    Raises:
+        ValueError: If the text is not a JSON array of recommendation objects (e.g. a truncated response)
+    """
+    try:
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError(f"expected a JSON array, got {type(items).__name__}")
+        return [from_dict(Recommendation, item) for item in items]
+    except (TypeError, AttributeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Structured response does not match the recommendation schema: {str(e)}")
@@ -7,40 +7,114 @@ by checking event details against their source URLs and detecting potential hall
 
 import asyncio
 import logging
+import os
 import re
 from datetime import datetime
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Tuple, Any, Optional
+from urllib.parse import quote_plus
 import aiohttp
 from bs4 import BeautifulSoup
-import nltk
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
+
+from company_registry import CompanyRegistry
+from date_normalizer import date_similarity, find_date
+from quote_matcher import QuoteIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Download NLTK resources if not already available
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
+# English stopwords, embedded so that importing this module never touches NLTK
+STOP_WORDS = frozenset("""
+a about above after again against ain all am an and any are aren aren't as at
+be because been before being below between both but by can couldn couldn't d
+did didn didn't do does doesn doesn't doing don don't down during each few for
+from further had hadn hadn't has hasn hasn't have haven haven't having he her
+here hers herself him himself his how i if in into is isn isn't it it's its
+itself just ll m ma me mightn mightn't more most mustn mustn't my myself needn
+needn't no nor not now o of off on once only or other our ours ourselves out
+over own re s same shan shan't she she's should should've shouldn shouldn't so
+some such t than that that'll the their theirs them themselves then there these
+they this those through to too under until up ve very was wasn wasn't we were
+weren weren't what when where which while who whom why will with won won't
+wouldn wouldn't y you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+# Sentence punctuation (plus closing quotes/brackets) followed by whitespace and an
+# uppercase letter, digit or opening quote, which is good enough for news summaries
+_SENTENCE_BOUNDARY_RE = re.compile(r'[.!?]["\')\]]*(?=\s+["\'(\[]?[A-Z0-9])')
+_ABBREVIATION_RE = re.compile(r'\b(?:mr|mrs|ms|dr|prof|sr|jr|st|vs|inc|corp|co|ltd|e\.g|i\.e|u\.s)\.$', re.IGNORECASE)
+
+_punkt_tokenizer: Optional[Callable[[str], List[str]]] = None
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences with a lightweight regex
+    
+    Args:
+        text: Text to split
+        
+    Returns:
+        List of sentences
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY_RE.finditer(text):
+        end = match.end()
+        if _ABBREVIATION_RE.search(text, start, match.start() + 1):
+            continue
+        sentences.append(text[start:end].strip())
+        start = end
+    sentences.append(text[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+def _get_punkt_tokenizer() -> Callable[[str], List[str]]:
+    """
+    Load the NLTK punkt sentence tokenizer on first use
+    
+    Returns:
+        NLTK sent_tokenize function
+    """
+    global _punkt_tokenizer
+    if _punkt_tokenizer is None:
+        import nltk
+        from nltk.tokenize import sent_tokenize
+        
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            logger.info("Downloading NLTK punkt tokenizer")
+            nltk.download('punkt', quiet=True)
+        _punkt_tokenizer = sent_tokenize
+    return _punkt_tokenizer
 
 
 class RecommendationVerifier:
     """Verifies recommendation data for accuracy and detects hallucinations"""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, use_punkt: Optional[bool] = None, registry: Optional[CompanyRegistry] = None):
         """
         Initialize the recommendation verifier
         
         Args:
             timeout: Timeout in seconds for HTTP requests
+            use_punkt: Use the NLTK punkt sentence tokenizer instead of the
+                regex splitter. Defaults to the VERIFIER_USE_PUNKT env variable.
+            registry: Company registry for existence checks, shared by default
         """
         self.timeout = timeout
-        self.stop_words = set(stopwords.words('english'))
+        self.registry = registry or CompanyRegistry.get_instance()
+        self.stop_words = STOP_WORDS
+        if use_punkt is None:
+            use_punkt = os.getenv("VERIFIER_USE_PUNKT", "false").lower() == "true"
+        self.use_punkt = use_punkt
+    
+    def _split_sentences(self, text: str) -> List[str]:
+        """Split text into sentences with punkt if enabled, else the regex splitter"""
+        if self.use_punkt:
+            return _get_punkt_tokenizer()(text)
+        return split_sentences(text)
         
     async def verify_recommendations(self, recommendations: List[Dict]) -> List[Dict]:
         """
@@ -55,112 +129,168 @@ class RecommendationVerifier:
         verified_recommendations = []
         
         for rec in recommendations:
-            # Create a copy of the recommendation to avoid modifying the original
-            verified_rec = rec.copy()
+            verified_recommendations.append(await self.verify_recommendation(rec))
+        
+        return verified_recommendations
+    
+    async def verify_recommendation(self, rec: Dict) -> Dict:
+        """
+        Verify a single recommendation and add verification metadata
+        
+        Args:
+            rec: Recommendation dictionary
             
-            # Add verification metadata container
-            verified_rec['verification'] = {
-                'timestamp': datetime.now().isoformat(),
-                'verified_elements': [],
-                'hallucination_score': 0.0,
-                'confidence_score': 1.0,
-                'warnings': []
-            }
+        Returns:
+            Enhanced recommendation with verification metadata
+        """
+        # Create a copy of the recommendation to avoid modifying the original
+        verified_rec = rec.copy()
+        # News items and articles are annotated in place below, so they need their own copies
+        for field in ('recent_news', 'articles'):
+            if isinstance(verified_rec.get(field), list):
+                verified_rec[field] = [dict(item) if isinstance(item, dict) else item for item in verified_rec[field]]
+        
+        # Add verification metadata container
+        verified_rec['verification'] = {
+            'timestamp': datetime.now().isoformat(),
+            'verified_elements': [],
+            'hallucination_score': 0.0,
+            'confidence_score': 1.0,
+            'warnings': []
+        }
+        
+        # Verify company existence
+        company_verification = await self.verify_company(verified_rec['name'], verified_rec.get('website'))
+        verified_rec['verification']['verified_elements'].append({
+            'element_type': 'company_name',
+            'verified': company_verification[0],
+            'confidence': company_verification[1],
+            'source': company_verification[2]
+        })
+        
+        # Verify events if present
+        if 'events' in verified_rec and verified_rec['events']:
+            verified_events = await self.verify_events(verified_rec['events'])
+            verified_rec['events'] = verified_events
             
-            # Verify company existence
-            company_verification = await self.verify_company(verified_rec['name'])
+            # Add event verification metadata
+            for i, event in enumerate(verified_events):
+                if 'verification' in event:
+                    verified_rec['verification']['verified_elements'].append({
+                        'element_type': f'event_{i}',
+                        'verified': event['verification']['verified'],
+                        'confidence': event['verification']['confidence'],
+                        'source': event['verification'].get('source', '')
+                    })
+                    
+                    # Adjust overall confidence based on event verification
+                    if not event['verification']['verified']:
+                        verified_rec['verification']['confidence_score'] *= 0.8
+                        verified_rec['verification']['hallucination_score'] += 0.2
+                        verified_rec['verification']['warnings'].append(
+                            f"Event '{event.get('name', 'Unknown')}' could not be verified"
+                        )
+        
+        # Verify news items and article quotes, fetching each URL only once
+        news_items = [
+            news for news in verified_rec.get('recent_news') or []
+            if isinstance(news, dict) and news.get('url')
+        ]
+        articles = [
+            article for article in verified_rec.get('articles') or []
+            if isinstance(article, dict) and article.get('url')
+        ]
+        if news_items or articles:
+            indexes = await self._fetch_article_indexes(
+                [item['url'] for item in news_items + articles]
+            )
+        
+        for i, news in enumerate(news_items):
+            news_verification = self._verify_item_claims(news, indexes[news['url']])
+            
+            # Add verification data to the news item
+            news['verification'] = news_verification
+            
+            # Add to overall verification metadata
             verified_rec['verification']['verified_elements'].append({
-                'element_type': 'company_name',
-                'verified': company_verification[0],
-                'confidence': company_verification[1],
-                'source': company_verification[2]
+                'element_type': f'news_{i}',
+                'verified': news_verification['verified'],
+                'confidence': news_verification['confidence'],
+                'source': news_verification.get('source', '')
             })
             
-            # Verify events if present
-            if 'events' in verified_rec and verified_rec['events']:
-                verified_events = await self.verify_events(verified_rec['events'])
-                verified_rec['events'] = verified_events
-                
-                # Add event verification metadata
-                for i, event in enumerate(verified_events):
-                    if 'verification' in event:
-                        verified_rec['verification']['verified_elements'].append({
-                            'element_type': f'event_{i}',
-                            'verified': event['verification']['verified'],
-                            'confidence': event['verification']['confidence'],
-                            'source': event['verification'].get('source', '')
-                        })
-                        
-                        # Adjust overall confidence based on event verification
-                        if not event['verification']['verified']:
-                            verified_rec['verification']['confidence_score'] *= 0.8
-                            verified_rec['verification']['hallucination_score'] += 0.2
-                            verified_rec['verification']['warnings'].append(
-                                f"Event '{event.get('name', 'Unknown')}' could not be verified"
-                            )
-            
-            # Verify news/investment information if present
-            if 'recent_news' in verified_rec and verified_rec['recent_news']:
-                for i, news in enumerate(verified_rec['recent_news']):
-                    if isinstance(news, dict) and 'url' in news and news['url']:
-                        news_verification = await self.verify_news_item(news)
-                        
-                        # Add verification data to the news item
-                        news['verification'] = news_verification
-                        
-                        # Add to overall verification metadata
-                        verified_rec['verification']['verified_elements'].append({
-                            'element_type': f'news_{i}',
-                            'verified': news_verification['verified'],
-                            'confidence': news_verification['confidence'],
-                            'source': news_verification.get('source', '')
-                        })
-                        
-                        # Adjust overall confidence based on news verification
-                        if not news_verification['verified']:
-                            verified_rec['verification']['confidence_score'] *= 0.9
-                            verified_rec['verification']['hallucination_score'] += 0.1
-                            verified_rec['verification']['warnings'].append(
-                                f"News item '{news.get('title', 'Unknown')}' could not be verified"
-                            )
+            # Adjust overall confidence based on news verification
+            if not news_verification['verified']:
+                verified_rec['verification']['confidence_score'] *= 0.9
+                verified_rec['verification']['hallucination_score'] += 0.1
+                verified_rec['verification']['warnings'].append(
+                    f"News item '{news.get('title', 'Unknown')}' could not be verified"
+                )
+        
+        for i, article in enumerate(articles):
+            article_verification = self._verify_item_claims(article, indexes[article['url']])
+            article['verification'] = article_verification
             
-            # Calculate final hallucination score
-            hallucination_score = 1.0 - verified_rec['verification']['confidence_score']
-            verified_rec['verification']['hallucination_score'] = round(hallucination_score, 2)
-            verified_rec['verification']['confidence_score'] = round(verified_rec['verification']['confidence_score'], 2)
+            verified_rec['verification']['verified_elements'].append({
+                'element_type': f'article_{i}',
+                'verified': article_verification['verified'],
+                'confidence': article_verification['confidence'],
+                'source': article_verification.get('source', '')
+            })
             
-            # Add hallucination warning if score is high
-            if hallucination_score > 0.5:
+            # Misattributed quotes are a stronger hallucination signal than summaries
+            if not article_verification['verified']:
+                verified_rec['verification']['confidence_score'] *= 0.85
+                verified_rec['verification']['hallucination_score'] += 0.15
                 verified_rec['verification']['warnings'].append(
-                    f"High hallucination score ({hallucination_score:.2f}). This recommendation may contain inaccurate information."
+                    f"Quote in article '{article.get('title', 'Unknown')}' could not be verified"
                 )
-            
-            verified_recommendations.append(verified_rec)
         
-        return verified_recommendations
+        # Calculate final hallucination score
+        hallucination_score = 1.0 - verified_rec['verification']['confidence_score']
+        verified_rec['verification']['hallucination_score'] = round(hallucination_score, 2)
+        verified_rec['verification']['confidence_score'] = round(verified_rec['verification']['confidence_score'], 2)
+        
+        # Add hallucination warning if score is high
+        if hallucination_score > 0.5:
+            verified_rec['verification']['warnings'].append(
+                f"High hallucination score ({hallucination_score:.2f}). This recommendation may contain inaccurate information."
+            )
+        
+        return verified_rec
     
-    async def verify_company(self, company_name: str) -> Tuple[bool, float, str]:
+    async def verify_company(self, company_name: str, website: Optional[str] = None) -> Tuple[bool, float, str]:
         """
-        Verify if a company exists by searching for it
+        Verify if a company exists, checking the local registry before searching for it
         
         Args:
             company_name: Name of the company to verify
+            website: Company website URL, if known
             
         Returns:
             Tuple of (verified, confidence, source)
         """
+        known = self.registry.lookup(company_name, website)
+        if known:
+            return True, 0.95, f"{known['source']}:{known['domain'] or known['name']}"
+        
         # Simple verification using a search engine
-        search_url = f"https://www.google.com/search?q={company_name}+company"
+        search_url = f"https://www.google.com/search?q={quote_plus(company_name)}+company"
         
         try:
             async with aiohttp.ClientSession() as session:
+                # The company's own website is a trusted source, so only its confirmation is remembered
+                if website and await self._website_names_company(session, company_name, website):
+                    self.registry.learn(company_name, website)
+                    return True, 0.9, website
+                
                 async with session.get(search_url, timeout=self.timeout) as response:
                     if response.status == 200:
                         html = await response.text()
                         soup = BeautifulSoup(html, 'html.parser')
                         
-                        # Check if company name appears in search results
-                        if re.search(company_name, soup.text, re.IGNORECASE):
+                        # Check if company name appears in search results (the page echoes the query, so don't learn from it)
+                        if re.search(re.escape(company_name), soup.text, re.IGNORECASE):
                             return True, 0.9, search_url
                         else:
                             return False, 0.5, search_url
@@ -171,6 +301,20 @@ class RecommendationVerifier:
             logger.error(f"Error verifying company {company_name}: {str(e)}")
             return False, 0.5, ""
     
+    async def _website_names_company(self, session: aiohttp.ClientSession, company_name: str, website: str) -> bool:
+        """Check whether a company's website loads and mentions the company's name"""
+        url = website if website.startswith(('http://', 'https://')) else f"https://{website}"
+        try:
+            async with session.get(url, timeout=self.timeout) as response:
+                if response.status != 200:
+                    return False
+                html = await response.text()
+        except Exception as e:
+            logger.info(f"Could not load website of {company_name}: {str(e)}")
+            return False
+        text = BeautifulSoup(html, 'html.parser').get_text(" ")
+        return re.search(re.escape(company_name), text, re.IGNORECASE) is not None
+    
     async def verify_events(self, events: List[Dict]) -> List[Dict]:
         """
         Verify event details by checking their URLs
@@ -255,19 +399,9 @@ class RecommendationVerifier:
         if title_tags:
             extracted_data['name'] = title_tags[0].text.strip()
         
-        # Extract date (look for date patterns)
-        date_patterns = [
-            r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b',  # DD/MM/YYYY
-            r'\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}\b',  # DD Month YYYY
-            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{2,4}\b'  # Month DD, YYYY
-        ]
-        
+        # Extract date (first date or date range mentioned on the page)
         text = soup.text
-        for pattern in date_patterns:
-            date_match = re.search(pattern, text, re.IGNORECASE)
-            if date_match:
-                extracted_data['date'] = date_match.group(0)
-                break
+        extracted_data['date'] = find_date(text)
         
         # Extract location
         location_patterns = [
@@ -336,8 +470,10 @@ class RecommendationVerifier:
         
         # Compare date
         if extracted_data['date'] and event.get('date'):
-            # Normalize dates for comparison
-            similarity = self._calculate_text_similarity(extracted_data['date'], event['date'])
+            # Compare as calendar ranges, falling back to text similarity for unparseable dates
+            similarity = date_similarity(extracted_data['date'], event['date'])
+            if similarity is None:
+                similarity = self._calculate_text_similarity(extracted_data['date'], event['date'])
             if similarity > 0.6:
                 verification_result['matches']['date'] = similarity
                 confidence += similarity
@@ -391,68 +527,134 @@ class RecommendationVerifier:
         Args:
             news: News dictionary from recommendation
             
+        Returns:
+            Verification result dictionary
+        """
+        # Skip verification if no URL is provided
+        if 'url' not in news or not news['url']:
+            return {
+                'verified': False,
+                'confidence': 0.5,
+                'source': '',
+                'message': "No URL provided for verification"
+            }
+        
+        indexes = await self._fetch_article_indexes([news['url']])
+        return self._verify_item_claims(news, indexes[news['url']])
+    
+    async def verify_articles(self, articles: List[Dict]) -> List[Dict]:
+        """
+        Verify article quotes and summaries, fetching each distinct URL once
+        
+        Args:
+            articles: List of article or news dictionaries
+            
+        Returns:
+            Copies of the articles with verification metadata
+        """
+        verified_articles = [article.copy() for article in articles]
+        urls = [article['url'] for article in verified_articles if article.get('url')]
+        indexes = await self._fetch_article_indexes(urls) if urls else {}
+        
+        for article in verified_articles:
+            if article.get('url'):
+                article['verification'] = self._verify_item_claims(article, indexes[article['url']])
+            else:
+                article['verification'] = {
+                    'verified': False,
+                    'confidence': 0.5,
+                    'source': '',
+                    'message': "No URL provided for verification"
+                }
+        
+        return verified_articles
+    
+    async def _fetch_article_indexes(self, urls: List[str]) -> Dict[str, Any]:
+        """
+        Fetch each distinct URL once and build a quote index over its article text
+        
+        Args:
+            urls: Article URLs, duplicates allowed
+            
+        Returns:
+            Dictionary mapping each URL to a QuoteIndex, or to an error message
+            string if the page could not be fetched
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        
+        async def fetch(session: aiohttp.ClientSession, url: str):
+            try:
+                async with session.get(url, timeout=self.timeout) as response:
+                    if response.status != 200:
+                        return f"Failed to access URL: HTTP {response.status}"
+                    html = await response.text()
+                    soup = BeautifulSoup(html, 'html.parser')
+                    return QuoteIndex(self._extract_article_text(soup))
+            except Exception as e:
+                return f"Error accessing URL: {str(e)}"
+        
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(*(fetch(session, url) for url in unique_urls))
+        
+        return dict(zip(unique_urls, results))
+    
+    def _verify_item_claims(self, item: Dict, index: Any) -> Dict:
+        """
+        Score an item's quote and summary sentences against a fetched article
+        
+        Args:
+            item: Article or news dictionary with 'quote' and/or 'summary'
+            index: QuoteIndex for the item's URL, or an error message string
+            
         Returns:
             Verification result dictionary
         """
         verification_result = {
             'verified': False,
             'confidence': 0.0,
-            'source': news.get('url', '')
+            'source': item.get('url', '')
         }
         
-        # Skip verification if no URL is provided
-        if 'url' not in news or not news['url']:
-            verification_result['message'] = "No URL provided for verification"
-            verification_result['confidence'] = 0.5
+        if isinstance(index, str):
+            verification_result['message'] = index
+            verification_result['confidence'] = 0.3
             return verification_result
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(news['url'], timeout=self.timeout) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Extract article text
-                        article_text = self._extract_article_text(soup)
-                        
-                        # Check if the summary content is present in the article
-                        if news.get('summary'):
-                            # For each sentence in the summary, check if it appears in the article
-                            sentences = sent_tokenize(news['summary'])
-                            matched_sentences = 0
-                            
-                            for sentence in sentences:
-                                # Skip very short sentences
-                                if len(sentence.split()) < 5:
-                                    continue
-                                    
-                                similarity = self._calculate_text_similarity(article_text, sentence)
-                                if similarity > 0.7:
-                                    matched_sentences += 1
-                            
-                            # Calculate verification confidence
-                            if len(sentences) > 0:
-                                verification_confidence = matched_sentences / len(sentences)
-                                verification_result['verified'] = verification_confidence > 0.5
-                                verification_result['confidence'] = round(verification_confidence, 2)
-                                
-                                if verification_result['verified']:
-                                    verification_result['message'] = f"News content verified with {verification_confidence:.2f} confidence"
-                                else:
-                                    verification_result['message'] = f"News content verification failed with {verification_confidence:.2f} confidence"
-                            else:
-                                verification_result['message'] = "No sentences to verify in summary"
-                                verification_result['confidence'] = 0.5
-                        else:
-                            verification_result['message'] = "No summary provided for verification"
-                            verification_result['confidence'] = 0.5
-                    else:
-                        verification_result['message'] = f"Failed to access URL: HTTP {response.status}"
-                        verification_result['confidence'] = 0.3
-        except Exception as e:
-            verification_result['message'] = f"Error accessing URL: {str(e)}"
+        if not index:
+            verification_result['message'] = "No article text found at URL"
             verification_result['confidence'] = 0.3
+            return verification_result
+        
+        # Quotes must appear close to verbatim, summaries only need to be supported
+        claims = []
+        if item.get('quote'):
+            claims.append(('quote', item['quote'], 0.6))
+        if item.get('summary'):
+            for sentence in self._split_sentences(item['summary']):
+                # Skip very short sentences
+                if len(sentence.split()) >= 5:
+                    claims.append(('summary', sentence, 0.5))
+        
+        if not claims:
+            verification_result['message'] = "No quote or summary provided for verification"
+            verification_result['confidence'] = 0.5
+            return verification_result
+        
+        matches = index.match_many(text for _, text, _ in claims)
+        matched = [match['score'] >= threshold for (_, _, threshold), match in zip(claims, matches)]
+        
+        verification_confidence = sum(matched) / len(claims)
+        verification_result['verified'] = verification_confidence > 0.5
+        verification_result['confidence'] = round(verification_confidence, 2)
+        verification_result['claims'] = [
+            {'type': claim_type, 'score': match['score'], 'matched': is_match}
+            for (claim_type, _, _), match, is_match in zip(claims, matches, matched)
+        ]
+        
+        if verification_result['verified']:
+            verification_result['message'] = f"Content verified with {verification_confidence:.2f} confidence"
+        else:
+            verification_result['message'] = f"Content verification failed with {verification_confidence:.2f} confidence"
         
         return verification_result
     
@@ -0,0 +1,161 @@
+"""
+Recommendation Views Module
+
+This module shapes recommendations for API responses. A full recommendation
+carries large nested arrays (articles with quotes, leads, events with attending
+companies, verification details), while list views only need a summary. Fields
+can be projected with dotted paths that apply to every item of a nested list
+("events.name"), and responses are encoded with orjson when it is installed.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+from company_registry import canonical_domain, normalize_company_name
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional, responses fall back to the standard library encoder
+    orjson = None
+
+FieldTree = Dict[str, 'FieldTree']
+
+# Fields of the compact summary served to list views; full detail is fetched by id
+SUMMARY_FIELDS = (
+    'id', 'name', 'website', 'industry', 'size', 'headquarters', 'description', 'fit_reason',
+    'fit_score.overall_score', 'verification.status', 'verification.job_id', 'source'
+)
+
+# Nested arrays replaced by their lengths in summaries
+_COUNTED_FIELDS = ('articles', 'leads', 'events')
+
+
+def recommendation_id(recommendation: Dict) -> str:
+    """
+    Stable id of a recommended company, derived from its domain or normalized name
+
+    Args:
+        recommendation: Company recommendation
+
+    Returns:
+        12 character hex id
+    """
+    key = canonical_domain(recommendation.get('website') or '') or normalize_company_name(recommendation.get('name') or '')
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+@lru_cache(maxsize=256)
+def _parse_fields(spec: str) -> FieldTree:
+    tree: FieldTree = {}
+    for path in spec.split(','):
+        node = tree
+        for part in (part.strip() for part in path.split('.')):
+            if not part:
+                break
+            node = node.setdefault(part, {})
+    return tree
+
+
+def parse_fields(spec: Optional[str]) -> Optional[FieldTree]:
+    """
+    Parse a comma separated field list such as "name,fit_score.overall_score,events.name"
+
+    Args:
+        spec: Field list from a query string
+
+    Returns:
+        Nested dictionary of selected fields, or None to select everything
+    """
+    if not spec or not spec.strip():
+        return None
+    return _parse_fields(spec.strip()) or None
+
+
+def project(value: Any, fields: Optional[FieldTree]) -> Any:
+    """
+    Keep only the selected fields of a value
+
+    Lists are projected item by item, and a field without sub-fields is kept whole.
+
+    Args:
+        value: Recommendation, list of recommendations or nested value
+        fields: Parsed field tree, None or empty to keep everything
+
+    Returns:
+        Projected copy of the value
+    """
+    if not fields:
+        return value
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {name: project(value[name], sub) for name, sub in fields.items() if name in value}
+    return value
+
+
+def summarize(recommendation: Dict) -> Dict:
+    """
+    Compact view of a recommendation for list responses
+
+    Args:
+        recommendation: Full company recommendation
+
+    Returns:
+        Summary fields plus the number of articles, leads and events
+    """
+    summary = project(recommendation, parse_fields(','.join(SUMMARY_FIELDS)))
+    summary['counts'] = {
+        field: len(recommendation.get(field) or []) if isinstance(recommendation.get(field), list) else 0
+        for field in _COUNTED_FIELDS
+    }
+    return summary
+
+
+def shape(recommendations: Iterable[Dict], fields: Optional[str] = None, view: Optional[str] = None) -> list:
+    """
+    Apply the response view requested by a client
+
+    Args:
+        recommendations: Full company recommendations
+        fields: Optional field list, takes precedence over the view
+        view: "summary" for compact list items, anything else for full detail
+
+    Returns:
+        List of shaped recommendations
+    """
+    tree = parse_fields(fields)
+    if tree is not None:
+        return [project(rec, tree) for rec in recommendations]
+    if view == 'summary':
+        return [summarize(rec) for rec in recommendations]
+    return list(recommendations)
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Encode a response payload as JSON
+
+    Uses orjson when it is installed (several times faster on nested
+    recommendation payloads), and the standard library otherwise.
+
+    Args:
+        payload: JSON-compatible value, numpy scalars and arrays included
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode()
+
+
+def _default(value: Any) -> Any:
+    """Encode values JSON has no type for: numpy scalars as numbers, anything else as text"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
@@ -282,8 +282,12 @@ function processUserInput(text) {
                 playAudioResponse(data.audio);
             }
             
-            // Check if recommendations are ready
-            if (data.completed || data.show_recommendations_tab) {
+            // Recommendations are generated in a background job (waitForJob, js/jobs.js); wait for it before offering them
+            if (data.job_id) {
+                waitForJob(data.job_id)
+                    .then(() => showRecommendationsButton())
+                    .catch(error => console.error('Error generating recommendations:', error));
+            } else if (data.completed || data.show_recommendations_tab) {
                 showRecommendationsButton();
             }
         } else {
@@ -403,8 +403,12 @@ function handleVoiceInput(text) {
                 });
             }
             
-            // Show recommendations button if requested
-            if (data.show_recommendations_button) {
+            // Recommendations are generated in a background job (waitForJob, js/jobs.js); wait for it before offering them
+            if (data.job_id) {
+                waitForJob(data.job_id)
+                    .then(() => showRecommendationsButton())
+                    .catch(error => console.error('Error generating recommendations:', error));
+            } else if (data.show_recommendations_button) {
                 showRecommendationsButton();
             }
             
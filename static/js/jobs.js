@@ -0,0 +1,19 @@
+// Background jobs: onboarding completion answers 202 with a job_id, and the
+// recommendations are only ready once /api/jobs/<job_id> reports them complete.
+
+// Long-poll a background job until it finishes
+async function waitForJob(jobId) {
+    while (true) {
+        const response = await fetch(`/api/jobs/${jobId}?wait=20`);
+        const job = await response.json();
+        if (!job.success) {
+            throw new Error(job.error || 'Unknown job');
+        }
+        if (job.status === 'complete') {
+            return job.result;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Job failed');
+        }
+    }
+}
@@ -0,0 +1,7 @@
+from company_registry import CompanyRegistry
+
+
+def test_real_website_does_not_verify_a_made_up_name(tmp_path):
+    registry = CompanyRegistry(learned_path=str(tmp_path / "verified_companies.json"))
+    assert registry.lookup("Adobe", "https://www.adobe.com") is not None
+    assert registry.lookup("Totally Fake Widgets", "https://adobe.com") is None
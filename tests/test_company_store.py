@@ -0,0 +1,16 @@
+import json
+import time
+
+from company_store import CompanyProfileStore
+
+
+def test_updates_are_saved_in_one_background_batch(tmp_path):
+    path = tmp_path / "company_profiles.json"
+    store = CompanyProfileStore(str(path), save_delay=0.05)
+    store.update({'name': 'Adobe', 'website': 'https://adobe.com', 'industry': 'Software'})
+    store.update({'name': 'Asana', 'website': 'https://asana.com', 'industry': 'Software'})
+    assert not path.exists()
+
+    time.sleep(0.3)
+    assert set(json.loads(path.read_text())) == {'adobe.com', 'asana.com'}
+    assert not (tmp_path / "company_profiles.json.tmp").exists()
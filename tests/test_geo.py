@@ -0,0 +1,13 @@
+from geo import Geocoder
+
+
+def test_country_suffix_is_not_taken_for_a_state():
+    geocoder = Geocoder.get_instance()
+    assert geocoder.locate("Austin, TX, US") == geocoder.locate("Austin, TX")
+    assert geocoder.locate("Austin, TX, US") is not None
+
+
+def test_city_in_another_state_is_not_returned():
+    geocoder = Geocoder.get_instance()
+    assert geocoder.locate("Springfield, MA") is not None
+    assert geocoder.locate("Springfield, IL") is None
@@ -0,0 +1,8 @@
+from keyword_set import KeywordSet, canonical_keyword
+
+
+def test_singular_and_plural_keywords_are_merged():
+    keywords = KeywordSet(["service", "services", "Databases", "database", "CRM Platforms", "crm platform"])
+    assert list(keywords) == ["service", "Databases", "CRM Platforms"]
+    assert "Services" in keywords
+    assert canonical_keyword("sales") == canonical_keyword("sale")
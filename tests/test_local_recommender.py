@@ -0,0 +1,26 @@
+import json
+import os
+
+from company_registry import DATA_DIR
+from company_store import CompanyProfileStore
+from local_recommender import LocalRecommender
+
+PROFILE = {
+    'name': 'Quokka Robotics',
+    'domain': 'quokkarobotics.com',
+    'aliases': ['Quokka Robotics'],
+    'fields': {'description': {'value': 'Warehouse robotics for quokka logistics', 'updated_at': 0}}
+}
+
+
+def test_deleted_store_file_drops_its_companies(tmp_path):
+    source_path = os.path.join(DATA_DIR, "companies.csv")
+    store_path = tmp_path / "company_profiles.json"
+    store_path.write_text(json.dumps({PROFILE['domain']: PROFILE}))
+
+    recommender = LocalRecommender(source_path, str(tmp_path / "index"), CompanyProfileStore(str(store_path)))
+    assert any(doc['domain'] == PROFILE['domain'] for doc in recommender.docs)
+
+    store_path.unlink()
+    recommender = LocalRecommender(source_path, str(tmp_path / "index"), CompanyProfileStore(str(store_path)))
+    assert not any(doc['domain'] == PROFILE['domain'] for doc in recommender.docs)
@@ -0,0 +1,13 @@
+from pattern_matcher import MultiPatternMatcher
+
+
+def test_spans_after_characters_that_fold_longer():
+    text = "Die Straße führt zur CRM Plattform"
+    matcher = MultiPatternMatcher(["crm", "STRASSE", "plattform"])
+    assert [text[start:end] for start, end, _ in matcher.find_all(text)] == ["Straße", "CRM", "Plattform"]
+
+
+def test_whole_words_after_characters_that_fold_longer():
+    text = "İİ ai-tools and daily"
+    matcher = MultiPatternMatcher(["ai"], whole_words=True)
+    assert [(start, end) for start, end, _ in matcher.find_all(text)] == [(3, 5)]
@@ -0,0 +1,55 @@
+import asyncio
+
+from provider_orchestrator import ProviderOrchestrator
+
+
+def test_failed_provider_is_probed_and_recovers():
+    down = {'a': True}
+
+    async def flaky(**kwargs):
+        if down['a']:
+            raise RuntimeError("outage")
+        return [{'name': 'A'}]
+
+    async def steady(**kwargs):
+        await asyncio.sleep(0.01)
+        return [{'name': 'B'}]
+
+    orchestrator = ProviderOrchestrator({'a': flaky, 'b': steady}, mode="merge", probe_after=0.05)
+
+    async def run():
+        for _ in range(8):
+            await orchestrator.generate()
+        assert orchestrator.stats['a'].error_rate > orchestrator.max_error_rate
+        down['a'] = False
+        await asyncio.sleep(0.06)
+        await orchestrator.generate()
+
+    asyncio.run(run())
+    assert orchestrator.stats['a'].error_rate <= orchestrator.max_error_rate
+
+
+def test_slower_provider_only_starts_after_the_expected_latency():
+    calls = []
+
+    async def fast(**kwargs):
+        calls.append('fast')
+        await asyncio.sleep(0.01)
+        return [{'name': 'A'}]
+
+    async def slow(**kwargs):
+        calls.append('slow')
+        await asyncio.sleep(0.2)
+        return [{'name': 'B'}]
+
+    orchestrator = ProviderOrchestrator({'fast': fast, 'slow': slow}, hedge_factor=3.0)
+    orchestrator.stats['fast'].latency = 0.01
+    orchestrator.stats['slow'].latency = 0.2
+
+    async def run():
+        for _ in range(3):
+            result, used = await orchestrator.generate()
+            assert used == ['fast']
+
+    asyncio.run(run())
+    assert calls == ['fast'] * 3
@@ -0,0 +1,14 @@
+from recommendation_cache import base_fingerprint, profile_fingerprint, stem
+
+
+def test_plural_forms_share_a_fingerprint():
+    assert profile_fingerprint("Cloud services", "Databases", "small", "", ["sales"]) == \
+        profile_fingerprint("Cloud service", "Database", "small", "", ["sale"])
+    assert base_fingerprint("Cloud services", "Databases", "small") == \
+        base_fingerprint("Cloud service", "Database", "small")
+
+
+def test_es_is_only_stripped_after_a_sibilant():
+    assert stem("churches") == stem("church")
+    assert stem("processes") == stem("process")
+    assert stem("business") == "business"
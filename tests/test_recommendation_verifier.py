@@ -0,0 +1,24 @@
+import asyncio
+
+from recommendation_verifier import RecommendationVerifier
+
+
+def test_verification_does_not_annotate_the_callers_articles():
+    verifier = RecommendationVerifier()
+
+    async def fetch_article_indexes(urls):
+        return {url: "Could not fetch article" for url in urls}
+
+    verifier._fetch_article_indexes = fetch_article_indexes
+    rec = {
+        'name': 'Adobe',
+        'website': 'https://adobe.com',
+        'articles': [{'title': 'Earnings', 'url': 'https://example.com/a', 'quote': 'We grew.'}],
+        'recent_news': [{'title': 'Launch', 'url': 'https://example.com/b', 'summary': 'Adobe launched.'}]
+    }
+
+    verified = asyncio.run(verifier.verify_recommendation(rec))
+    assert 'verification' in verified['articles'][0]
+    assert 'verification' in verified['recent_news'][0]
+    assert 'verification' not in rec['articles'][0]
+    assert 'verification' not in rec['recent_news'][0]
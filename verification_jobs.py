@@ -0,0 +1,162 @@
+"""
+Verification Jobs Module
+
+This module runs the networked RecommendationVerifier in the background after
+recommendations have been returned, and publishes per-company results so the
+client can poll for them or receive them over server-sent events.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from recommendation_verifier import RecommendationVerifier
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationJobManager:
+    """Schedules background verification jobs and fans results out to listeners"""
+
+    def __init__(self, verifier: Optional[RecommendationVerifier] = None, max_jobs: int = 200, concurrency: int = 3):
+        """
+        Initialize the job manager
+
+        Args:
+            verifier: Verifier instance to use, created lazily if not provided
+            max_jobs: Maximum number of jobs to retain before evicting the oldest finished ones
+            concurrency: Maximum number of companies verified at the same time per job
+        """
+        self._verifier = verifier
+        self.max_jobs = max_jobs
+        self.concurrency = concurrency
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def verifier(self) -> RecommendationVerifier:
+        if self._verifier is None:
+            self._verifier = RecommendationVerifier()
+        return self._verifier
+
+    def start(self, recommendations: List[Dict]) -> str:
+        """
+        Start verifying recommendations in the background
+
+        Must be called from within a running event loop.
+
+        Args:
+            recommendations: Recommendations to verify, left unmodified
+
+        Returns:
+            Job ID to poll or subscribe to
+        """
+        job_id = uuid.uuid4().hex[:12]
+        self.jobs[job_id] = {
+            'job_id': job_id,
+            'status': 'running',
+            'created_at': time.time(),
+            'total': len(recommendations),
+            'completed': 0,
+            'results': [],
+            'listeners': set()
+        }
+        self._evict()
+
+        task = asyncio.create_task(self._run(job_id, copy.deepcopy(recommendations)))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+        logger.info(f"Started verification job {job_id} for {len(recommendations)} recommendations")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a snapshot of a job's progress and results
+
+        Args:
+            job_id: Job ID returned by start()
+
+        Returns:
+            Job status dictionary, or None if the job is unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if key != 'listeners'}
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield per-company results as they complete, starting with those already available
+
+        Args:
+            job_id: Job ID returned by start()
+
+        Yields:
+            Result dictionaries with index, name and verification metadata
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for result in job['results']:
+            queue.put_nowait(result)
+        if job['status'] != 'running':
+            queue.put_nowait(None)
+        else:
+            job['listeners'].add(queue)
+
+        try:
+            while True:
+                result = await queue.get()
+                if result is None:
+                    break
+                yield result
+        finally:
+            job['listeners'].discard(queue)
+
+    async def _run(self, job_id: str, recommendations: List[Dict]) -> None:
+        """Verify each company concurrently and publish results as they finish"""
+        job = self.jobs[job_id]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def verify(index: int, rec: Dict) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    verified = await self.verifier.verify_recommendation(rec)
+                    verification = verified['verification']
+                except Exception as e:
+                    logger.error(f"Error verifying {rec.get('name', 'Unknown')}: {str(e)}")
+                    verification = {'error': str(e)}
+                return {'index': index, 'name': rec.get('name', ''), 'verification': verification}
+
+        try:
+            for next_result in asyncio.as_completed([verify(i, rec) for i, rec in enumerate(recommendations)]):
+                result = await next_result
+                job['results'].append(result)
+                job['completed'] += 1
+                for queue in job['listeners']:
+                    queue.put_nowait(result)
+            job['status'] = 'complete'
+        except Exception as e:
+            logger.error(f"Verification job {job_id} failed: {str(e)}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = time.time()
+            for queue in job['listeners']:
+                queue.put_nowait(None)
+            logger.info(f"Verification job {job_id} finished with status {job['status']}")
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs once more than max_jobs are retained"""
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id]['status'] != 'running':
+                del self.jobs[job_id]